@@ -14,21 +14,45 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Object name lists carried by Blender scene_change events
+SCENE_CHANGE_FIELDS = ("added", "removed", "transformed", "geometry", "materials")
+# Tools such as generate_hyper3d_models wait server-side for up to 30 minutes
+REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=1800 + 60)
+
+def export_data(export_result: str) -> str:
+    """Base64 file of an export_model result, raises if the export failed"""
+    try:
+        export = json.loads(export_result)
+    except json.JSONDecodeError:
+        raise RuntimeError(f"Model export failed: {export_result}")
+    if not isinstance(export, dict) or "data" not in export:
+        error = export.get("Model Export Failed error", export) if isinstance(export, dict) else export
+        raise RuntimeError(f"Model export failed: {error}")
+    # Sizes and savings of the export, everything but the file itself
+    logger.info(f"Model exported: {({k: v for k, v in export.items() if k != 'data'})}")
+    return export["data"]
+
 class MCPHTTPClient:
     """MCP HTTP Client wrapper with SSE support."""
     
-    def __init__(self, base_url: str):
+    def __init__(self, base_url: str, batch_window: float = 0.01, max_batch_size: int = 32):
         self.base_url = base_url.rstrip('/')
         self.mcp_endpoint = f"{self.base_url}/mcp"
         self.session: Optional[aiohttp.ClientSession] = None
         self.client_id = str(uuid.uuid4())
         self.sse_task: Optional[asyncio.Task] = None
+        # Tool calls issued within batch_window seconds share one JSON-RPC batch request
+        self.batch_window = batch_window
+        self.max_batch_size = max_batch_size
+        self._batch_queue: List[tuple] = []
+        self._batch_timer: Optional[asyncio.TimerHandle] = None
         
     async def connect(self):
         """Initialize the HTTP client session"""
         if self.session is None:
             connector = aiohttp.TCPConnector(limit=100)
-            timeout = aiohttp.ClientTimeout(total=60)
+            # No overall limit on the session so the SSE stream stays open
+            timeout = aiohttp.ClientTimeout(total=None, sock_connect=30)
             self.session = aiohttp.ClientSession(
                 connector=connector,
                 timeout=timeout,
@@ -49,6 +73,14 @@ class MCPHTTPClient:
         
     async def disconnect(self):
         """Close the HTTP client session"""
+        if self._batch_timer:
+            self._batch_timer.cancel()
+            self._batch_timer = None
+        pending, self._batch_queue = self._batch_queue, []
+        for _, future in pending:
+            if not future.done():
+                future.set_exception(Exception("Client disconnected before the batch was sent"))
+        
         if self.sse_task and not self.sse_task.done():
             self.sse_task.cancel()
             try:
@@ -95,7 +127,7 @@ class MCPHTTPClient:
             raise Exception("Client not connected. Call connect() first.")
         
         try:
-            async with self.session.post(self.mcp_endpoint, json=request_data) as response:
+            async with self.session.post(self.mcp_endpoint, json=request_data, timeout=REQUEST_TIMEOUT) as response:
                 if response.status != 200:
                     raise Exception(f"HTTP {response.status}: {await response.text()}")
                 
@@ -106,6 +138,29 @@ class MCPHTTPClient:
             logger.error(f"Request failed: {str(e)}")
             raise
     
+    async def make_batch_request(self, requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Send several JSON-RPC requests as one batch, responses are returned in request order"""
+        if not self.session:
+            raise Exception("Client not connected. Call connect() first.")
+        
+        try:
+            async with self.session.post(self.mcp_endpoint, json=requests, timeout=REQUEST_TIMEOUT) as response:
+                if response.status != 200:
+                    raise Exception(f"HTTP {response.status}: {await response.text()}")
+                
+                result = await response.json()
+        except Exception as e:
+            logger.error(f"Batch request failed: {str(e)}")
+            raise
+        
+        if isinstance(result, dict):
+            # The whole batch was rejected
+            raise Exception(f"Batch request failed: {result.get('error')}")
+        
+        by_id = {item.get('id'): item for item in result}
+        missing = {"jsonrpc": "2.0", "error": {"code": -32603, "message": "No response for request"}}
+        return [by_id.get(req.get('id'), missing) for req in requests]
+    
     async def list_tools(self) -> List[Dict[str, Any]]:
         """List available tools from the server"""
         request_data = {
@@ -175,7 +230,61 @@ class MCPHTTPClient:
         }
         
         response = await self.make_request(request_data)
+        return self._tool_result_text(response)
+    
+    async def call_tool_batched(self, tool_name: str, arguments: Dict[str, Any] = None) -> str:
+        """Call a tool, coalescing it with other calls made within batch_window into one batch request"""
+        request_data = {
+            "jsonrpc": "2.0",
+            "method": "tools/call",
+            "params": {
+                "name": tool_name,
+                "arguments": arguments or {}
+            },
+            "id": str(uuid.uuid4())
+        }
+        
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._batch_queue.append((request_data, future))
         
+        if len(self._batch_queue) >= self.max_batch_size:
+            self._flush_batch()
+        elif self._batch_timer is None:
+            self._batch_timer = loop.call_later(self.batch_window, self._flush_batch)
+        
+        response = await future
+        return self._tool_result_text(response)
+    
+    def _flush_batch(self):
+        """Send everything queued by call_tool_batched"""
+        if self._batch_timer:
+            self._batch_timer.cancel()
+            self._batch_timer = None
+        pending, self._batch_queue = self._batch_queue, []
+        if pending:
+            asyncio.ensure_future(self._send_batch(pending))
+    
+    async def _send_batch(self, pending: List[tuple]):
+        requests = [request_data for request_data, _ in pending]
+        try:
+            if len(requests) == 1:
+                responses = [await self.make_request(requests[0])]
+            else:
+                logger.info(f"Sending batch of {len(requests)} tool calls")
+                responses = await self.make_batch_request(requests)
+        except Exception as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        for (_, future), response in zip(pending, responses):
+            if not future.done():
+                future.set_result(response)
+    
+    @staticmethod
+    def _tool_result_text(response: Dict[str, Any]) -> str:
         if 'error' in response:
             raise Exception(f"Tool call failed: {response['error']}")
         
@@ -277,6 +386,9 @@ class MCPHTTPClient:
             logger.debug(f"SSE heartbeat at {message.get('timestamp')}")
         elif msg_type == 'notification':
             logger.info(f"Server notification: {message.get('message')}")
+        elif msg_type == 'scene_change':
+            counts = {k: len(message[k]) for k in SCENE_CHANGE_FIELDS if k in message}
+            logger.info(f"Scene changed ({message.get('reason', 'update')}): {counts}")
         else:
             logger.info(f"Unknown SSE message type: {msg_type}")
     
@@ -3,7 +3,7 @@ import os
 import json
 import time
 import openai
-from app.blender_client import MCPHTTPClient
+from app.blender_client import MCPHTTPClient, export_data
 from langchain.agents import AgentExecutor, create_openai_functions_agent
 from langchain_core.messages import HumanMessage
 from langchain_groq import ChatGroq
@@ -50,6 +50,8 @@ class MCPConnectionManager:
 
 # Global connection manager
 mcp_manager = MCPConnectionManager(os.environ.get("BLENDER_SERVER_URL"))
+# Export profile of the model sent back with each job result (see EXPORT_PROFILES in the addon)
+EXPORT_PROFILE = os.environ.get("EXPORT_PROFILE", "web-preview")
 
 groq_llm = ChatGroq(
     api_key=os.getenv("GROQ_API_KEY"),
@@ -111,8 +113,8 @@ async def run_agent_on_prompt(prompt: str, user_id: str, project_id: str, job_id
         append_message(user_id, project_id, {"role": "assistant", "content": final_output})
 
         # Step 6: Auto-call export_model tool
-        export_result = await client.call_tool("export_model", {"export_format": "GLB"})
-        base64data = json.loads(export_result).get("data", "")
+        export_result = await client.call_tool("export_model", {"export_format": "GLB", "profile": EXPORT_PROFILE, "job_id": job_id, "background": True})
+        base64data = export_data(export_result)
 
         await client.disconnect()
         return final_output, base64data
@@ -4,7 +4,7 @@ import os
 import json
 import time
 import openai
-from app.blender_client import MCPHTTPClient
+from app.blender_client import MCPHTTPClient, SCENE_CHANGE_FIELDS, export_data
 from dotenv import load_dotenv
 
 from app.session_store import get_messages, append_message
@@ -39,11 +39,73 @@ class MCPConnectionManager:
                 await self.client.connect()
                 self.connected = True
             
+            # One listener per client, (re)started if it stopped
+            await self.client.start_sse_listener(self.forward_server_events)
             self.last_used = now
             return self.client
 
+    async def forward_server_events(self, message):
+        """Forward Blender scene changes and command progress to every running job's user.
+
+        Events carry no job id and the scene is shared, so each job registered
+        in active_jobs gets them.
+        """
+        if message.get("type") == "scene_change":
+            event = {
+                "type": "scene_update",
+                "reason": message.get("reason", "update"),
+                "changes": {k: message[k] for k in SCENE_CHANGE_FIELDS if k in message},
+                "truncated": message.get("truncated", False)
+            }
+        elif message.get("type") == "progress":
+            event = {
+                "type": "job_progress",
+                "command": message.get("command"),
+                "stage": message.get("stage"),
+                "done": message.get("done"),
+                "total": message.get("total"),
+                "message": message.get("message")
+            }
+        else:
+            await self.client._default_message_handler(message)
+            return
+        for job_id, (user_id, project_id) in list(active_jobs.items()):
+            await notify_user(user_id, {**event, "job_id": job_id, "project_id": project_id})
+
+# Jobs currently running against Blender: job_id → (user_id, project_id)
+active_jobs = {}
+
 # Global connection manager
 mcp_manager = MCPConnectionManager(os.environ.get("BLENDER_SERVER_URL"))
+# Export profile of the model sent back with each job result (see EXPORT_PROFILES in the addon)
+EXPORT_PROFILE = os.environ.get("EXPORT_PROFILE", "web-preview")
+# Tools that only read scene or catalog state; consecutive calls to these may run concurrently
+READ_ONLY_TOOLS = {
+    "get_scene_info", "get_object_info", "get_objects_info", "query_scene",
+    "get_viewport_screenshot", "get_contact_sheet", "get_polyhaven_categories",
+    "search_polyhaven_assets", "search_sketchfab_models", "poll_rodin_job_status",
+}
+
+
+async def run_tool_calls(client, calls):
+    """Run one turn's tool calls in order, returning results or exceptions.
+
+    A later call may depend on an earlier one (create an object, then modify it),
+    so only runs of consecutive read-only calls go out together as one batch.
+    """
+    results = []
+    index = 0
+    while index < len(calls):
+        end = index + 1
+        if calls[index][1] in READ_ONLY_TOOLS:
+            while end < len(calls) and calls[end][1] in READ_ONLY_TOOLS:
+                end += 1
+        results += await asyncio.gather(
+            *(client.call_tool_batched(tool_name, args) for _, tool_name, args in calls[index:end]),
+            return_exceptions=True
+        )
+        index = end
+    return results
 
 
 async def run_agent_loop_direct_groq(prompt: str, user_id: str, project_id: str, job_id: str):
@@ -52,7 +114,15 @@ async def run_agent_loop_direct_groq(prompt: str, user_id: str, project_id: str,
     except:
         return "Unable to connect with Blender", None
     tools_raw = await client.list_tools()
-    
+
+    active_jobs[job_id] = (user_id, project_id)
+    try:
+        return await _run_agent_loop(client, tools_raw, prompt, user_id, project_id, job_id)
+    finally:
+        active_jobs.pop(job_id, None)
+
+
+async def _run_agent_loop(client, tools_raw, prompt: str, user_id: str, project_id: str, job_id: str):
     # Get strategy message
     strategy_prompt = await client.call_prompt("asset_creation_strategy", {})
 
@@ -108,29 +178,35 @@ async def run_agent_loop_direct_groq(prompt: str, user_id: str, project_id: str,
         print("messages:", messages)
     
         if "tool_calls" in msg:
-            tool_call = msg["tool_calls"][0]
-            tool_name = tool_call["function"]["name"]
-            args = json.loads(tool_call["function"]["arguments"])
+            tool_calls = msg["tool_calls"]
+            calls = [
+                (tool_call, tool_call["function"]["name"], json.loads(tool_call["function"]["arguments"]))
+                for tool_call in tool_calls
+            ]
 
-            result = await client.call_tool(tool_name, args)
+            results = await run_tool_calls(client, calls)
 
-            # Add tool_call + result to messages
+            # Add tool_call + results to messages
             messages.append(msg)
-            messages.append({
-                "role": "tool",
-                "tool_call_id": tool_call["id"],
-                "name": tool_name,
-                "content": result
-            })
-
-            await notify_user(user_id, {
-                "type": "agent_tool_call",
-                "job_id": job_id,
-                "tool": tool_name,
-                "input": args,
-                "output": result,
-                "project_id": project_id
-            })
+            for (tool_call, tool_name, args), result in zip(calls, results):
+                if isinstance(result, Exception):
+                    result = f"Error calling {tool_name}: {str(result)}"
+
+                messages.append({
+                    "role": "tool",
+                    "tool_call_id": tool_call["id"],
+                    "name": tool_name,
+                    "content": result
+                })
+
+                await notify_user(user_id, {
+                    "type": "agent_tool_call",
+                    "job_id": job_id,
+                    "tool": tool_name,
+                    "input": args,
+                    "output": result,
+                    "project_id": project_id
+                })
 
         elif msg.get("content"):
             final_output = msg["content"]
@@ -138,7 +214,8 @@ async def run_agent_loop_direct_groq(prompt: str, user_id: str, project_id: str,
             append_message(user_id, project_id, {"role": "assistant", "content": final_output})
 
             # Auto-export model
-            base64data = await client.call_tool("export_model", {"export_format": "GLB"})
+            export_result = await client.call_tool("export_model", {"export_format": "GLB", "profile": EXPORT_PROFILE, "job_id": job_id, "background": True})
+            base64data = export_data(export_result)
 
             # await notify_user(user_id, {
             #     "type": "job_completed",
@@ -148,12 +225,10 @@ async def run_agent_loop_direct_groq(prompt: str, user_id: str, project_id: str,
             #     "base64data": base64data
             # })
 
-            await client.disconnect()
             return final_output, base64data
 
         else:
             # Safety fallback
-            await client.disconnect()
             return "No response from model.", None
 
-        time.sleep(60)
+        await asyncio.sleep(60)
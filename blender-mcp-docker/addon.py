@@ -4,6 +4,7 @@ import mathutils
 import json
 import threading
 import socket
+import subprocess
 import time
 import requests
 import tempfile
@@ -11,9 +12,38 @@ import traceback
 import os
 import shutil
 import zipfile
+import queue
+import fnmatch
+import bisect
+import hashlib
+import random
+import ctypes
+import math
+import uuid
+import sys
+import struct
+import zlib
+import numpy as np
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from bpy.app.handlers import persistent
 from bpy.props import StringProperty, IntProperty, BoolProperty, EnumProperty
 import io
-from contextlib import redirect_stdout, suppress
+from contextlib import suppress, contextmanager
+
+try:
+    # Not bundled with Blender; without it screenshots are always PNG
+    from PIL import Image as PILImage
+except ImportError:
+    PILImage = None
+
+try:
+    # Serializes asset cache index writes between processes; unavailable on Windows
+    import fcntl
+except ImportError:
+    fcntl = None
 
 bl_info = {
     "name": "Blender MCP",
@@ -27,6 +57,1766 @@ bl_info = {
 
 RODIN_FREE_TRIAL_KEY = "k9TcfFoEhNd9cCPP2guHAHHHkctZHIRhZDywZ1euGUXwihbYLpOjQhofby80NJez"
 
+# Scene change events are coalesced for this long before being pushed to subscribers
+SCENE_EVENT_FLUSH_INTERVAL = 0.1
+# Cap on names reported per change category, keeps event frames compact
+SCENE_EVENT_MAX_NAMES = 200
+
+# Fields get_objects_info can project, and the page size cap for one call
+OBJECT_INFO_FIELDS = ("type", "location", "rotation", "scale", "visible", "world_bounding_box", "materials", "mesh")
+OBJECT_INFO_MAX_PAGE = 500
+
+# Fields and sort orders supported by query_scene
+QUERY_SCENE_FIELDS = ("type", "collections", "parent", "location", "rotation", "scale", "visible", "materials", "world_bounding_box")
+QUERY_SCENE_SORT_KEYS = ("name", "type", "x", "y", "z", "size")
+# Scene snapshots kept around so cursors from recent generations keep paging the same data
+SCENE_SNAPSHOT_CACHE_SIZE = 4
+# Object types whose bound_box describes real geometry
+GEOMETRY_OBJECT_TYPES = {'MESH', 'CURVE', 'SURFACE', 'META', 'FONT', 'VOLUME', 'POINTCLOUD', 'CURVES'}
+
+# Local asset cache location and size, overridable from the environment
+ASSET_CACHE_DIR = os.environ.get("BLENDERMCP_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "blendermcp"))
+ASSET_CACHE_MAX_BYTES = int(os.environ.get("BLENDERMCP_CACHE_MAX_MB", "2048")) * 1024 * 1024
+# Seconds between index writes that only update LRU times; new and removed entries are written at once
+ASSET_CACHE_INDEX_FLUSH_INTERVAL = 30
+# How long asset metadata (e.g. PolyHaven file listings) is trusted before refetching
+POLYHAVEN_METADATA_TTL = 24 * 3600
+POLYHAVEN_DEFAULT_FORMATS = {"hdris": "hdr", "textures": "jpg", "models": "gltf"}
+DOWNLOAD_CHUNK_SIZE = 1 << 16
+# Concurrent downloads, e.g. the separate maps of a texture set
+DOWNLOAD_WORKERS = 6
+# Seconds a prefetched generated asset waits for its import before the download is discarded
+GENERATED_PREFETCH_TTL = 30 * 60
+# Extracted Sketchfab models kept on disk, least recently used are removed first
+SKETCHFAB_CACHE_MODELS = 20
+
+# Decimation ratio of each LOD level (LOD1, LOD2, ...) when no triangle budget is given
+LOD_DEFAULT_RATIOS = (0.5, 0.25, 0.1)
+# Meshes below this many triangles are always exported at full resolution
+LOD_MIN_TRIANGLES = 2000
+# Lowest ratio a triangle budget can decimate a mesh to
+LOD_MIN_RATIO = 0.01
+
+# Every export is written to its own directory here, shared safely between Blender instances
+EXPORT_DIR = os.environ.get("BLENDERMCP_EXPORT_DIR", os.path.join(tempfile.gettempdir(), "blendermcp-exports"))
+# Old exports are removed after this many seconds, and oldest first beyond the size cap
+EXPORT_MAX_AGE = int(os.environ.get("BLENDERMCP_EXPORT_MAX_AGE", "3600"))
+EXPORT_MAX_BYTES = int(os.environ.get("BLENDERMCP_EXPORT_MAX_MB", "1024")) * 1024 * 1024
+EXPORT_FILENAMES = {"GLB": "model.glb", "GLTF_SEPARATE": "model.gltf", "GLTF_EMBEDDED": "model.gltf"}
+
+# Headless Blender processes kept running for background exports, and how long one export may take
+EXPORT_WORKERS = int(os.environ.get("BLENDERMCP_EXPORT_WORKERS", "2"))
+EXPORT_WORKER_TIMEOUT = int(os.environ.get("BLENDERMCP_EXPORT_TIMEOUT", "600"))
+
+# Named glTF export settings. "options" go to the glTF exporter (options this
+# Blender's exporter doesn't know are dropped), "max_texture_size" downscales
+# larger images for the export only. None of them sets export_apply: applying
+# modifiers gives every object its own mesh, while without it objects sharing a
+# mesh (linked duplicates, collection instances) reference a single glTF mesh.
+EXPORT_PROFILES = {
+    "default": {
+        "options": {},
+        "max_texture_size": None,
+    },
+    "web-preview": {
+        "options": {
+            "export_draco_mesh_compression_enable": True,
+            "export_draco_mesh_compression_level": 6,
+            "export_draco_position_quantization": 14,
+            "export_draco_normal_quantization": 10,
+            "export_draco_texcoord_quantization": 12,
+            "export_draco_color_quantization": 10,
+            "export_draco_generic_quantization": 12,
+            "export_image_format": "WEBP",
+            "export_image_quality": 80,
+        },
+        "max_texture_size": 1024,
+    },
+    "archive": {
+        "options": {
+            "export_draco_mesh_compression_enable": False,
+            "export_image_format": "AUTO",
+            "export_extras": True,
+        },
+        "max_texture_size": None,
+    },
+}
+
+
+class AssetCache:
+    """Content-addressed on-disk cache for downloaded asset files.
+
+    Files are stored once per SHA-256 under objects/, an index maps cache keys
+    (e.g. polyhaven/<id>/<resolution>/<format>/<map>) to them, and the least
+    recently used keys are evicted once the cache grows past max_bytes.
+    Small JSON metadata is kept separately under meta/ with a TTL. Cache hits
+    only update LRU times in memory, written out at most every
+    ASSET_CACHE_INDEX_FLUSH_INTERVAL; each write merges with the index on
+    disk so processes sharing the cache don't drop each other's entries.
+    """
+
+    def __init__(self, root, max_bytes):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.RLock()
+        self._entries = None
+        # Keys removed since the last write, so merging doesn't bring them back
+        self._removed = set()
+        self._dirty = False
+        self._saved_at = time.monotonic()
+        # Objects whose hash was checked since startup, so hits don't rehash every time
+        self._verified = set()
+
+    @property
+    def _index_path(self):
+        return os.path.join(self.root, "index.json")
+
+    def _object_path(self, sha256, ext):
+        return os.path.join(self.root, "objects", sha256[:2], sha256 + ext)
+
+    def _meta_path(self, key):
+        return os.path.join(self.root, "meta", hashlib.sha1(key.encode("utf-8")).hexdigest() + ".json")
+
+    @staticmethod
+    def _write_json(path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+
+    def _load(self):
+        if self._entries is None:
+            try:
+                with open(self._index_path) as f:
+                    self._entries = json.load(f).get("entries", {})
+            except (OSError, ValueError):
+                self._entries = {}
+        return self._entries
+
+    @contextmanager
+    def _index_lock(self):
+        if fcntl is None:
+            yield
+            return
+        os.makedirs(self.root, exist_ok=True)
+        with open(os.path.join(self.root, "index.lock"), "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _save(self):
+        """Merge with the index on disk, then replace it atomically"""
+        with self._index_lock():
+            try:
+                with open(self._index_path) as f:
+                    on_disk = json.load(f).get("entries", {})
+            except (OSError, ValueError):
+                on_disk = {}
+            for key, entry in on_disk.items():
+                if key in self._removed:
+                    continue
+                mine = self._entries.get(key)
+                if mine is None:
+                    # Stored by another process since we loaded the index
+                    self._entries[key] = entry
+                elif mine["sha256"] == entry["sha256"]:
+                    mine["last_used"] = max(mine["last_used"], entry.get("last_used", 0))
+            self._write_json(self._index_path, {"version": 1, "entries": self._entries})
+        self._removed.clear()
+        self._dirty = False
+        self._saved_at = time.monotonic()
+
+    def flush(self):
+        """Write pending LRU time updates"""
+        with self._lock:
+            if self._dirty:
+                self._save()
+
+    def load_metadata(self, key):
+        """Return (data, fetched_at) for key regardless of age, or (None, 0) when missing"""
+        try:
+            with open(self._meta_path(key)) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None, 0
+        return entry.get("data"), entry.get("fetched_at", 0)
+
+    def get_metadata(self, key, ttl):
+        """Cached metadata for key, or None when missing or older than ttl seconds"""
+        data, fetched_at = self.load_metadata(key)
+        if time.time() - fetched_at > ttl:
+            return None
+        return data
+
+    def put_metadata(self, key, data):
+        self._write_json(self._meta_path(key), {"fetched_at": time.time(), "data": data})
+
+    def _is_intact(self, path, entry):
+        try:
+            if os.path.getsize(path) != entry["size"]:
+                return False
+        except OSError:
+            return False
+        if path not in self._verified:
+            digest = hashlib.sha256()
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b""):
+                    digest.update(chunk)
+            if digest.hexdigest() != entry["sha256"]:
+                return False
+            self._verified.add(path)
+        return True
+
+    def lookup(self, key):
+        """Path of the cached file for key, or None on a miss or a failed integrity check"""
+        with self._lock:
+            entries = self._load()
+            entry = entries.get(key)
+            if entry is None:
+                return None
+            path = self._object_path(entry["sha256"], entry["ext"])
+            if not self._is_intact(path, entry):
+                print(f"Asset cache entry failed integrity check, dropping: {key}")
+                self._remove_key(key)
+                self._save()
+                return None
+            entry["last_used"] = time.time()
+            self._dirty = True
+            if time.monotonic() - self._saved_at >= ASSET_CACHE_INDEX_FLUSH_INTERVAL:
+                self._save()
+            return path
+
+    def store(self, key, chunks, ext=""):
+        """Write an iterable of byte chunks into the cache under key and return the stored path"""
+        os.makedirs(self.root, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".part")
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in chunks:
+                    if chunk:
+                        f.write(chunk)
+                        digest.update(chunk)
+                        size += len(chunk)
+            sha256 = digest.hexdigest()
+            path = self._object_path(sha256, ext)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(tmp_path, path)
+        except BaseException:
+            with suppress(OSError):
+                os.unlink(tmp_path)
+            raise
+
+        with self._lock:
+            entries = self._load()
+            entries[key] = {"sha256": sha256, "ext": ext, "size": size, "last_used": time.time()}
+            self._removed.discard(key)
+            self._verified.add(path)
+            self._evict(keep=key)
+            self._save()
+        return path
+
+    def _remove_key(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self._removed.add(key)
+        # Other keys may share the same content
+        if not any(e["sha256"] == entry["sha256"] and e["ext"] == entry["ext"] for e in self._entries.values()):
+            path = self._object_path(entry["sha256"], entry["ext"])
+            self._verified.discard(path)
+            with suppress(OSError):
+                os.unlink(path)
+
+    def _evict(self, keep=None):
+        """Drop least recently used keys until the stored content fits in max_bytes"""
+        objects = {}
+        for entry in self._entries.values():
+            objects[(entry["sha256"], entry["ext"])] = entry["size"]
+        total = sum(objects.values())
+        if total <= self.max_bytes:
+            return
+        for key, entry in sorted(self._entries.items(), key=lambda item: item[1]["last_used"]):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            content = (entry["sha256"], entry["ext"])
+            self._remove_key(key)
+            if content in objects and not any((e["sha256"], e["ext"]) == content for e in self._entries.values()):
+                total -= objects.pop(content)
+
+
+ASSET_CACHE = AssetCache(ASSET_CACHE_DIR, ASSET_CACHE_MAX_BYTES)
+
+# (connect, read) timeouts per provider in seconds, e.g. BLENDERMCP_SKETCHFAB_TIMEOUT=10,120
+HTTP_TIMEOUTS = {
+    provider: tuple(float(t) for t in os.environ.get(f"BLENDERMCP_{provider.upper()}_TIMEOUT", default).split(","))
+    for provider, default in {"polyhaven": "10,60", "sketchfab": "10,60", "hyper3d": "10,120"}.items()
+}
+HTTP_RETRIES = int(os.environ.get("BLENDERMCP_HTTP_RETRIES", "3"))
+# Connections kept open per host, enough for the download pool plus handler workers
+HTTP_POOL_SIZE = 10
+
+
+class JitteredRetry(Retry):
+    """Retry with "full jitter" backoff, so concurrent downloads failing together don't retry in lockstep"""
+
+    def get_backoff_time(self):
+        backoff = super().get_backoff_time()
+        return random.uniform(0, backoff) if backoff > 0 else 0
+
+
+class ProviderSession(requests.Session):
+    """Session that applies the provider's timeouts unless a request passes its own"""
+
+    def __init__(self, timeout):
+        super().__init__()
+        self.default_timeout = timeout
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.default_timeout)
+        return super().request(method, url, **kwargs)
+
+
+class ProviderSessions:
+    """One pooled, retrying requests.Session per asset provider.
+
+    A provider's session is rebuilt when the credential it was created for
+    (the API key from the scene settings) changes, so connections and
+    cookies from a previous account are never reused.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sessions = {}
+
+    def get(self, provider, credential=None):
+        with self._lock:
+            entry = self._sessions.get(provider)
+            if entry is not None and entry[0] == credential:
+                return entry[1]
+            if entry is not None:
+                entry[1].close()
+            session = self._build(provider)
+            self._sessions[provider] = (credential, session)
+            return session
+
+    @staticmethod
+    def _build(provider):
+        session = ProviderSession(HTTP_TIMEOUTS[provider])
+        # Only idempotent methods are retried, job submissions are never sent twice
+        retry = JitteredRetry(
+            total=HTTP_RETRIES,
+            backoff_factor=0.5,
+            status_forcelist=(429, 500, 502, 503, 504),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=HTTP_POOL_SIZE, max_retries=retry)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def close(self):
+        with self._lock:
+            for _, session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+
+HTTP_SESSIONS = ProviderSessions()
+DOWNLOAD_POOL = ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS, thread_name_prefix="blendermcp-download")
+
+# PolyHaven catalog snapshots older than this are refreshed in the background
+POLYHAVEN_CATALOG_TTL = 6 * 3600
+POLYHAVEN_ASSET_TYPES = {"hdris": 0, "textures": 1, "models": 2}
+# Relevance weight of a query term matching each field of an asset
+POLYHAVEN_FIELD_WEIGHTS = {"name": 3.0, "tags": 2.0, "categories": 1.5}
+
+
+def _search_tokens(text):
+    """Lowercase alphanumeric words of text, used both for indexing and for queries"""
+    return [token for token in "".join(c if c.isalnum() else " " for c in str(text).lower()).split() if token]
+
+
+class PolyHavenCatalog:
+    """Locally persisted PolyHaven /assets snapshot with an inverted index for search.
+
+    The snapshot lives in the asset cache metadata so it survives restarts. A
+    stale snapshot is still served while a background thread fetches a fresh
+    one; only the very first load blocks on the network.
+    """
+
+    CACHE_KEY = "polyhaven/catalog"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Held for the first load so concurrent searches don't all fetch the catalog
+        self._load_lock = threading.Lock()
+        self._refreshing = False
+        self._fetched_at = 0
+        self._assets = None
+        self._postings = {}
+        self._sorted_tokens = []
+
+    def _build_index(self, assets):
+        postings = {}
+        for asset_id, data in assets.items():
+            fields = {
+                "name": _search_tokens(data.get("name", "")) + _search_tokens(asset_id),
+                "tags": [t for tag in data.get("tags", []) for t in _search_tokens(tag)],
+                "categories": [t for cat in data.get("categories", []) for t in _search_tokens(cat)],
+            }
+            for field_name, tokens in fields.items():
+                weight = POLYHAVEN_FIELD_WEIGHTS[field_name]
+                for token in set(tokens):
+                    scores = postings.setdefault(token, {})
+                    scores[asset_id] = max(scores.get(asset_id, 0.0), weight)
+        return postings
+
+    def _install(self, assets, fetched_at):
+        postings = self._build_index(assets)
+        with self._lock:
+            self._assets = assets
+            self._postings = postings
+            self._sorted_tokens = sorted(postings)
+            self._fetched_at = fetched_at
+
+    def _fetch(self):
+        response = HTTP_SESSIONS.get("polyhaven").get("https://api.polyhaven.com/assets")
+        if response.status_code != 200:
+            raise RuntimeError(f"API request failed with status code {response.status_code}")
+        assets = response.json()
+        ASSET_CACHE.put_metadata(self.CACHE_KEY, assets)
+        self._install(assets, time.time())
+
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def refresh():
+            try:
+                self._fetch()
+            except Exception as e:
+                print(f"PolyHaven catalog refresh failed: {str(e)}")
+            finally:
+                with self._lock:
+                    self._refreshing = False
+
+        threading.Thread(target=refresh, daemon=True).start()
+
+    def ensure_loaded(self):
+        """Load the snapshot from disk or the network and schedule a refresh when stale"""
+        if self._assets is None:
+            with self._load_lock:
+                if self._assets is None:
+                    assets, fetched_at = ASSET_CACHE.load_metadata(self.CACHE_KEY)
+                    if assets is None:
+                        self._fetch()
+                        return
+                    self._install(assets, fetched_at)
+        if time.time() - self._fetched_at > POLYHAVEN_CATALOG_TTL:
+            self._refresh_in_background()
+
+    @staticmethod
+    def _match(term, postings, sorted_tokens):
+        """Scores for a query term, with partial credit for prefix matches on longer tokens"""
+        scores = dict(postings.get(term, {}))
+        start = bisect.bisect_right(sorted_tokens, term)
+        for token in sorted_tokens[start:]:
+            if not token.startswith(term):
+                break
+            for asset_id, weight in postings[token].items():
+                scores[asset_id] = max(scores.get(asset_id, 0.0), weight * 0.5)
+        return scores
+
+    def search(self, asset_type=None, categories=None, query=None, limit=20, offset=0):
+        """Return (ranked asset ids, scores, snapshot) filtered by type and categories"""
+        self.ensure_loaded()
+        # One consistent snapshot, a background refresh may install a new one meanwhile
+        with self._lock:
+            assets, postings, sorted_tokens = self._assets, self._postings, self._sorted_tokens
+
+        type_code = POLYHAVEN_ASSET_TYPES.get(asset_type)
+        wanted = {c.lower() for c in categories or []}
+        scores = None
+        for term in _search_tokens(query or ""):
+            term_scores = self._match(term, postings, sorted_tokens)
+            if scores is None:
+                scores = term_scores
+            else:
+                # Every query term has to match somewhere
+                scores = {k: v + term_scores[k] for k, v in scores.items() if k in term_scores}
+        candidates = assets.keys() if scores is None else scores.keys()
+
+        matches = []
+        for asset_id in candidates:
+            data = assets[asset_id]
+            if type_code is not None and data.get("type") != type_code:
+                continue
+            if wanted and not wanted.issubset(c.lower() for c in data.get("categories", [])):
+                continue
+            matches.append(asset_id)
+
+        matches.sort(key=lambda k: (-(scores or {}).get(k, 0.0), -assets[k].get("download_count", 0), k))
+        return matches, scores or {}, assets
+
+    def categories(self, asset_type):
+        """Category -> asset count for an asset type (or all), computed from the snapshot"""
+        self.ensure_loaded()
+        with self._lock:
+            assets = self._assets
+        type_code = POLYHAVEN_ASSET_TYPES.get(asset_type)
+        counts = {}
+        total = 0
+        for data in assets.values():
+            if type_code is not None and data.get("type") != type_code:
+                continue
+            total += 1
+            for category in data.get("categories", []):
+                counts[category] = counts.get(category, 0) + 1
+        counts["all"] = total
+        return counts
+
+
+POLYHAVEN_CATALOG = PolyHavenCatalog()
+
+
+class AABBEngine:
+    """World-space AABBs for many objects in one batched transform, cached per object
+    until its world matrix or its data changes.
+
+    Entries are keyed by session_uid, which unlike the name is never reused
+    by another object, and entries of deleted objects are pruned once the
+    cache holds more entries than there are objects.
+    """
+
+    def __init__(self):
+        # exact flag -> object session_uid -> (world matrix, min corner, max corner)
+        self._cache = {False: {}, True: {}}
+
+    def clear(self):
+        for cache in self._cache.values():
+            cache.clear()
+
+    def invalidate(self, uids):
+        for cache in self._cache.values():
+            for uid in uids:
+                cache.pop(uid, None)
+
+    def note_depsgraph_updates(self, depsgraph):
+        """Drop cached bounds of objects whose geometry was re-evaluated"""
+        self.invalidate([
+            update.id.original.session_uid for update in depsgraph.updates
+            if update.is_updated_geometry and isinstance(update.id, bpy.types.Object)
+        ])
+
+    def _prune(self, cache):
+        """Drop entries of objects that no longer exist"""
+        if len(cache) <= len(bpy.data.objects):
+            return
+        alive = {obj.session_uid for obj in bpy.data.objects}
+        for uid in [uid for uid in cache if uid not in alive]:
+            del cache[uid]
+
+    @staticmethod
+    def _read_transforms(objs):
+        """Returns (n, 4, 4) world matrices and (n, 8, 3) local bound box corners"""
+        all_objects = bpy.data.objects
+        total = len(all_objects)
+        if len(objs) * 4 >= total:
+            # Most of the file is requested: one foreach_get over every object beats per-object access
+            index = {name: i for i, name in enumerate(all_objects.keys())}
+            if all(obj.name in index for obj in objs):
+                matrices = np.empty(total * 16, dtype=np.float32)
+                corners = np.empty(total * 24, dtype=np.float32)
+                all_objects.foreach_get("matrix_world", matrices)
+                all_objects.foreach_get("bound_box", corners)
+                rows = np.fromiter((index[obj.name] for obj in objs), dtype=np.int64, count=len(objs))
+                # foreach_get flattens matrices column by column
+                matrices = matrices.reshape(total, 4, 4).transpose(0, 2, 1)[rows]
+                corners = corners.reshape(total, 8, 3)[rows]
+                return matrices.astype(np.float64), corners.astype(np.float64)
+
+        matrices = np.array([obj.matrix_world for obj in objs], dtype=np.float64)
+        corners = np.array([obj.bound_box for obj in objs], dtype=np.float64)
+        return matrices, corners
+
+    @staticmethod
+    def _exact_bounds(obj, matrix, depsgraph):
+        """Bounds of the evaluated mesh vertices, None when there is nothing to measure"""
+        eval_obj = obj.evaluated_get(depsgraph)
+        mesh = eval_obj.to_mesh()
+        try:
+            count = len(mesh.vertices)
+            if not count:
+                return None
+            coords = np.empty(count * 3, dtype=np.float32)
+            mesh.vertices.foreach_get("co", coords)
+            world = coords.reshape(count, 3).astype(np.float64) @ matrix[:3, :3].T + matrix[:3, 3]
+            return world.min(axis=0), world.max(axis=0)
+        finally:
+            eval_obj.to_mesh_clear()
+
+    def compute(self, objs, exact=False):
+        """ Returns (mins, maxs) arrays of shape (n, 3) with the world-space AABBs of the objects. """
+        count = len(objs)
+        mins = np.empty((count, 3))
+        maxs = np.empty((count, 3))
+        if not count:
+            return mins, maxs
+
+        matrices, corners = self._read_transforms(objs)
+
+        # Reuse cached bounds of objects whose world matrix is unchanged
+        cache = self._cache[exact]
+        self._prune(cache)
+        entries = [cache.get(obj.session_uid) for obj in objs]
+        cached = np.array([entry is not None for entry in entries], dtype=bool)
+        if cached.any():
+            hits = np.flatnonzero(cached)
+            cached_matrices = np.array([entries[i][0] for i in hits])
+            unchanged = np.all(cached_matrices == matrices[hits], axis=(1, 2))
+            for i in hits[unchanged]:
+                mins[i], maxs[i] = entries[i][1], entries[i][2]
+            cached[hits[~unchanged]] = False
+
+        stale = np.flatnonzero(~cached)
+        if len(stale):
+            world = corners[stale] @ matrices[stale, :3, :3].transpose(0, 2, 1) + matrices[stale, None, :3, 3]
+            mins[stale] = world.min(axis=1)
+            maxs[stale] = world.max(axis=1)
+
+            if exact:
+                depsgraph = bpy.context.evaluated_depsgraph_get()
+                for i in stale:
+                    if objs[i].type == 'MESH':
+                        bounds = self._exact_bounds(objs[i], matrices[i], depsgraph)
+                        if bounds is not None:
+                            mins[i], maxs[i] = bounds
+
+            for i in stale:
+                cache[objs[i].session_uid] = (matrices[i].copy(), mins[i].copy(), maxs[i].copy())
+
+        return mins, maxs
+
+
+AABB_ENGINE = AABBEngine()
+
+
+class SceneSnapshot:
+    """Frozen copy of the scene's object data for one depsgraph generation, paged by query_scene"""
+
+    def __init__(self, scene, generation):
+        self.scene_name = scene.name
+        self.generation = generation
+        objs = list(scene.objects)
+        count = len(objs)
+
+        self.names = np.array([obj.name for obj in objs], dtype=str)
+        self.types = np.array([obj.type for obj in objs], dtype=str)
+        self.collections = [{c.name for c in obj.users_collection} for obj in objs]
+        self.rows = [
+            {
+                "parent": obj.parent.name if obj.parent else None,
+                "location": list(obj.location),
+                "rotation": list(obj.rotation_euler),
+                "scale": list(obj.scale),
+                "visible": obj.visible_get(),
+                "materials": [slot.material.name for slot in obj.material_slots if slot.material],
+            }
+            for obj in objs
+        ]
+
+        # World AABBs, objects without geometry collapse to their world position
+        self.mins = np.empty((count, 3))
+        self.maxs = np.empty((count, 3))
+        geometry = [i for i, obj in enumerate(objs) if obj.type in GEOMETRY_OBJECT_TYPES]
+        others = [i for i, obj in enumerate(objs) if obj.type not in GEOMETRY_OBJECT_TYPES]
+        if geometry:
+            self.mins[geometry], self.maxs[geometry] = AABB_ENGINE.compute([objs[i] for i in geometry])
+        if others:
+            positions = np.array([objs[i].matrix_world.translation for i in others], dtype=np.float64)
+            self.mins[others] = positions
+            self.maxs[others] = positions
+
+        self._orders = {}
+
+    def __len__(self):
+        return len(self.names)
+
+    def sort_key(self, index, sort_by):
+        name = str(self.names[index])
+        if sort_by == "name":
+            return (name, name)
+        if sort_by == "type":
+            return (str(self.types[index]), name)
+        if sort_by == "size":
+            return (float((self.maxs[index] - self.mins[index]).max()), name)
+        axis = "xyz".index(sort_by)
+        return (float((self.mins[index, axis] + self.maxs[index, axis]) / 2), name)
+
+    def _order(self, sort_by):
+        """Row indices sorted by (key, name), with the matching keys for cursor bisection"""
+        if sort_by not in self._orders:
+            order = sorted(range(len(self)), key=lambda i: self.sort_key(i, sort_by))
+            keys = [self.sort_key(i, sort_by) for i in order]
+            self._orders[sort_by] = (np.array(order, dtype=np.int64), keys)
+        return self._orders[sort_by]
+
+    def filter_mask(self, types=None, collection=None, name_prefix=None, bbox=None):
+        mask = np.ones(len(self), dtype=bool)
+        if types:
+            mask &= np.isin(self.types, [t.upper() for t in types])
+        if name_prefix:
+            mask &= np.char.startswith(self.names, name_prefix)
+        if collection:
+            mask &= np.array([collection in names for names in self.collections], dtype=bool)
+        if bbox:
+            region_min = np.asarray(bbox[0], dtype=np.float64)
+            region_max = np.asarray(bbox[1], dtype=np.float64)
+            mask &= np.all(self.maxs >= region_min, axis=1) & np.all(self.mins <= region_max, axis=1)
+        return mask
+
+    def page(self, mask, sort_by, descending, after, limit):
+        """Returns (row indices, has_more) for the rows following the `after` sort key"""
+        order, keys = self._order(sort_by)
+        if after is None:
+            candidates = order[::-1] if descending else order
+        elif descending:
+            candidates = order[:bisect.bisect_left(keys, after)][::-1]
+        else:
+            candidates = order[bisect.bisect_right(keys, after):]
+
+        candidates = candidates[mask[candidates]]
+        return candidates[:limit], len(candidates) > limit
+
+    def row(self, index, fields):
+        data = self.rows[index]
+        info = {"name": str(self.names[index])}
+        for field in fields:
+            if field == "type":
+                info["type"] = str(self.types[index])
+            elif field == "collections":
+                info["collections"] = sorted(self.collections[index])
+            elif field == "world_bounding_box":
+                info["world_bounding_box"] = [self.mins[index].tolist(), self.maxs[index].tolist()]
+            else:
+                info[field] = data[field]
+        return info
+
+class LODBuilder:
+    """Builds decimated copies of meshes, stored as "{mesh}_LOD{level}".
+
+    LOD meshes stay in the blend file with a fake user and are tagged with a
+    fingerprint of the source geometry and the decimation ratio, so they are
+    reused until the source mesh is edited or a different ratio is asked for.
+    """
+
+    SOURCE_KEY = "blendermcp_lod_source"
+    RATIO_KEY = "blendermcp_lod_ratio"
+    FINGERPRINT_KEY = "blendermcp_lod_fingerprint"
+
+    @staticmethod
+    def triangle_count(mesh):
+        count = len(mesh.polygons)
+        if not count:
+            return 0
+        totals = np.empty(count, dtype=np.int32)
+        mesh.polygons.foreach_get("loop_total", totals)
+        return int((totals - 2).sum())
+
+    @staticmethod
+    def fingerprint(mesh, ratio):
+        """Hash of the mesh topology and vertex positions plus the decimation ratio"""
+        digest = hashlib.sha1()
+        for collection, attr, dtype, width in (
+            (mesh.vertices, "co", np.float32, 3),
+            (mesh.loops, "vertex_index", np.int32, 1),
+            (mesh.polygons, "loop_total", np.int32, 1),
+        ):
+            values = np.empty(len(collection) * width, dtype=dtype)
+            collection.foreach_get(attr, values)
+            digest.update(values.tobytes())
+        digest.update(f"{ratio:.4f}".encode())
+        return digest.hexdigest()
+
+    @staticmethod
+    def lod_name(mesh_name, level):
+        return f"{mesh_name}_LOD{level}"
+
+    def is_lod(self, mesh):
+        return self.SOURCE_KEY in mesh
+
+    def build(self, obj, level, ratio):
+        """Return (lod_mesh, cached) for one level of obj's mesh, decimating only if needed"""
+        mesh = obj.data
+        fingerprint = self.fingerprint(mesh, ratio)
+        existing = bpy.data.meshes.get(self.lod_name(mesh.name, level))
+        if existing is not None and existing.get(self.FINGERPRINT_KEY) == fingerprint:
+            return existing, True
+
+        # Decimate the base mesh alone: the object's own modifiers still apply on top of the LOD
+        muted = [m for m in obj.modifiers if m.show_viewport]
+        for modifier in muted:
+            modifier.show_viewport = False
+        decimate = obj.modifiers.new("BlenderMCP_LOD", 'DECIMATE')
+        decimate.decimate_type = 'COLLAPSE'
+        decimate.ratio = ratio
+        try:
+            depsgraph = bpy.context.evaluated_depsgraph_get()
+            lod = bpy.data.meshes.new_from_object(
+                obj.evaluated_get(depsgraph), preserve_all_data_layers=True, depsgraph=depsgraph
+            )
+        finally:
+            obj.modifiers.remove(decimate)
+            for modifier in muted:
+                modifier.show_viewport = True
+
+        if existing is not None:
+            bpy.data.meshes.remove(existing)
+        lod.name = self.lod_name(mesh.name, level)
+        lod.use_fake_user = True
+        lod[self.SOURCE_KEY] = mesh.name
+        lod[self.RATIO_KEY] = ratio
+        lod[self.FINGERPRINT_KEY] = fingerprint
+        return lod, False
+
+    def current_lod(self, mesh, level):
+        """Deepest up-to-date LOD of mesh at or above level, or None"""
+        for candidate in range(level, 0, -1):
+            lod = bpy.data.meshes.get(self.lod_name(mesh.name, candidate))
+            if lod is None or self.RATIO_KEY not in lod:
+                continue
+            if lod.get(self.FINGERPRINT_KEY) == self.fingerprint(mesh, lod[self.RATIO_KEY]):
+                return lod
+        return None
+
+    def swap_in(self, objects, level):
+        """Point every mesh object at its LOD for the given level, returns what restore() needs"""
+        swapped = []
+        lods = {}
+        for obj in objects:
+            if obj.type != 'MESH' or obj.data is None or self.is_lod(obj.data):
+                continue
+            mesh = obj.data
+            if mesh.name not in lods:
+                lods[mesh.name] = self.current_lod(mesh, level)
+            lod = lods[mesh.name]
+            if lod is not None:
+                swapped.append((obj, mesh))
+                obj.data = lod
+        return swapped
+
+    @staticmethod
+    def restore(swapped):
+        for obj, mesh in swapped:
+            obj.data = mesh
+
+
+LOD_BUILDER = LODBuilder()
+
+
+# Marks the worker's result line among everything else Blender prints to stdout
+EXPORT_RESULT_PREFIX = "BLENDERMCP_EXPORT_RESULT "
+# Last stderr lines of a worker kept for the error when it dies
+EXPORT_WORKER_STDERR_LINES = 20
+
+# Runs inside `blender --background`: one JSON job per stdin line, one result line per job
+EXPORT_WORKER_SCRIPT = r'''
+import bpy, json, os, sys
+
+RESULT_PREFIX = %r
+
+def export(job, options):
+    bpy.ops.export_scene.gltf(filepath=job["filepath"], export_format=job["export_format"],
+                              use_selection=False, **options)
+    return os.path.getsize(job["filepath"])
+
+for line in sys.stdin:
+    job = json.loads(line)
+    result = {}
+    try:
+        bpy.ops.wm.open_mainfile(filepath=job["blend"], load_ui=False)
+        supported = set(bpy.ops.export_scene.gltf.get_rna_type().properties.keys())
+        options = {k: v for k, v in job["options"].items() if k in supported}
+        if job.get("compare"):
+            result["baseline_size"] = export(job, {})
+        scaled = 0
+        max_size = job.get("max_texture_size")
+        for img in bpy.data.images if max_size else ():
+            if img.source == 'FILE' and img.has_data and max(img.size) > max_size:
+                factor = max_size / max(img.size)
+                img.scale(max(1, int(img.size[0] * factor)), max(1, int(img.size[1] * factor)))
+                scaled += 1
+        result["scaled"] = scaled
+        result["size"] = export(job, options)
+    except Exception as e:
+        result = {"error": str(e)}
+    sys.stdout.write(RESULT_PREFIX + json.dumps(result) + "\n")
+    sys.stdout.flush()
+''' % EXPORT_RESULT_PREFIX
+
+
+class ExportWorkerPool:
+    """Headless Blender processes that export snapshot .blend files.
+
+    Workers are started on demand, up to `size`, and reused for later
+    exports so Blender's startup cost is paid once. A worker that crashes
+    or runs past its timeout is killed and replaced by the next export.
+    """
+
+    def __init__(self, size):
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._processes = set()
+
+    def _start(self):
+        process = subprocess.Popen(
+            [bpy.app.binary_path, "--background", "--factory-startup", "--python-expr", EXPORT_WORKER_SCRIPT],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            bufsize=1,
+        )
+        # Drained continuously so a chatty worker never blocks on a full pipe
+        process.stderr_tail = deque(maxlen=EXPORT_WORKER_STDERR_LINES)
+        process.stderr_reader = threading.Thread(target=process.stderr_tail.extend, args=(process.stderr,),
+                                                 name="blendermcp-export-stderr", daemon=True)
+        process.stderr_reader.start()
+        with self._lock:
+            self._processes.add(process)
+        return process
+
+    @staticmethod
+    def _failure(process, message):
+        # The worker is gone, let the reader catch up with what it wrote last
+        process.stderr_reader.join(1)
+        tail = "".join(process.stderr_tail).strip()
+        return f"{message}, stderr:\n{tail}" if tail else message
+
+    def _discard(self, process):
+        process.kill()
+        with self._lock:
+            self._processes.discard(process)
+
+    def run(self, job, timeout=EXPORT_WORKER_TIMEOUT):
+        """Export one job on a free worker, blocking until it is done, and return the worker's result"""
+        with self._slots:
+            try:
+                process = self._idle.get_nowait()
+            except queue.Empty:
+                process = None
+            if process is None or process.poll() is not None:
+                process = self._start()
+
+            expired = threading.Event()
+            timer = threading.Timer(timeout, lambda: (expired.set(), process.kill()))
+            timer.start()
+            try:
+                process.stdin.write(json.dumps(job) + "\n")
+                process.stdin.flush()
+                for line in process.stdout:
+                    if line.startswith(EXPORT_RESULT_PREFIX):
+                        result = json.loads(line[len(EXPORT_RESULT_PREFIX):])
+                        break
+                else:
+                    if expired.is_set():
+                        raise TimeoutError(self._failure(process, f"Background export timed out after {timeout}s"))
+                    code = process.wait()
+                    raise RuntimeError(self._failure(process, f"Export worker exited with code {code}"))
+            except Exception:
+                self._discard(process)
+                raise
+            finally:
+                timer.cancel()
+            self._idle.put(process)
+            return result
+
+    def close(self):
+        with self._lock:
+            processes, self._processes = self._processes, set()
+        for process in processes:
+            process.kill()
+
+
+EXPORT_WORKER_POOL = ExportWorkerPool(EXPORT_WORKERS)
+
+# Screenshot formats Pillow can encode; PNG is also written without it
+SCREENSHOT_FORMATS = {"png": "PNG", "jpeg": "JPEG", "jpg": "JPEG", "webp": "WEBP"}
+SCREENSHOT_QUALITY = 85
+# Encoded screenshots kept for repeat requests, bounded by count and total size
+SCREENSHOT_CACHE_SIZE = 16
+SCREENSHOT_CACHE_MAX_BYTES = 32 * 1024 * 1024
+# Contact sheet views: direction from the subject towards the eye, and the view's up axis
+CONTACT_SHEET_VIEWS = {
+    "front": ((0, -1, 0), (0, 0, 1)),
+    "back": ((0, 1, 0), (0, 0, 1)),
+    "right": ((1, 0, 0), (0, 0, 1)),
+    "left": ((-1, 0, 0), (0, 0, 1)),
+    "top": ((0, 0, 1), (0, 1, 0)),
+    "bottom": ((0, 0, -1), (0, -1, 0)),
+    "iso": ((1, -1, 1), (0, 0, 1)),
+}
+CONTACT_SHEET_DEFAULT_VIEWS = ("front", "right", "top", "iso")
+# Vertical field of view of the perspective "iso" view
+CONTACT_SHEET_ISO_FOV = math.radians(40)
+
+
+def _downsample(pixels, max_size):
+    """Box-filter an HxWxC uint8 image by the smallest integer factor that fits max_size"""
+    height, width = pixels.shape[:2]
+    factor = -(-max(width, height) // max_size)
+    if factor <= 1:
+        return pixels
+    height, width = height // factor, width // factor
+    blocks = pixels[:height * factor, :width * factor].reshape(height, factor, width, factor, -1)
+    return blocks.mean(axis=(1, 3)).round().astype(np.uint8)
+
+
+def _encode_png(pixels):
+    """Minimal PNG writer for HxWx3/4 uint8 pixels, used when Pillow is missing"""
+    height, width, channels = pixels.shape
+    color_type = {3: 2, 4: 6}[channels]
+    # Every scanline starts with filter type 0 (none)
+    raw = np.concatenate([np.zeros((height, 1), dtype=np.uint8), pixels.reshape(height, width * channels)], axis=1)
+
+    def chunk(tag, data):
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+    header = struct.pack(">IIBBBBB", width, height, 8, color_type, 0, 0, 0)
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header)
+            + chunk(b"IDAT", zlib.compress(raw.tobytes(), 6)) + chunk(b"IEND", b""))
+
+
+def _encode_image(pixels, image_format, quality=SCREENSHOT_QUALITY):
+    """Encode top-down RGB pixels, returns (bytes, format actually used)"""
+    pil_format = SCREENSHOT_FORMATS.get(image_format.lower())
+    if pil_format is None:
+        raise ValueError(f"Unsupported screenshot format: {image_format}. Available: {sorted(SCREENSHOT_FORMATS)}")
+    if PILImage is None:
+        return _encode_png(pixels), "png"
+    buffer = io.BytesIO()
+    options = {"quality": quality} if pil_format in ("JPEG", "WEBP") else {}
+    try:
+        PILImage.fromarray(pixels).save(buffer, format=pil_format, **options)
+    except (KeyError, OSError, ValueError) as e:
+        # e.g. a Pillow built without WebP support
+        print(f"Encoding screenshot as {pil_format} failed, falling back to PNG: {str(e)}")
+        return _encode_png(pixels), "png"
+    return buffer.getvalue(), pil_format.lower()
+
+
+# Primitives build_scene can create, with their parameter defaults
+BUILD_PRIMITIVES = {
+    "cube": {"size": 2.0},
+    "plane": {"size": 2.0, "x_segments": 1, "y_segments": 1},
+    "grid": {"size": 2.0, "x_segments": 10, "y_segments": 10},
+    "circle": {"radius": 1.0, "segments": 32, "fill": True},
+    "uv_sphere": {"radius": 1.0, "segments": 32, "rings": 16},
+    "ico_sphere": {"radius": 1.0, "subdivisions": 2},
+    "cylinder": {"radius": 1.0, "depth": 2.0, "segments": 32},
+    "cone": {"radius1": 1.0, "radius2": 0.0, "depth": 2.0, "segments": 32},
+    "empty": {},
+}
+# Object spec keys that are not primitive parameters
+BUILD_OBJECT_KEYS = {"name", "primitive", "instance_of", "location", "rotation", "scale", "material",
+                     "modifiers", "parent", "smooth"}
+
+
+class SceneBuilder:
+    """Applies a declarative scene spec with bpy.data and bmesh, without operators.
+
+    Objects built from the same primitive and parameters share one mesh, as
+    do objects naming another with instance_of, so repeated parts cost one
+    mesh however often they appear. The whole spec is validated before
+    anything is created.
+    """
+
+    def __init__(self):
+        self.meshes = {}
+        self.created = {}
+        self.references = []
+        self.warnings = []
+
+    @staticmethod
+    def _primitive_params(spec):
+        primitive = spec.get("primitive", "cube")
+        params = dict(BUILD_PRIMITIVES[primitive])
+        for key, value in spec.items():
+            if key not in BUILD_OBJECT_KEYS:
+                if key not in params:
+                    raise ValueError(f"Unknown parameter '{key}' for {primitive} '{spec.get('name')}'. "
+                                     f"Available: {sorted(params)}")
+                params[key] = value
+        return primitive, params
+
+    def validate(self, objects, materials):
+        names = [spec.get("name") for spec in objects]
+        if any(not name for name in names):
+            raise ValueError("Every object needs a name")
+        duplicates = sorted({name for name in names if names.count(name) > 1})
+        if duplicates:
+            raise ValueError(f"Duplicate object names: {duplicates}")
+        known = set(names)
+        for spec in objects:
+            if spec.get("instance_of"):
+                if spec["instance_of"] not in known:
+                    raise ValueError(f"'{spec['name']}' is an instance of unknown object '{spec['instance_of']}'")
+            else:
+                primitive = spec.get("primitive", "cube")
+                if primitive not in BUILD_PRIMITIVES:
+                    raise ValueError(f"Unknown primitive '{primitive}'. Available: {list(BUILD_PRIMITIVES)}")
+                self._primitive_params(spec)
+            parent = spec.get("parent")
+            if parent and parent not in known and bpy.data.objects.get(parent) is None:
+                raise ValueError(f"Parent '{parent}' of '{spec['name']}' not found")
+            material = spec.get("material")
+            if material and material not in materials and bpy.data.materials.get(material) is None:
+                raise ValueError(f"Material '{material}' of '{spec['name']}' is not defined")
+        self._check_cycles(objects, "instance_of")
+        self._check_cycles(objects, "parent")
+
+    @staticmethod
+    def _check_cycles(objects, key):
+        """Reject specs whose instance_of or parent references loop back to themselves"""
+        links = {spec["name"]: spec.get(key) for spec in objects if spec.get(key)}
+        for name in links:
+            seen = [name]
+            current = links[name]
+            while current in links:
+                if current in seen:
+                    raise ValueError(f"Circular {key}: {' -> '.join(seen + [current])}")
+                seen.append(current)
+                current = links[current]
+
+    @staticmethod
+    def build_material(name, spec):
+        """Create or update a Principled BSDF material from color/metallic/roughness/emission/alpha"""
+        material = bpy.data.materials.get(name) or bpy.data.materials.new(name)
+        material.use_nodes = True
+        principled = next((n for n in material.node_tree.nodes if n.type == 'BSDF_PRINCIPLED'), None)
+        if principled is None:
+            return material
+        inputs = principled.inputs
+        if "color" in spec:
+            color = list(spec["color"]) + [1.0] * (4 - len(spec["color"]))
+            inputs["Base Color"].default_value = color
+            material.diffuse_color = color
+        for key, socket in (("metallic", "Metallic"), ("roughness", "Roughness"), ("alpha", "Alpha")):
+            if key in spec:
+                inputs[socket].default_value = spec[key]
+        if "emission" in spec:
+            emission = list(spec["emission"]) + [1.0] * (4 - len(spec["emission"]))
+            # Renamed in Blender 4.0
+            socket = inputs.get("Emission Color") or inputs.get("Emission")
+            socket.default_value = emission
+            if "Emission Strength" in inputs:
+                inputs["Emission Strength"].default_value = spec.get("emission_strength", 1.0)
+        if spec.get("alpha", 1.0) < 1.0:
+            material.blend_method = 'BLEND'
+        return material
+
+    def mesh_for(self, spec):
+        """Shared mesh for a primitive spec, built with bmesh on first use"""
+        import bmesh
+        
+        primitive, params = self._primitive_params(spec)
+        smooth = bool(spec.get("smooth", primitive in ("uv_sphere", "ico_sphere")))
+        key = json.dumps([primitive, params, smooth], sort_keys=True)
+        mesh = self.meshes.get(key)
+        if mesh is not None:
+            return mesh
+
+        bm = bmesh.new()
+        try:
+            if primitive == "cube":
+                bmesh.ops.create_cube(bm, size=params["size"], calc_uvs=True)
+            elif primitive in ("plane", "grid"):
+                bmesh.ops.create_grid(bm, x_segments=params["x_segments"], y_segments=params["y_segments"],
+                                      size=params["size"] / 2, calc_uvs=True)
+            elif primitive == "circle":
+                bmesh.ops.create_circle(bm, cap_ends=params["fill"], segments=params["segments"],
+                                        radius=params["radius"], calc_uvs=True)
+            elif primitive == "uv_sphere":
+                bmesh.ops.create_uvsphere(bm, u_segments=params["segments"], v_segments=params["rings"],
+                                          radius=params["radius"], calc_uvs=True)
+            elif primitive == "ico_sphere":
+                bmesh.ops.create_icosphere(bm, subdivisions=params["subdivisions"], radius=params["radius"],
+                                           calc_uvs=True)
+            elif primitive == "cylinder":
+                bmesh.ops.create_cone(bm, cap_ends=True, segments=params["segments"], radius1=params["radius"],
+                                      radius2=params["radius"], depth=params["depth"], calc_uvs=True)
+            elif primitive == "cone":
+                bmesh.ops.create_cone(bm, cap_ends=True, segments=params["segments"], radius1=params["radius1"],
+                                      radius2=params["radius2"], depth=params["depth"], calc_uvs=True)
+            mesh = bpy.data.meshes.new(spec["name"])
+            bm.to_mesh(mesh)
+        finally:
+            bm.free()
+
+        if smooth and len(mesh.polygons):
+            mesh.polygons.foreach_set("use_smooth", np.ones(len(mesh.polygons), dtype=bool))
+        self.meshes[key] = mesh
+        return mesh
+
+    @staticmethod
+    def assign_material(obj, name, source=None):
+        """The first user of a shared mesh sets its material, objects wanting another one link it per object"""
+        mesh = obj.data
+        if name is None:
+            if source is not None:
+                if source.material_slots and source.material_slots[0].link == 'OBJECT':
+                    obj.material_slots[0].link = 'OBJECT'
+                    obj.material_slots[0].material = source.material_slots[0].material
+            elif not mesh.materials:
+                # An empty slot, so a later user's material doesn't land on this object too
+                mesh.materials.append(None)
+            elif mesh.materials[0] is not None:
+                # The shared mesh carries another object's material
+                obj.material_slots[0].link = 'OBJECT'
+                obj.material_slots[0].material = None
+            return
+        material = bpy.data.materials[name]
+        if not mesh.materials:
+            mesh.materials.append(material)
+        elif mesh.materials[0] != material:
+            # Per-object material without copying the shared mesh
+            obj.material_slots[0].link = 'OBJECT'
+            obj.material_slots[0].material = material
+
+    def add_modifiers(self, obj, modifiers):
+        for index, spec in enumerate(modifiers):
+            spec = dict(spec)
+            modifier_type = str(spec.pop("type", "")).upper()
+            try:
+                modifier = obj.modifiers.new(spec.pop("name", modifier_type.title()), modifier_type)
+            except (TypeError, RuntimeError) as e:
+                self.warnings.append(f"{obj.name}: modifier {index} ({modifier_type}): {e}")
+                continue
+            for attr, value in spec.items():
+                # Object references (e.g. a mirror object) are given by name, resolved once everything exists
+                if isinstance(value, str) and attr.endswith("object"):
+                    self.references.append((obj, modifier, attr, value))
+                    continue
+                self._set_modifier_attr(obj, modifier, attr, value)
+
+    def _set_modifier_attr(self, obj, modifier, attr, value):
+        try:
+            setattr(modifier, attr, value)
+        except (AttributeError, TypeError, ValueError) as e:
+            self.warnings.append(f"{obj.name}: modifier {modifier.name}.{attr}: {e}")
+
+    def resolve_references(self):
+        """Point modifier object references at the objects they name, spec objects first"""
+        for obj, modifier, attr, name in self.references:
+            target = self.created.get(name) or bpy.data.objects.get(name)
+            if target is None:
+                self.warnings.append(f"{obj.name}: modifier {modifier.name}.{attr}: object '{name}' not found")
+                continue
+            self._set_modifier_attr(obj, modifier, attr, target)
+        self.references = []
+
+    def build_object(self, spec, collection):
+        instance_of = spec.get("instance_of")
+        if instance_of:
+            source = self.created[instance_of]
+            data = source.data
+        elif spec.get("primitive", "cube") == "empty":
+            data = None
+        else:
+            data = self.mesh_for(spec)
+
+        obj = bpy.data.objects.new(spec["name"], data)
+        if instance_of and data is None:
+            obj.empty_display_type = source.empty_display_type
+        if data is not None:
+            self.assign_material(obj, spec.get("material"), source if instance_of else None)
+        if "location" in spec:
+            obj.location = spec["location"]
+        if "rotation" in spec:
+            obj.rotation_euler = spec["rotation"]
+        if "scale" in spec:
+            scale = spec["scale"]
+            obj.scale = (scale, scale, scale) if isinstance(scale, (int, float)) else scale
+        collection.objects.link(obj)
+        if spec.get("modifiers"):
+            self.add_modifiers(obj, spec["modifiers"])
+        self.created[spec["name"]] = obj
+        return obj
+
+
+# ID property tagging library collections and placed instances with their source asset
+ASSET_KEY_PROP = "blendermcp_asset"
+ASSET_INSTANCE_MODES = ("linked", "collection")
+ASSET_INSTANCE_KEYS = {"name", "location", "rotation", "scale"}
+
+
+class AssetInstancer:
+    """Places imported assets as instances instead of full copies.
+
+    An asset imported with instances is kept once in a library collection
+    that is not linked to the scene. "collection" mode adds an empty
+    instancing that collection per transform, "linked" mode copies its
+    objects with their mesh data shared. Importing the same asset again
+    reuses the library without downloading anything, and the glTF exporter
+    writes each shared mesh once for all the nodes using it.
+    """
+
+    @staticmethod
+    def validate(instances, mode):
+        if mode not in ASSET_INSTANCE_MODES:
+            raise ValueError(f"Unknown instance_mode '{mode}'. Available: {list(ASSET_INSTANCE_MODES)}")
+        if not isinstance(instances, list) or not instances:
+            raise ValueError("instances must be a non-empty list of transforms")
+        for index, instance in enumerate(instances):
+            if not isinstance(instance, dict):
+                raise ValueError(f"Instance {index} must be an object with location/rotation/scale")
+            unknown = set(instance) - ASSET_INSTANCE_KEYS
+            if unknown:
+                raise ValueError(f"Unknown keys {sorted(unknown)} in instance {index}. "
+                                 f"Available: {sorted(ASSET_INSTANCE_KEYS)}")
+
+    @staticmethod
+    def find(key):
+        """Library collection of an asset imported before, or None"""
+        for collection in bpy.data.collections:
+            if collection.get(ASSET_KEY_PROP) == key:
+                return collection
+        return None
+
+    @staticmethod
+    def make_library(key, objects, name):
+        """Move freshly imported objects out of the scene into a library collection for key"""
+        library = bpy.data.collections.new(name)
+        library[ASSET_KEY_PROP] = key
+        # Not linked to any scene, the fake user keeps it in the saved file
+        library.use_fake_user = True
+        for obj in objects:
+            for collection in list(obj.users_collection):
+                collection.objects.unlink(obj)
+            library.objects.link(obj)
+        return library
+
+    @staticmethod
+    def _matrix(instance):
+        scale = instance.get("scale", 1.0)
+        if isinstance(scale, (int, float)):
+            scale = (scale, scale, scale)
+        return mathutils.Matrix.LocRotScale(
+            mathutils.Vector(instance.get("location", (0.0, 0.0, 0.0))),
+            mathutils.Euler(instance.get("rotation", (0.0, 0.0, 0.0))),
+            mathutils.Vector(scale))
+
+    @staticmethod
+    def _copy_linked(library, collection):
+        """Copies of the library objects sharing its data, with parents and modifier targets remapped"""
+        copies = {obj: obj.copy() for obj in library.objects}
+        for source, copy in copies.items():
+            if source.parent in copies:
+                copy.parent = copies[source.parent]
+            for modifier in copy.modifiers:
+                target = getattr(modifier, "object", None)
+                if target in copies:
+                    modifier.object = copies[target]
+            collection.objects.link(copy)
+        return [copies[obj] for obj in library.objects if obj.parent not in copies]
+
+    def place(self, library, instances, mode, name=None):
+        """Add one instance of library per transform to the active collection"""
+        collection = bpy.context.collection
+        key = library[ASSET_KEY_PROP]
+        placed = []
+        for instance in instances:
+            matrix = self._matrix(instance)
+            label = instance.get("name") or name or library.name
+            if mode == "collection":
+                top = bpy.data.objects.new(label, None)
+                top.instance_type = 'COLLECTION'
+                top.instance_collection = library
+                top.matrix_basis = matrix
+                collection.objects.link(top)
+            else:
+                roots = self._copy_linked(library, collection)
+                if len(roots) == 1:
+                    top = roots[0]
+                    top.name = label
+                    top.matrix_basis = matrix @ top.matrix_basis
+                else:
+                    top = bpy.data.objects.new(label, None)
+                    top.matrix_basis = matrix
+                    collection.objects.link(top)
+                    for root in roots:
+                        root.parent = top
+            top[ASSET_KEY_PROP] = key
+            placed.append(top.name)
+        return {"instances": placed, "instance_mode": mode, "library": library.name}
+
+    def instance_imported(self, key, objects, instances, mode, name):
+        """Turn a fresh import into a library and place instances of it"""
+        if not objects:
+            raise RuntimeError("Nothing was imported to instance")
+        library = self.make_library(key, objects, name)
+        return self.place(library, instances, mode, name)
+
+
+ASSET_INSTANCER = AssetInstancer()
+
+
+# Compiled snippets kept for resubmission, and per-session namespaces kept alive
+CODE_CACHE_SIZE = 256
+CODE_SESSIONS = 16
+# Seconds a snippet may run by default; the MCP server waits this plus CODE_TIMEOUT_GRACE
+CODE_TIME_BUDGET = 10.0
+# How often the watchdog checks a running snippet's budget and cancel flag
+CODE_WATCHDOG_INTERVAL = 0.05
+# How often an interruption is raised again until the snippet stops
+CODE_WATCHDOG_REFIRE_INTERVAL = 0.001
+# Interruptions raised before giving up on a snippet that keeps swallowing them
+CODE_WATCHDOG_MAX_FIRES = 10000
+
+
+class ExecutionInterrupted(BaseException):
+    """Raised into a running snippet when its budget runs out or it is cancelled.
+
+    A BaseException so a snippet's own `except Exception` can't swallow it.
+    """
+
+
+class ExecutionWatchdog(threading.Thread):
+    """Interrupts a snippet running on another thread once its deadline passes or it is cancelled.
+
+    The interruption is an asynchronous ExecutionInterrupted raised in the
+    target thread, which Python delivers at the next bytecode boundary, so
+    even a tight `while True: pass` stops. Code stuck inside a single C call
+    (e.g. one long operator) is interrupted when that call returns. The
+    exception is raised again every CODE_WATCHDOG_REFIRE_INTERVAL, since one
+    may land in code that swallows it (an app handler, an operator or the
+    snippet's own bare except), until disarm(), until the target thread no
+    longer has a frame of the snippet on its stack, or CODE_WATCHDOG_MAX_FIRES
+    interruptions have been raised.
+    """
+
+    def __init__(self, thread_id, deadline, cancel=None, filename=None):
+        super().__init__(name="blendermcp-watchdog", daemon=True)
+        self.thread_id = thread_id
+        self.deadline = deadline
+        self.cancel = cancel
+        self.filename = filename
+        self.reason = None
+        self.fires = 0
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+        self._armed = True
+
+    def _in_snippet(self):
+        """Whether the target thread is still running code compiled from the snippet"""
+        if self.filename is None:
+            return True
+        frame = sys._current_frames().get(self.thread_id)
+        while frame is not None:
+            if frame.f_code.co_filename == self.filename:
+                return True
+            frame = frame.f_back
+        return False
+
+    def run(self):
+        # Once fired, re-raise quickly: the next delivery may again land where it is swallowed
+        while not self._done.wait(CODE_WATCHDOG_INTERVAL if self.reason is None else CODE_WATCHDOG_REFIRE_INTERVAL):
+            if self.cancel is not None and self.cancel.is_set():
+                reason = "Execution cancelled"
+            elif time.perf_counter() > self.deadline:
+                reason = "Execution time budget exceeded"
+            else:
+                continue
+            with self._lock:
+                if not self._armed or not self._in_snippet():
+                    # The snippet returned, its teardown must not be interrupted
+                    return
+                self.reason = self.reason or reason
+                ctypes.pythonapi.PyThreadState_SetAsyncExc(
+                    ctypes.c_ulong(self.thread_id), ctypes.py_object(ExecutionInterrupted))
+                self.fires += 1
+                if self.fires >= CODE_WATCHDOG_MAX_FIRES:
+                    return
+
+    def disarm(self):
+        """Stop watching; drops an interruption that fired but was not delivered yet.
+
+        May itself receive an interruption raised just before; callers retry.
+        """
+        self._done.set()
+        with self._lock:
+            self._armed = False
+            if self.reason is not None:
+                ctypes.pythonapi.PyThreadState_SetAsyncExc(ctypes.c_ulong(self.thread_id), None)
+
+
+class StdoutCapture:
+    """sys.stdout stand-in that collects writes from capturing threads.
+
+    Installed once instead of redirecting sys.stdout for every snippet, so
+    output from other threads still reaches the real stream.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self._local = threading.local()
+
+    def start(self):
+        self._local.buffer = []
+
+    def stop(self):
+        """Stop capturing on this thread, returns what was written"""
+        buffer, self._local.buffer = getattr(self._local, "buffer", None) or [], None
+        return "".join(buffer)
+
+    def write(self, text):
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is None:
+            return self.stream.write(text)
+        buffer.append(text)
+        return len(text)
+
+    def flush(self):
+        if getattr(self._local, "buffer", None) is None:
+            self.stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+    @classmethod
+    def install(cls):
+        if not isinstance(sys.stdout, cls):
+            sys.stdout = cls(sys.stdout)
+        return sys.stdout
+
+
+class CodeExecutor:
+    """Runs agent-submitted Python with compiled-code caching and optional persistent namespaces.
+
+    Snippets are compiled once per distinct source and reused from an LRU.
+    A named session keeps its namespace between calls, so variables and
+    imports carry over; without one each snippet gets a fresh namespace.
+    Namespaces start with bpy, bmesh, mathutils and friends already
+    imported. Output is captured through StdoutCapture.
+    """
+
+    def __init__(self, cache_size=CODE_CACHE_SIZE, max_sessions=CODE_SESSIONS):
+        self.cache_size = cache_size
+        self.max_sessions = max_sessions
+        self._compiled = OrderedDict()
+        self._sessions = OrderedDict()
+
+    def compile(self, code):
+        """Code object for a snippet, returns (code_object, was_cached)"""
+        digest = hashlib.sha1(code.encode("utf-8")).hexdigest()
+        compiled = self._compiled.get(digest)
+        if compiled is not None:
+            self._compiled.move_to_end(digest)
+            return compiled, True
+        compiled = compile(code, f"<mcp-snippet-{digest[:8]}>", "exec")
+        self._compiled[digest] = compiled
+        while len(self._compiled) > self.cache_size:
+            self._compiled.popitem(last=False)
+        return compiled, False
+
+    @staticmethod
+    def _new_namespace():
+        import bmesh
+        return {
+            "__name__": "__mcp__",
+            "bpy": bpy,
+            "bmesh": bmesh,
+            "mathutils": mathutils,
+            "Vector": mathutils.Vector,
+            "Matrix": mathutils.Matrix,
+            "Euler": mathutils.Euler,
+            "Quaternion": mathutils.Quaternion,
+            "math": math,
+            "np": np,
+        }
+
+    def namespace(self, session):
+        namespace = self._sessions.get(session)
+        if namespace is None:
+            namespace = self._sessions[session] = self._new_namespace()
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        else:
+            self._sessions.move_to_end(session)
+        return namespace
+
+    def reset(self, session):
+        self._sessions.pop(session, None)
+
+    def clear(self):
+        """Drop every session, e.g. once a file load leaves them pointing at removed data"""
+        self._sessions.clear()
+
+    def run(self, code, session=None, budget=CODE_TIME_BUDGET, cancel=None):
+        """Execute a snippet in a session's namespace, returns its output and timing.
+
+        Without a session the snippet runs in a fresh namespace. It is
+        interrupted once it runs longer than budget seconds (None for no
+        limit) or the cancel event is set.
+        """
+        compiled, cached = self.compile(code)
+        namespace = self.namespace(session) if session else self._new_namespace()
+
+        capture = StdoutCapture.install()
+        capture.start()
+        start = time.perf_counter()
+        watchdog = None
+        if budget is not None or cancel is not None:
+            deadline = start + budget if budget is not None else float("inf")
+            watchdog = ExecutionWatchdog(threading.get_ident(), deadline, cancel, compiled.co_filename)
+            watchdog.start()
+        error = None
+        started = False
+        # An interruption can arrive anywhere up to disarm(), including in the
+        # snippet's except handler or in this teardown, so it is retried until
+        # the watchdog is disarmed and capture stopped
+        while True:
+            try:
+                if not started:
+                    started = True
+                    try:
+                        exec(compiled, namespace)
+                    except BaseException as e:
+                        error = e
+                if watchdog is not None:
+                    watchdog.disarm()
+                duration = time.perf_counter() - start
+                output = capture.stop()
+                break
+            except ExecutionInterrupted:
+                continue
+        if watchdog is not None and watchdog.reason is not None:
+            # Whatever the snippet raised or swallowed, the interruption is what ended it
+            raise ExecutionInterrupted(watchdog.reason)
+        if error is not None:
+            raise error
+        return {
+            "output": output,
+            "duration_ms": round(duration * 1000, 3),
+            "compile_cached": cached,
+        }
+
+
+CODE_EXECUTOR = CodeExecutor()
+
+
+# Workers for the background phase of handlers (network and file I/O)
+HANDLER_WORKERS = 4
+HANDLER_POOL = ThreadPoolExecutor(max_workers=HANDLER_WORKERS, thread_name_prefix="blendermcp-worker")
+
+
+class BackgroundTask:
+    """Returned by a handler to split its work between threads.
+
+    `work` runs on the worker pool and must not touch bpy; anything it needs
+    from the scene (API keys, settings) is captured by the handler on the
+    main thread beforehand. `then` receives the result of `work` on the main
+    thread and returns the command result, or another BackgroundTask to chain
+    more background work. Without `then` the result of `work` is the command
+    result.
+    """
+
+    def __init__(self, work, then=None):
+        self.work = work
+        self.then = then
+
+
+# Keepalive frames are sent this often while a command with a request id is running
+PROGRESS_KEEPALIVE_INTERVAL = 5.0
+# Minimum spacing between byte count progress frames of one command
+PROGRESS_MIN_INTERVAL = 0.25
+
+
+class ClientChannel:
+    """A client socket shared by everything answering on it (main thread, workers, keepalives)"""
+
+    def __init__(self, sock):
+        self.sock = sock
+        self._lock = threading.Lock()
+
+    def send(self, frame, binary=None):
+        """Send one JSON frame, optionally followed by binary_length raw bytes; returns False once the client is gone"""
+        if binary is not None:
+            frame["binary_length"] = len(binary)
+        data = json.dumps(frame).encode('utf-8')
+        if binary is not None:
+            data += binary
+        with self._lock:
+            try:
+                self.sock.sendall(data)
+                return True
+            except Exception:
+                return False
+
+
+class ProgressReporter:
+    """Progress frames for one running command.
+
+    Stages are "download", "extract", "import" and "export", with done/total
+    counted in bytes where known. Safe to use from worker threads. Commands sent
+    without an id get a silent reporter, since such clients expect nothing
+    but the response on the socket.
+    """
+
+    def __init__(self, channel=None, request_id=None):
+        self.channel = channel
+        self.request_id = request_id
+        self._lock = threading.Lock()
+        self._stages = {}
+        self._last_sent = 0.0
+
+    def start(self, stage, total=None, message=None):
+        with self._lock:
+            self._stages[stage] = [0, total]
+        self._send(stage, 0, total, message)
+
+    def expect(self, stage, nbytes):
+        """Grow the expected total of a stage, e.g. when another download's size becomes known"""
+        with self._lock:
+            progress = self._stages.setdefault(stage, [0, None])
+            progress[1] = (progress[1] or 0) + nbytes
+
+    def advance(self, stage, nbytes):
+        with self._lock:
+            progress = self._stages.setdefault(stage, [0, None])
+            progress[0] += nbytes
+            done, total = progress
+            now = time.monotonic()
+            if now - self._last_sent < PROGRESS_MIN_INTERVAL and done != total:
+                return
+            self._last_sent = now
+        self._send(stage, done, total)
+
+    def note(self, stage, message):
+        """Send a message for a stage without changing its counts"""
+        with self._lock:
+            done, total = self._stages.get(stage, (0, None))
+        self._send(stage, done, total, message)
+
+    def _send(self, stage, done, total, message=None):
+        if self.channel is None or self.request_id is None:
+            return
+        frame = {"type": "progress", "id": self.request_id, "stage": stage, "done": done, "total": total}
+        if message:
+            frame["message"] = message
+        self.channel.send(frame)
+
+
 class BlenderMCPServer:
     def __init__(self, host='localhost', port=9876):
         self.host = host
@@ -34,6 +1824,28 @@ class BlenderMCPServer:
         self.running = False
         self.socket = None
         self.server_thread = None
+        # Scene change event subscribers (one queue per subscribed connection)
+        self.event_subscribers = []
+        self.event_lock = threading.Lock()
+        self._known_objects = None
+        self._pending_changes = None
+        # Bumped on every relevant depsgraph update, keys the scene snapshot cache
+        self._scene_generation = 0
+        self._scene_snapshots = OrderedDict()
+        # Encoded screenshots, emptied on any depsgraph update, undo or redo
+        self._view_generation = 0
+        self._screenshot_cache = OrderedDict()
+        self._screenshot_cache_bytes = 0
+        # Progress reporter of the command currently dispatched on the main thread
+        self._progress = ProgressReporter()
+        # Cancel flags of commands that are queued or running, by request id
+        self._cancel_events = {}
+        self._cancel_lock = threading.Lock()
+        self._cancel_event = None
+        # Generated assets downloading ahead of their import, keyed by task uuid / request id,
+        # as (future, time.monotonic() when started)
+        self._prefetched_assets = {}
+        self._prefetch_lock = threading.Lock()
     
     def start(self):
         if self.running:
@@ -54,6 +1866,18 @@ class BlenderMCPServer:
             self.server_thread.daemon = True
             self.server_thread.start()
             
+            # Watch the scene so subscribers get pushed change events
+            AABB_ENGINE.clear()
+            self._known_objects = set(bpy.context.scene.objects.keys())
+            if _on_depsgraph_update not in bpy.app.handlers.depsgraph_update_post:
+                bpy.app.handlers.depsgraph_update_post.append(_on_depsgraph_update)
+            if _on_undo_post not in bpy.app.handlers.undo_post:
+                bpy.app.handlers.undo_post.append(_on_undo_post)
+            if _on_redo_post not in bpy.app.handlers.redo_post:
+                bpy.app.handlers.redo_post.append(_on_redo_post)
+            if _on_load_post not in bpy.app.handlers.load_post:
+                bpy.app.handlers.load_post.append(_on_load_post)
+            
             print(f"BlenderMCP server started on {self.host}:{self.port}")
         except Exception as e:
             print(f"Failed to start server: {str(e)}")
@@ -61,6 +1885,17 @@ class BlenderMCPServer:
             
     def stop(self):
         self.running = False
+        self._drop_prefetches()
+        
+        # Stop watching the scene
+        for handler_list, handler in (
+            (bpy.app.handlers.depsgraph_update_post, _on_depsgraph_update),
+            (bpy.app.handlers.undo_post, _on_undo_post),
+            (bpy.app.handlers.redo_post, _on_redo_post),
+            (bpy.app.handlers.load_post, _on_load_post),
+        ):
+            if handler in handler_list:
+                handler_list.remove(handler)
         
         # Close socket
         if self.socket:
@@ -118,6 +1953,7 @@ class BlenderMCPServer:
         """Handle connected client"""
         print("Client handler started")
         client.settimeout(None)  # No timeout
+        channel = ClientChannel(client)
         buffer = b''
         
         try:
@@ -135,26 +1971,68 @@ class BlenderMCPServer:
                         command = json.loads(buffer.decode('utf-8'))
                         buffer = b''
                         
+                        # Event subscriptions take over the connection
+                        if command.get("type") == "subscribe_events":
+                            self._stream_scene_events(client)
+                            break
+                        
+                        # Cancellation is answered right here, the main thread may be busy with its target
+                        if command.get("type") == "cancel":
+                            self._cancel_command(channel, command)
+                            continue
+                        
+                        # Responses, progress and keepalive frames echo the request id
+                        request_id = command.get("id")
+                        progress = ProgressReporter(channel, request_id)
+                        finished = threading.Event()
+                        cancel = threading.Event()
+                        if request_id is not None:
+                            with self._cancel_lock:
+                                self._cancel_events[request_id] = cancel
+                        
+                        def respond(response, request_id=request_id, finished=finished):
+                            finished.set()
+                            if request_id is not None:
+                                with self._cancel_lock:
+                                    self._cancel_events.pop(request_id, None)
+                            # Raw bytes in a result (e.g. screenshots) travel after the JSON frame
+                            result = response.get("result")
+                            binary = result.pop("binary", None) if isinstance(result, dict) else None
+                            if binary is not None and request_id is None:
+                                # Clients without request ids only read plain JSON
+                                result["data"] = base64.b64encode(binary).decode("ascii")
+                                binary = None
+                            if request_id is not None:
+                                response["id"] = request_id
+                            if not channel.send(response, binary):
+                                print("Failed to send response - client disconnected")
+                        
+                        if request_id is not None:
+                            threading.Thread(target=self._send_keepalives, args=(channel, request_id, finished),
+                                             daemon=True).start()
+                        
                         # Execute command in Blender's main thread
-                        def execute_wrapper():
+                        def execute_wrapper(command=command, progress=progress, respond=respond, cancel=cancel):
+                            if cancel.is_set():
+                                # Cancelled while still queued behind other commands
+                                respond({"status": "error", "message": "Command cancelled"})
+                                return None
+                            # Handlers pick up the reporter and cancel flag like any other main thread state
+                            self._progress = progress
+                            self._cancel_event = cancel
                             try:
                                 response = self.execute_command(command)
-                                response_json = json.dumps(response)
-                                try:
-                                    client.sendall(response_json.encode('utf-8'))
-                                except:
-                                    print("Failed to send response - client disconnected")
                             except Exception as e:
                                 print(f"Error executing command: {str(e)}")
                                 traceback.print_exc()
-                                try:
-                                    error_response = {
-                                        "status": "error",
-                                        "message": str(e)
-                                    }
-                                    client.sendall(json.dumps(error_response).encode('utf-8'))
-                                except:
-                                    pass
+                                response = {"status": "error", "message": str(e)}
+                            finally:
+                                self._progress = ProgressReporter()
+                                self._cancel_event = None
+                            if isinstance(response, BackgroundTask):
+                                self._run_background_task(response, respond)
+                            else:
+                                respond(response)
                             return None
                         
                         # Schedule execution in main thread
@@ -169,10 +2047,206 @@ class BlenderMCPServer:
             print(f"Error in client handler: {str(e)}")
         finally:
             try:
-                client.close()
-            except:
-                pass
-            print("Client handler stopped")
+                client.close()
+            except:
+                pass
+            print("Client handler stopped")
+
+    def _cancel_command(self, channel, command):
+        """Flag a queued or running command for cancellation, by its request id"""
+        target = command.get("params", {}).get("request_id")
+        with self._cancel_lock:
+            cancel = self._cancel_events.get(target)
+        if cancel is not None:
+            cancel.set()
+            print(f"Cancelling request {target}")
+        response = {"status": "success", "result": {"request_id": target, "cancelled": cancel is not None}}
+        if command.get("id") is not None:
+            response["id"] = command["id"]
+        channel.send(response)
+
+    @staticmethod
+    def _send_keepalives(channel, request_id, finished):
+        """Tell the client a command is still running so its receive timeout doesn't expire"""
+        while not finished.wait(PROGRESS_KEEPALIVE_INTERVAL):
+            if not channel.send({"type": "keepalive", "id": request_id}):
+                break
+
+    def _run_background_task(self, task, respond):
+        """Run task.work on the worker pool, then task.then on the main thread, and respond once done"""
+        def work():
+            try:
+                value = task.work()
+            except Exception as e:
+                print(f"Error in background work: {str(e)}")
+                traceback.print_exc()
+                respond({"status": "error", "message": str(e)})
+                return
+            if task.then is None:
+                respond({"status": "success", "result": value})
+                return
+            
+            def then():
+                try:
+                    result = task.then(value)
+                except Exception as e:
+                    print(f"Error in handler: {str(e)}")
+                    traceback.print_exc()
+                    respond({"status": "error", "message": str(e)})
+                    return None
+                if isinstance(result, BackgroundTask):
+                    self._run_background_task(result, respond)
+                else:
+                    respond({"status": "success", "result": result})
+                return None
+            
+            bpy.app.timers.register(then, first_interval=0.0)
+        
+        HANDLER_POOL.submit(work)
+
+    def _stream_scene_events(self, client):
+        """Push scene change events to a subscribed client as newline-delimited JSON"""
+        events = queue.Queue(maxsize=1000)
+        with self.event_lock:
+            if not self.event_subscribers:
+                # Object tracking was idle without subscribers, re-baseline on the next flush
+                self._known_objects = None
+            self.event_subscribers.append(events)
+        print("Scene event subscriber connected")
+        
+        try:
+            client.sendall((json.dumps({"type": "subscribed"}) + "\n").encode('utf-8'))
+            while self.running:
+                try:
+                    event = events.get(timeout=1.0)
+                except queue.Empty:
+                    continue
+                client.sendall((json.dumps(event) + "\n").encode('utf-8'))
+        except Exception as e:
+            print(f"Scene event subscriber disconnected: {str(e)}")
+        finally:
+            with self.event_lock:
+                if events in self.event_subscribers:
+                    self.event_subscribers.remove(events)
+    
+    def _bump_scene_generation(self, depsgraph=None):
+        """Invalidate cached scene snapshots when objects, collections or materials change"""
+        if depsgraph is not None and not any(
+            update.is_updated_transform or update.is_updated_geometry
+            or isinstance(update.id, (bpy.types.Object, bpy.types.Collection, bpy.types.Material))
+            for update in depsgraph.updates
+        ):
+            return
+        self._scene_generation += 1
+    
+    def _invalidate_screenshots(self):
+        """Anything visible may have changed, cached screenshots no longer match the scene"""
+        self._view_generation += 1
+        if self._screenshot_cache:
+            self._screenshot_cache.clear()
+            self._screenshot_cache_bytes = 0
+    
+    def _screenshot_key(self, space, region, *options):
+        """Identifies what a capture of this viewport would show: scene state, view, shading and output options"""
+        region_3d = space.region_3d
+        view = tuple(round(v, 5) for row in region_3d.view_matrix for v in row)
+        projection = tuple(round(v, 5) for row in region_3d.window_matrix for v in row)
+        return (self._view_generation, bpy.context.scene.name, view, projection,
+                region.width, region.height, space.shading.type) + options
+    
+    def _cache_screenshot(self, key, entry):
+        self._screenshot_cache[key] = entry
+        self._screenshot_cache_bytes += len(entry["binary"])
+        while self._screenshot_cache and (len(self._screenshot_cache) > SCREENSHOT_CACHE_SIZE
+                                          or self._screenshot_cache_bytes > SCREENSHOT_CACHE_MAX_BYTES):
+            _, evicted = self._screenshot_cache.popitem(last=False)
+            self._screenshot_cache_bytes -= len(evicted["binary"])
+    
+    def _record_scene_changes(self, scene, depsgraph):
+        """Accumulate changes from a depsgraph update, flushed shortly afterwards"""
+        if not self.event_subscribers:
+            return
+        
+        changes = self._pending_changes
+        if changes is None:
+            changes = self._pending_changes = {
+                "scene": scene.name,
+                "transformed": set(),
+                "geometry": set(),
+                "materials": set(),
+                "reason": "update",
+            }
+            bpy.app.timers.register(self._flush_scene_changes, first_interval=SCENE_EVENT_FLUSH_INTERVAL)
+        
+        for update in depsgraph.updates:
+            datablock = update.id
+            if isinstance(datablock, bpy.types.Object):
+                if update.is_updated_transform:
+                    changes["transformed"].add(datablock.name)
+                if update.is_updated_geometry:
+                    changes["geometry"].add(datablock.name)
+            elif isinstance(datablock, bpy.types.Material):
+                changes["materials"].add(datablock.name)
+    
+    def _record_history_step(self, scene, reason):
+        """Undo/redo can change anything, so only flag it and let the object diff run"""
+        if not self.event_subscribers:
+            return
+        if self._pending_changes is None:
+            self._pending_changes = {
+                "scene": scene.name,
+                "transformed": set(),
+                "geometry": set(),
+                "materials": set(),
+                "reason": reason,
+            }
+            bpy.app.timers.register(self._flush_scene_changes, first_interval=SCENE_EVENT_FLUSH_INTERVAL)
+        else:
+            self._pending_changes["reason"] = reason
+    
+    def _flush_scene_changes(self):
+        """Turn the accumulated changes into one compact event per subscriber"""
+        changes, self._pending_changes = self._pending_changes, None
+        if changes is None:
+            return None
+        
+        current_objects = set(bpy.context.scene.objects.keys())
+        known_objects = self._known_objects if self._known_objects is not None else current_objects
+        self._known_objects = current_objects
+        
+        event = {
+            "type": "scene_change",
+            "scene": changes["scene"],
+            "reason": changes["reason"],
+            "timestamp": time.time(),
+        }
+        truncated = False
+        categories = {
+            "added": current_objects - known_objects,
+            "removed": known_objects - current_objects,
+            "transformed": changes["transformed"] & current_objects,
+            "geometry": changes["geometry"] & current_objects,
+            "materials": changes["materials"],
+        }
+        if not any(categories.values()) and changes["reason"] == "update":
+            # Nothing the subscribers care about (e.g. selection or viewport-only updates)
+            return None
+        
+        for category, names in categories.items():
+            if names:
+                event[category] = sorted(names)[:SCENE_EVENT_MAX_NAMES]
+                truncated = truncated or len(names) > SCENE_EVENT_MAX_NAMES
+        if truncated:
+            event["truncated"] = True
+        
+        with self.event_lock:
+            subscribers = list(self.event_subscribers)
+        for events in subscribers:
+            try:
+                events.put_nowait(event)
+            except queue.Full:
+                print("Scene event subscriber is not keeping up, dropping event")
+        return None
 
     def execute_command(self, command):
         """Execute a command in the main Blender thread"""
@@ -197,8 +2271,13 @@ class BlenderMCPServer:
         handlers = {
             "get_scene_info": self.get_scene_info,
             "get_object_info": self.get_object_info,
+            "get_objects_info": self.get_objects_info,
+            "query_scene": self.query_scene,
             "export_model": self.export_model,
+            "generate_lods": self.generate_lods,
             "get_viewport_screenshot": self.get_viewport_screenshot,
+            "get_contact_sheet": self.get_contact_sheet,
+            "build_scene": self.build_scene,
             "execute_code": self.execute_code,
             "get_polyhaven_status": self.get_polyhaven_status,
             "get_hyper3d_status": self.get_hyper3d_status,
@@ -221,6 +2300,7 @@ class BlenderMCPServer:
                 "create_rodin_job": self.create_rodin_job,
                 "poll_rodin_job_status": self.poll_rodin_job_status,
                 "import_generated_asset": self.import_generated_asset,
+                "prefetch_generated_asset": self.prefetch_generated_asset,
             }
             handlers.update(polyhaven_handlers)
             
@@ -237,6 +2317,9 @@ class BlenderMCPServer:
             try:
                 print(f"Executing handler for {cmd_type}")
                 result = handler(**params)
+                if isinstance(result, BackgroundTask):
+                    # Finished by _run_background_task once the worker pool is done
+                    return result
                 print(f"Handler execution complete")
                 return {"status": "success", "result": result}
             except Exception as e:
@@ -275,6 +2358,9 @@ class BlenderMCPServer:
                 }
                 scene_info["objects"].append(obj_info)
             
+            # Point at query_scene when the scene is larger than this summary
+            scene_info["truncated"] = scene_info["object_count"] > len(scene_info["objects"])
+            
             print(f"Scene info collected: {len(scene_info['objects'])} objects")
             return scene_info
         except Exception as e:
@@ -282,29 +2368,178 @@ class BlenderMCPServer:
             traceback.print_exc()
             return {"error": str(e)}
     
+    def _scene_snapshot(self, generation=None):
+        """Snapshot for a generation (current by default), None if that generation was evicted"""
+        scene = bpy.context.scene
+        current = generation is None or generation == self._scene_generation
+        key = (scene.name, self._scene_generation if generation is None else generation)
+        
+        snapshot = self._scene_snapshots.get(key)
+        if snapshot is None and current:
+            snapshot = SceneSnapshot(scene, key[1])
+            self._scene_snapshots[key] = snapshot
+            while len(self._scene_snapshots) > SCENE_SNAPSHOT_CACHE_SIZE:
+                self._scene_snapshots.popitem(last=False)
+        elif snapshot is not None:
+            self._scene_snapshots.move_to_end(key)
+        return snapshot
+    
+    @staticmethod
+    def _encode_cursor(state):
+        return base64.urlsafe_b64encode(json.dumps(state, separators=(",", ":")).encode("utf-8")).decode("ascii")
+    
     @staticmethod
-    def _get_aabb(obj):
+    def _decode_cursor(cursor):
+        try:
+            return json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        except Exception:
+            raise ValueError("Invalid cursor")
+    
+    def query_scene(self, types=None, collection=None, name_prefix=None, bbox=None, fields=None,
+                    sort_by="name", descending=False, limit=100, cursor=None):
+        """Query the scene's objects with filters, sorting and cursor-based paging"""
+        fields = list(fields) if fields else ["type", "location"]
+        unknown = [f for f in fields if f not in QUERY_SCENE_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown fields: {unknown}. Available: {list(QUERY_SCENE_FIELDS)}")
+        if sort_by not in QUERY_SCENE_SORT_KEYS:
+            raise ValueError(f"Invalid sort_by: {sort_by}. Must be one of: {list(QUERY_SCENE_SORT_KEYS)}")
+        if bbox is not None and (len(bbox) != 2 or any(len(corner) != 3 for corner in bbox)):
+            raise ValueError("bbox must be [[min_x, min_y, min_z], [max_x, max_y, max_z]]")
+        limit = max(1, min(int(limit), OBJECT_INFO_MAX_PAGE))
+        descending = bool(descending)
+        
+        filters = {"types": types, "collection": collection, "name_prefix": name_prefix, "bbox": bbox}
+        filter_hash = hashlib.sha1(json.dumps(filters, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+        
+        after = None
+        stale_cursor = False
+        if cursor:
+            state = self._decode_cursor(cursor)
+            if state.get("s") != sort_by or state.get("d") != descending or state.get("f") != filter_hash:
+                raise ValueError("Cursor does not match this query's filters or sort order")
+            after = tuple(state["k"])
+            # Keep paging the snapshot the cursor was issued for while it is cached,
+            # otherwise resume on the current scene right after the last returned key
+            snapshot = self._scene_snapshot(state["g"])
+            if snapshot is None:
+                snapshot = self._scene_snapshot()
+                stale_cursor = True
+        else:
+            snapshot = self._scene_snapshot()
+        
+        mask = snapshot.filter_mask(**filters)
+        indices, has_more = snapshot.page(mask, sort_by, descending, after, limit)
+        
+        result = {
+            "objects": [snapshot.row(i, fields) for i in indices],
+            "total": int(mask.sum()),
+            "generation": snapshot.generation,
+            "next_cursor": None,
+        }
+        if has_more:
+            result["next_cursor"] = self._encode_cursor({
+                "g": snapshot.generation,
+                "s": sort_by,
+                "d": descending,
+                "f": filter_hash,
+                "k": list(snapshot.sort_key(int(indices[-1]), sort_by)),
+            })
+        if stale_cursor:
+            result["stale_cursor"] = True
+        return result
+    
+    @staticmethod
+    def _get_aabb(obj, exact=False):
         """ Returns the world-space axis-aligned bounding box (AABB) of an object. """
         if obj.type != 'MESH':
             raise TypeError("Object must be a mesh")
 
-        # Get the bounding box corners in local space
-        local_bbox_corners = [mathutils.Vector(corner) for corner in obj.bound_box]
-
-        # Convert to world coordinates
-        world_bbox_corners = [obj.matrix_world @ corner for corner in local_bbox_corners]
-
-        # Compute axis-aligned min/max coordinates
-        min_corner = mathutils.Vector(map(min, zip(*world_bbox_corners)))
-        max_corner = mathutils.Vector(map(max, zip(*world_bbox_corners)))
-
-        return [
-            [*min_corner], [*max_corner]
-        ]
+        mins, maxs = AABB_ENGINE.compute([obj], exact=exact)
+        return [mins[0].tolist(), maxs[0].tolist()]
 
+    @staticmethod
+    def _get_aabbs(objs, exact=False):
+        """ Returns the world-space AABBs of many mesh objects with one batched transform. """
+        mins, maxs = AABB_ENGINE.compute(objs, exact=exact)
+        return [[mn.tolist(), mx.tolist()] for mn, mx in zip(mins, maxs)]
 
+    def get_objects_info(self, names=None, pattern=None, types=None, fields=None, offset=0, limit=50, exact_bounds=False):
+        """Get information about many objects in one pass, selected by names, a glob pattern and/or types"""
+        fields = list(fields) if fields else list(OBJECT_INFO_FIELDS)
+        unknown = [f for f in fields if f not in OBJECT_INFO_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown fields: {unknown}. Available: {list(OBJECT_INFO_FIELDS)}")
+        
+        offset = max(0, int(offset))
+        limit = max(1, min(int(limit), OBJECT_INFO_MAX_PAGE))
+        type_filter = {t.upper() for t in types} if types else None
+        
+        # Resolve the selection: explicit names keep their order, otherwise sort by name
+        missing = []
+        if names:
+            selected = []
+            for name in names:
+                obj = bpy.data.objects.get(name)
+                if obj is None:
+                    missing.append(name)
+                else:
+                    selected.append(obj)
+        else:
+            selected = sorted(bpy.context.scene.objects, key=lambda o: o.name)
+        
+        if pattern:
+            selected = [obj for obj in selected if fnmatch.fnmatchcase(obj.name, pattern)]
+        if type_filter:
+            selected = [obj for obj in selected if obj.type in type_filter]
+        
+        total = len(selected)
+        page = selected[offset:offset + limit]
+        
+        # Bounding boxes for every mesh on the page in one batched matrix multiply
+        aabbs = {}
+        if "world_bounding_box" in fields:
+            meshes = [obj for obj in page if obj.type == 'MESH']
+            aabbs = dict(zip((obj.name for obj in meshes), self._get_aabbs(meshes, exact=exact_bounds)))
+        
+        objects = []
+        for obj in page:
+            info = {"name": obj.name}
+            if "type" in fields:
+                info["type"] = obj.type
+            if "location" in fields:
+                info["location"] = list(obj.location)
+            if "rotation" in fields:
+                info["rotation"] = list(obj.rotation_euler)
+            if "scale" in fields:
+                info["scale"] = list(obj.scale)
+            if "visible" in fields:
+                info["visible"] = obj.visible_get()
+            if obj.name in aabbs:
+                info["world_bounding_box"] = aabbs[obj.name]
+            if "materials" in fields:
+                info["materials"] = [slot.material.name for slot in obj.material_slots if slot.material]
+            if "mesh" in fields and obj.type == 'MESH' and obj.data:
+                mesh = obj.data
+                info["mesh"] = {
+                    "vertices": len(mesh.vertices),
+                    "edges": len(mesh.edges),
+                    "polygons": len(mesh.polygons),
+                }
+            objects.append(info)
+        
+        next_offset = offset + len(page)
+        result = {
+            "objects": objects,
+            "total": total,
+            "offset": offset,
+            "next_offset": next_offset if next_offset < total else None,
+        }
+        if missing:
+            result["missing"] = missing
+        return result
     
-    def get_object_info(self, name):
+    def get_object_info(self, name, exact_bounds=False):
         """Get detailed information about a specific object"""
         obj = bpy.data.objects.get(name)
         if not obj:
@@ -322,7 +2557,7 @@ class BlenderMCPServer:
         }
 
         if obj.type == "MESH":
-            bounding_box = self._get_aabb(obj)
+            bounding_box = self._get_aabb(obj, exact=exact_bounds)
             obj_info["world_bounding_box"] = bounding_box
         
         # Add material slots
@@ -341,34 +2576,471 @@ class BlenderMCPServer:
         
         return obj_info
     
-    def export_model(self, export_format):
-        "Export the generated model in the requested format"
+    @staticmethod
+    def _gltf_export_options(profile):
+        """Exporter keyword arguments of a profile that this Blender's glTF exporter supports"""
+        supported = set(bpy.ops.export_scene.gltf.get_rna_type().properties.keys())
+        options = EXPORT_PROFILES[profile]["options"]
+        dropped = sorted(set(options) - supported)
+        if dropped:
+            print(f"Export profile {profile}: exporter does not support {dropped}")
+        return {key: value for key, value in options.items() if key in supported}
+
+    @staticmethod
+    def _downscale_images(max_size):
+        """Scale file-backed images larger than max_size down in memory, returns them for restoring"""
+        scaled = []
+        for img in bpy.data.images:
+            if img.source != 'FILE' or img.is_dirty or not img.has_data:
+                continue
+            width, height = img.size
+            if max(width, height) <= max_size:
+                continue
+            factor = max_size / max(width, height)
+            img.scale(max(1, int(width * factor)), max(1, int(height * factor)))
+            scaled.append(img)
+        return scaled
+
+    @staticmethod
+    def _export_paths(job_id, export_format):
+        """Unique (staging dir, final dir, file name) for one export"""
+        name = uuid.uuid4().hex[:12]
+        if job_id:
+            safe_job = "".join(c if c.isalnum() or c in "-_." else "_" for c in str(job_id))[:64]
+            name = f"{safe_job}-{name}"
+        filename = EXPORT_FILENAMES.get(export_format.upper(), "model.glb")
+        return os.path.join(EXPORT_DIR, f".tmp-{name}"), os.path.join(EXPORT_DIR, name), filename
+
+    @staticmethod
+    def _prune_exports(keep=None):
+        """Remove exports older than EXPORT_MAX_AGE, then the oldest beyond EXPORT_MAX_BYTES"""
+        now = time.time()
+        entries = []
+        for name in os.listdir(EXPORT_DIR):
+            path = os.path.join(EXPORT_DIR, name)
+            if path == keep:
+                continue
+            try:
+                mtime = os.path.getmtime(path)
+                size = sum(os.path.getsize(os.path.join(dirpath, f))
+                           for dirpath, _, files in os.walk(path) for f in files)
+            except OSError:
+                # Removed concurrently by another instance's janitor
+                continue
+            entries.append((mtime, size, path))
+
+        entries.sort(reverse=True)
+        total = sum(size for _, size, _ in entries)
+        if keep is not None:
+            with suppress(OSError):
+                total += sum(os.path.getsize(os.path.join(keep, f)) for f in os.listdir(keep))
+        for mtime, size, path in reversed(entries):
+            # Staging dirs of running exports are young, so only the age rule can reach them
+            staging = os.path.basename(path).startswith(".tmp-")
+            if now - mtime > EXPORT_MAX_AGE or (total > EXPORT_MAX_BYTES and not staging):
+                shutil.rmtree(path, ignore_errors=True)
+                total -= size
+
+    def _publish_export(self, staging_dir, export_dir, filename, report, progress, sizes):
+        """Move a finished export into place, returns its main file as base64 with its sizes"""
+        # Publish the finished export in one rename so readers never see a partial file
+        os.replace(staging_dir, export_dir)
+        filepath = os.path.join(export_dir, filename)
+        report += f" to {filepath}"
+        print(report)
+        progress.note("export", report)
+        HANDLER_POOL.submit(self._prune_exports, export_dir)
+
+        # Return file as base64
+        with open(filepath, "rb") as f:
+            encoded = base64.b64encode(f.read()).decode("utf-8")
+        return {"data": encoded, "filepath": filepath, "report": report, **sizes}
+
+    @staticmethod
+    def _export_sizes(size, baseline_size=None):
+        """Size of an export and, when compared, what it saved against the default profile"""
+        sizes = {"size_bytes": size}
+        if baseline_size:
+            sizes.update(
+                baseline_size_bytes=baseline_size,
+                saved_bytes=baseline_size - size,
+                saved_percent=round(100 * (1 - size / baseline_size), 1),
+            )
+        return sizes
+
+    @staticmethod
+    def _export_report(profile, size, baseline_size=None, lod=None, swapped=0, scaled=0):
+        report = f"Exported {size / 1e6:.2f} MB with profile {profile}"
+        if baseline_size:
+            report += f" (default profile: {baseline_size / 1e6:.2f} MB, {100 * (1 - size / baseline_size):.0f}% smaller)"
+        if lod:
+            report += f", LOD{lod} for {swapped} objects"
+        if scaled:
+            report += f", {scaled} textures downscaled to {EXPORT_PROFILES[profile]['max_texture_size']}px"
+        return report
+
+    def export_model(self, export_format, lod=None, profile="default", compare=False, job_id=None, background=False):
+        """
+        Export the generated model in the requested format.
+
+        Returns the file as base64 under "data" with its path and size_bytes.
+        profile selects one of EXPORT_PROFILES, lod swaps in LOD meshes built
+        by generate_lods. With compare the scene is also exported with the
+        default profile and baseline_size_bytes and the savings are added.
+        Each export gets its own directory under EXPORT_DIR (prefixed with
+        job_id when given) and only appears there once complete. With background the scene is snapshotted
+        and exported by a headless Blender worker while this instance keeps
+        serving commands.
+        """
+        staging_dir = None
         try:
-            filepath: str = "/tmp/model.glb"
-            bpy.ops.export_scene.gltf(filepath=filepath, export_format=export_format, use_selection=False)
+            if profile not in EXPORT_PROFILES:
+                raise ValueError(f"Unknown export profile: {profile}. Available: {list(EXPORT_PROFILES)}")
+            progress = self._progress
+            progress.start("export", message=f"Exporting with profile {profile}")
+            compare = bool(compare) and profile != "default"
+
+            staging_dir, export_dir, filename = self._export_paths(job_id, export_format)
+            os.makedirs(staging_dir)
+            filepath = os.path.join(staging_dir, filename)
+            if background:
+                return self._export_in_background(export_format, lod, profile, compare,
+                                                  staging_dir, export_dir, filename)
 
-            # Return file as base64
-            with open(filepath, "rb") as f:
-                encoded = base64.b64encode(f.read()).decode("utf-8")
-            return encoded
+            baseline_size = None
+            if compare:
+                bpy.ops.export_scene.gltf(filepath=filepath, export_format=export_format, use_selection=False)
+                baseline_size = os.path.getsize(filepath)
+
+            options = self._gltf_export_options(profile)
+            max_texture_size = EXPORT_PROFILES[profile]["max_texture_size"]
+            swapped = LOD_BUILDER.swap_in(bpy.context.scene.objects, int(lod)) if lod else []
+            scaled = self._downscale_images(max_texture_size) if max_texture_size else []
+            try:
+                bpy.ops.export_scene.gltf(filepath=filepath, export_format=export_format, use_selection=False, **options)
+            finally:
+                LOD_BUILDER.restore(swapped)
+                # Reloading drops the in-memory downscale, the files themselves were never touched
+                for img in scaled:
+                    img.reload()
+
+            size = os.path.getsize(filepath)
+            report = self._export_report(profile, size, baseline_size, lod, len(swapped), len(scaled))
+            return self._publish_export(staging_dir, export_dir, filename, report, progress,
+                                        self._export_sizes(size, baseline_size))
         except Exception as e:
+            if staging_dir is not None:
+                shutil.rmtree(staging_dir, ignore_errors=True)
             return {"Model Export Failed error": str(e)}  
+
+    def _export_in_background(self, export_format, lod, profile, compare, staging_dir, export_dir, filename):
+        """Snapshot the scene on the main thread, export it on a worker process"""
+        progress = self._progress
+        snapshot = os.path.join(staging_dir, "scene.blend")
+        swapped = LOD_BUILDER.swap_in(bpy.context.scene.objects, int(lod)) if lod else []
+        try:
+            # copy=True leaves the open file's path and dirty state alone, relative paths are remapped
+            bpy.ops.wm.save_as_mainfile(filepath=snapshot, copy=True, compress=False, relative_remap=True)
+        finally:
+            LOD_BUILDER.restore(swapped)
+
+        job = {
+            "blend": snapshot,
+            "filepath": os.path.join(staging_dir, filename),
+            "export_format": export_format,
+            "options": EXPORT_PROFILES[profile]["options"],
+            "max_texture_size": EXPORT_PROFILES[profile]["max_texture_size"],
+            "compare": compare,
+        }
+
+        def work():
+            try:
+                try:
+                    result = EXPORT_WORKER_POOL.run(job)
+                finally:
+                    with suppress(OSError):
+                        os.remove(snapshot)
+                if "error" in result:
+                    raise RuntimeError(result["error"])
+                report = self._export_report(profile, result["size"], result.get("baseline_size"),
+                                             lod, len(swapped), result.get("scaled", 0))
+                return self._publish_export(staging_dir, export_dir, filename, report, progress,
+                                            self._export_sizes(result["size"], result.get("baseline_size")))
+            except Exception as e:
+                shutil.rmtree(staging_dir, ignore_errors=True)
+                return {"Model Export Failed error": str(e)}
+
+        return BackgroundTask(work)
     
-    def get_viewport_screenshot(self, max_size=800, filepath=None, format="png"):
+    def generate_lods(self, object_names=None, ratios=None, triangle_budget=None, scene_triangle_budget=None,
+                      min_triangles=LOD_MIN_TRIANGLES):
+        """
+        Build decimated LOD meshes for heavy mesh objects.
+
+        Without a budget one LOD is built per entry in ratios (LOD1, LOD2, ...).
+        With triangle_budget (per object) and/or scene_triangle_budget a single
+        LOD1 is built per mesh, decimated just enough to fit. LODs are cached
+        and only rebuilt when the source mesh changes.
+        """
+        if object_names:
+            objects = [bpy.data.objects.get(name) for name in object_names]
+            missing = [name for name, obj in zip(object_names, objects) if obj is None]
+            if missing:
+                raise ValueError(f"Objects not found: {missing}")
+        else:
+            objects = list(bpy.context.scene.objects)
+        objects = [obj for obj in objects if obj.type == 'MESH' and obj.data is not None and not LOD_BUILDER.is_lod(obj.data)]
+
+        triangles = {obj.name: LOD_BUILDER.triangle_count(obj.data) for obj in objects}
+        heavy = [obj for obj in objects if triangles[obj.name] >= min_triangles]
+
+        if triangle_budget or scene_triangle_budget:
+            scene_ratio = 1.0
+            if scene_triangle_budget:
+                # Light meshes are kept whole, the heavy ones share what is left of the budget
+                heavy_total = sum(triangles[obj.name] for obj in heavy)
+                remaining = scene_triangle_budget - (sum(triangles.values()) - heavy_total)
+                scene_ratio = remaining / heavy_total if heavy_total else 1.0
+
+            def level_ratios(obj):
+                ratio = scene_ratio
+                if triangle_budget:
+                    ratio = min(ratio, triangle_budget / triangles[obj.name])
+                return [round(max(ratio, LOD_MIN_RATIO), 4)]
+        else:
+            ratios = [round(float(r), 4) for r in (ratios or LOD_DEFAULT_RATIOS)]
+            level_ratios = lambda obj: ratios
+
+        results = []
+        built = {}
+        for obj in heavy:
+            levels = []
+            for level, ratio in enumerate(level_ratios(obj), start=1):
+                if ratio >= 1.0:
+                    continue
+                key = (obj.data.name, level)
+                if key not in built:
+                    try:
+                        built[key] = LOD_BUILDER.build(obj, level, ratio)
+                    except Exception as e:
+                        levels.append({"level": level, "error": str(e)})
+                        continue
+                lod, cached = built[key]
+                levels.append({
+                    "level": level,
+                    "mesh": lod.name,
+                    "ratio": ratio,
+                    "triangles": LOD_BUILDER.triangle_count(lod),
+                    "cached": cached,
+                })
+            results.append({
+                "object": obj.name,
+                "mesh": obj.data.name,
+                "triangles": triangles[obj.name],
+                "lods": levels,
+            })
+
+        return {
+            "objects": results,
+            "skipped": sorted(obj.name for obj in objects if triangles[obj.name] < min_triangles),
+            "scene_triangles": sum(triangles.values()),
+        }
+
+    @staticmethod
+    def _find_view3d():
+        """The first 3D viewport as (area, space, region), or None"""
+        for area in bpy.context.screen.areas:
+            if area.type != 'VIEW_3D':
+                continue
+            region = next((r for r in area.regions if r.type == 'WINDOW'), None)
+            if region is not None:
+                return area, area.spaces.active, region
+        return None
+
+    @staticmethod
+    def _draw_offscreen(space, region, width, height, matrices):
+        """Draw the scene once per (view, projection) matrix pair into one offscreen buffer.
+
+        Returns the images as top-down HxWx3 uint8 arrays. The viewport's
+        shading and overlay settings apply to every view.
+        """
+        import gpu
+        
+        images = []
+        offscreen = gpu.types.GPUOffScreen(width, height)
+        try:
+            for view_matrix, projection_matrix in matrices:
+                offscreen.draw_view3d(
+                    bpy.context.scene,
+                    bpy.context.view_layer,
+                    space,
+                    region,
+                    view_matrix,
+                    projection_matrix,
+                    do_color_management=True,
+                )
+                with offscreen.bind():
+                    framebuffer = gpu.state.active_framebuffer_get()
+                    buffer = framebuffer.read_color(0, 0, width, height, 4, 0, 'UBYTE')
+                buffer.dimensions = width * height * 4
+                pixels = np.asarray(buffer, dtype=np.uint8).reshape(height, width, 4)
+                # GPU rows start at the bottom
+                images.append(np.ascontiguousarray(pixels[::-1, :, :3]))
+        finally:
+            offscreen.free()
+        return images
+
+    def _capture_view3d(self, space, region):
+        """Draw the viewport as the user sees it, returns top-down HxWx3 uint8 pixels"""
+        region_3d = space.region_3d
+        return self._draw_offscreen(space, region, region.width, region.height,
+                                    [(region_3d.view_matrix, region_3d.window_matrix)])[0]
+
+    @staticmethod
+    def _framing_matrices(view, center, radius):
+        """View and projection matrices looking at a bounding sphere from one CONTACT_SHEET_VIEWS direction"""
+        direction, up = CONTACT_SHEET_VIEWS[view]
+        direction = mathutils.Vector(direction).normalized()
+        perspective = view == "iso"
+        distance = radius / math.sin(CONTACT_SHEET_ISO_FOV / 2) if perspective else radius * 2
+        eye = center + direction * distance
+
+        # Camera looks down its -Z axis
+        z_axis = direction
+        x_axis = mathutils.Vector(up).cross(z_axis).normalized()
+        y_axis = z_axis.cross(x_axis)
+        camera = mathutils.Matrix((
+            (x_axis.x, y_axis.x, z_axis.x, eye.x),
+            (x_axis.y, y_axis.y, z_axis.y, eye.y),
+            (x_axis.z, y_axis.z, z_axis.z, eye.z),
+            (0, 0, 0, 1),
+        ))
+
+        near, far = max(distance - radius * 1.5, radius * 0.01), distance + radius * 1.5
+        if perspective:
+            f = 1 / math.tan(CONTACT_SHEET_ISO_FOV / 2)
+            projection = mathutils.Matrix((
+                (f, 0, 0, 0),
+                (0, f, 0, 0),
+                (0, 0, (far + near) / (near - far), 2 * far * near / (near - far)),
+                (0, 0, -1, 0),
+            ))
+        else:
+            half = radius * 1.05
+            projection = mathutils.Matrix((
+                (1 / half, 0, 0, 0),
+                (0, 1 / half, 0, 0),
+                (0, 0, -2 / (far - near), -(far + near) / (far - near)),
+                (0, 0, 0, 1),
+            ))
+        return camera.inverted(), projection
+
+    def get_contact_sheet(self, views=None, tile_size=384, object_names=None, format="jpeg", quality=SCREENSHOT_QUALITY):
+        """
+        Render several fixed views of the scene offscreen and tile them into one image.
+
+        Views come from CONTACT_SHEET_VIEWS and frame the given objects (all
+        visible geometry by default). The user's viewport is not moved. The
+        sheet is returned like an in-memory screenshot, row by row in the
+        order of "layout", and cached the same way.
         """
-        Capture a screenshot of the current 3D viewport and save it to the specified path.
+        views = list(views or CONTACT_SHEET_DEFAULT_VIEWS)
+        unknown = [v for v in views if v not in CONTACT_SHEET_VIEWS]
+        if unknown:
+            raise ValueError(f"Unknown views: {unknown}. Available: {list(CONTACT_SHEET_VIEWS)}")
+        tile_size = max(64, min(int(tile_size), 1024))
+        
+        view3d = self._find_view3d()
+        if view3d is None:
+            return {"error": "No 3D viewport found"}
+        _, space, region = view3d
+        
+        key = (self._view_generation, bpy.context.scene.name, "contact_sheet", tuple(views), tile_size,
+               tuple(object_names or ()), space.shading.type, format.lower(), quality)
+        cached = self._screenshot_cache.get(key)
+        if cached is not None:
+            self._screenshot_cache.move_to_end(key)
+            return {"success": True, **cached, "cached": True}
+        
+        if object_names:
+            objects = [bpy.data.objects.get(name) for name in object_names]
+            missing = [name for name, obj in zip(object_names, objects) if obj is None]
+            if missing:
+                raise ValueError(f"Objects not found: {missing}")
+        else:
+            objects = [obj for obj in bpy.context.scene.objects
+                       if obj.type in GEOMETRY_OBJECT_TYPES and obj.visible_get()]
+        if objects:
+            mins, maxs = AABB_ENGINE.compute(objects)
+            low, high = mins.min(axis=0), maxs.max(axis=0)
+            center = mathutils.Vector(((low + high) / 2).tolist())
+            radius = max(float(np.linalg.norm(high - low)) / 2, 1e-3)
+        else:
+            center, radius = mathutils.Vector((0, 0, 0)), 1.0
+        
+        matrices = [self._framing_matrices(view, center, radius) for view in views]
+        tiles = self._draw_offscreen(space, region, tile_size, tile_size, matrices)
+        
+        columns = math.ceil(math.sqrt(len(tiles)))
+        rows = math.ceil(len(tiles) / columns)
+        sheet = np.zeros((rows * tile_size, columns * tile_size, 3), dtype=np.uint8)
+        for index, tile in enumerate(tiles):
+            row, column = divmod(index, columns)
+            sheet[row * tile_size:(row + 1) * tile_size, column * tile_size:(column + 1) * tile_size] = tile
+        
+        data, used_format = _encode_image(sheet, format, quality)
+        entry = {
+            "width": int(sheet.shape[1]),
+            "height": int(sheet.shape[0]),
+            "format": used_format,
+            "layout": [views[r * columns:(r + 1) * columns] for r in range(rows)],
+            "binary": data,
+        }
+        self._cache_screenshot(key, entry)
+        return {"success": True, **entry, "cached": False}
+
+    def get_viewport_screenshot(self, max_size=800, filepath=None, format="png", quality=SCREENSHOT_QUALITY):
+        """
+        Capture a screenshot of the current 3D viewport.
+        
+        Without filepath the viewport is drawn offscreen, downsampled and
+        encoded in memory, and the image bytes are returned in the result's
+        "binary" field (sent as a binary frame after the JSON response).
+        With filepath the screenshot is saved there instead.
         
         Parameters:
         - max_size: Maximum size in pixels for the largest dimension of the image
-        - filepath: Path where to save the screenshot file
-        - format: Image format (png, jpg, etc.)
+        - filepath: Path where to save the screenshot file (optional)
+        - format: Image format (png, jpeg, webp)
+        - quality: JPEG/WebP quality
         
-        Returns success/error status
+        Returns the image size and format, plus the bytes or the filepath
         """
+        if not filepath:
+            view = self._find_view3d()
+            if view is None:
+                return {"error": "No 3D viewport found"}
+            _, space, region = view
+            key = self._screenshot_key(space, region, max_size, format.lower(), quality)
+            cached = self._screenshot_cache.get(key)
+            if cached is not None:
+                self._screenshot_cache.move_to_end(key)
+                return {"success": True, **cached, "cached": True}
+            try:
+                pixels = _downsample(self._capture_view3d(space, region), max_size)
+                data, used_format = _encode_image(pixels, format, quality)
+            except Exception as e:
+                return {"error": str(e)}
+            entry = {
+                "width": int(pixels.shape[1]),
+                "height": int(pixels.shape[0]),
+                "format": used_format,
+                "binary": data,
+            }
+            self._cache_screenshot(key, entry)
+            return {"success": True, **entry, "cached": False}
+        
         try:
-            if not filepath:
-                return {"error": "No filepath provided"}
-            
             # Find the active 3D viewport
             area = None
             for a in bpy.context.screen.areas:
@@ -411,220 +3083,429 @@ class BlenderMCPServer:
         except Exception as e:
             return {"error": str(e)}
     
-    def execute_code(self, code):
-        """Execute arbitrary Blender Python code"""
+    def build_scene(self, objects, materials=None, collection=None, replace=False):
+        """
+        Build objects, materials, modifiers and parenting from a declarative spec in one pass.
+
+        objects is a list of object specs: name, primitive (see
+        BUILD_PRIMITIVES) with its parameters or instance_of, location,
+        rotation (radians), scale, material, smooth, modifiers and parent.
+        materials maps material names to color/metallic/roughness/alpha/
+        emission. With replace, existing objects of the same names are
+        removed first, otherwise Blender picks unique names.
+        """
+        materials = materials or {}
+        builder = SceneBuilder()
+        builder.validate(objects, materials)
+
+        if collection:
+            target = bpy.data.collections.get(collection)
+            if target is None:
+                target = bpy.data.collections.new(collection)
+                bpy.context.scene.collection.children.link(target)
+        else:
+            target = bpy.context.scene.collection
+
+        if replace:
+            for spec in objects:
+                existing = bpy.data.objects.get(spec["name"])
+                if existing is not None:
+                    bpy.data.objects.remove(existing, do_unlink=True)
+
+        for name, spec in materials.items():
+            builder.build_material(name, spec)
+
+        # Instances need their source first, whatever the order in the spec
+        pending = list(objects)
+        while pending:
+            # validate() rejected cycles, so every pass builds at least one object
+            ready = [spec for spec in pending if not spec.get("instance_of") or spec["instance_of"] in builder.created]
+            for spec in ready:
+                builder.build_object(spec, target)
+            pending = [spec for spec in pending if spec["name"] not in builder.created]
+        builder.resolve_references()
+
+        for spec in objects:
+            parent = spec.get("parent")
+            if parent:
+                # Transforms in the spec are relative to the parent
+                builder.created[spec["name"]].parent = builder.created.get(parent) or bpy.data.objects[parent]
+
+        result = {
+            "objects": {spec["name"]: builder.created[spec["name"]].name for spec in objects},
+            "meshes_created": len(builder.meshes),
+            "materials": list(materials),
+        }
+        if builder.warnings:
+            result["warnings"] = builder.warnings
+        return result
+
+    def execute_code(self, code, session=None, reset_session=False, timeout=CODE_TIME_BUDGET):
+        """Execute arbitrary Blender Python code, in a persistent namespace when session is given.
+
+        The code is interrupted after timeout seconds, or when a cancel
+        command arrives for this request.
+        """
         # This is powerful but potentially dangerous - use with caution
         try:
-            # Create a local namespace for execution
-            namespace = {"bpy": bpy}
-
-            # Capture stdout during execution, and return it as result
-            capture_buffer = io.StringIO()
-            with redirect_stdout(capture_buffer):
-                exec(code, namespace)
-            
-            captured_output = capture_buffer.getvalue()
-            return {"executed": True, "result": captured_output}
-        except Exception as e:
+            if reset_session and session:
+                CODE_EXECUTOR.reset(session)
+            run = CODE_EXECUTOR.run(code, session, budget=timeout, cancel=self._cancel_event)
+            return {
+                "executed": True,
+                "result": run["output"],
+                "session": session,
+                "duration_ms": run["duration_ms"],
+                "compile_cached": run["compile_cached"],
+            }
+        except (Exception, ExecutionInterrupted) as e:
             raise Exception(f"Code execution error: {str(e)}")
     
     
 
     def get_polyhaven_categories(self, asset_type):
         """Get categories for a specific asset type from Polyhaven"""
+        if asset_type not in ["hdris", "textures", "models", "all"]:
+            return {"error": f"Invalid asset type: {asset_type}. Must be one of: hdris, textures, models, all"}
+        
+        def work():
+            try:
+                return {"categories": POLYHAVEN_CATALOG.categories(asset_type)}
+            except Exception as e:
+                return {"error": str(e)}
+        # The first call may have to download the catalog
+        return BackgroundTask(work)
+    
+    def search_polyhaven_assets(self, asset_type=None, categories=None, query=None, limit=20, offset=0):
+        """Search the Polyhaven catalog on the worker pool, the first call may have to download it"""
+        return BackgroundTask(lambda: self._search_polyhaven_assets(asset_type, categories, query, limit, offset))
+    
+    def _search_polyhaven_assets(self, asset_type=None, categories=None, query=None, limit=20, offset=0):
+        """Search the locally indexed Polyhaven catalog, ranked by relevance then popularity"""
         try:
-            if asset_type not in ["hdris", "textures", "models", "all"]:
+            if asset_type and asset_type not in ["hdris", "textures", "models", "all"]:
                 return {"error": f"Invalid asset type: {asset_type}. Must be one of: hdris, textures, models, all"}
-                
-            response = requests.get(f"https://api.polyhaven.com/categories/{asset_type}")
-            if response.status_code == 200:
-                return {"categories": response.json()}
-            else:
-                return {"error": f"API request failed with status code {response.status_code}"}
+            if isinstance(categories, str):
+                categories = [c for c in categories.split(",") if c]
+            limit = max(1, min(int(limit), 100))
+            offset = max(0, int(offset))
+            
+            matches, scores, catalog = POLYHAVEN_CATALOG.search(asset_type, categories, query)
+            page = matches[offset:offset + limit]
+            
+            # Keep only the fields clients need, the full records are large
+            assets = {}
+            for asset_id in page:
+                data = catalog[asset_id]
+                assets[asset_id] = {
+                    "name": data.get("name", asset_id),
+                    "type": data.get("type", 0),
+                    "categories": data.get("categories", []),
+                    "tags": data.get("tags", []),
+                    "download_count": data.get("download_count", 0),
+                }
+                if asset_id in scores:
+                    assets[asset_id]["score"] = round(scores[asset_id], 2)
+            
+            next_offset = offset + len(page)
+            return {
+                "assets": assets,
+                "total_count": len(matches),
+                "returned_count": len(assets),
+                "offset": offset,
+                "next_offset": next_offset if next_offset < len(matches) else None,
+            }
         except Exception as e:
             return {"error": str(e)}
     
-    def search_polyhaven_assets(self, asset_type=None, categories=None):
-        """Search for assets from Polyhaven with optional filtering"""
+    def _polyhaven_files(self, asset_id):
+        """File listing for a PolyHaven asset, served from the asset cache while fresh"""
+        key = f"polyhaven/{asset_id}/files"
+        files_data = ASSET_CACHE.get_metadata(key, POLYHAVEN_METADATA_TTL)
+        if files_data is None:
+            files_response = HTTP_SESSIONS.get("polyhaven").get(f"https://api.polyhaven.com/files/{asset_id}")
+            if files_response.status_code != 200:
+                raise RuntimeError(f"Failed to get asset files: {files_response.status_code}")
+            files_data = files_response.json()
+            ASSET_CACHE.put_metadata(key, files_data)
+        return files_data
+
+    @staticmethod
+    def _cached_download(key, url, ext="", progress=None):
+        """Return (path, from_cache) for url, downloading it into the asset cache on a miss"""
+        path = ASSET_CACHE.lookup(key)
+        if path is not None:
+            return path, True
+        with HTTP_SESSIONS.get("polyhaven").get(url, stream=True) as response:
+            if response.status_code != 200:
+                raise RuntimeError(f"Failed to download {url}: {response.status_code}")
+            chunks = response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE)
+            if progress is not None:
+                progress.expect("download", int(response.headers.get("Content-Length") or 0))
+                chunks = BlenderMCPServer._counted(chunks, progress, "download")
+            path = ASSET_CACHE.store(key, chunks, ext)
+        return path, False
+
+    @staticmethod
+    def _counted(chunks, progress, stage):
+        """Pass chunks through while reporting their size as progress of stage"""
+        for chunk in chunks:
+            progress.advance(stage, len(chunk))
+            yield chunk
+
+    def _fetch_polyhaven_maps(self, files_data, asset_id, resolution, file_format, progress=None):
+        """Download all texture maps of an asset into the asset cache concurrently.
+
+        Only does network and file I/O, so it is safe off the main thread.
+        Returns {map_type: (path, from_cache)}; maps that fail are left out.
+        """
+        futures = {}
+        for map_type in files_data:
+            if map_type in ["blend", "gltf"]:  # Skip non-texture files
+                continue
+            if resolution in files_data[map_type] and file_format in files_data[map_type][resolution]:
+                file_url = files_data[map_type][resolution][file_format]["url"]
+                futures[map_type] = DOWNLOAD_POOL.submit(
+                    self._cached_download,
+                    f"polyhaven/{asset_id}/{resolution}/{file_format}/{map_type}",
+                    file_url, f".{file_format}", progress)
+        
+        maps = {}
+        for map_type, future in futures.items():
+            try:
+                maps[map_type] = future.result()
+            except Exception as e:
+                print(f"Skipping {map_type} map: {str(e)}")
+        return maps
+
+    def _fetch_polyhaven_asset(self, asset_id, asset_type, resolution, file_format, progress=None):
+        """Bring every file an asset import needs into the asset cache.
+
+        Only does network and file I/O, so the import step on the main thread
+        works from the returned paths alone: {"hdri"} for HDRIs, {"maps"} for
+        textures, {"main_file", "temp_dir"} for models, each with "from_cache";
+        or {"error": ...}.
+        """
         try:
-            url = "https://api.polyhaven.com/assets"
-            params = {}
-            
-            if asset_type and asset_type != "all":
-                if asset_type not in ["hdris", "textures", "models"]:
-                    return {"error": f"Invalid asset type: {asset_type}. Must be one of: hdris, textures, models, all"}
-                params["type"] = asset_type
-                
-            if categories:
-                params["categories"] = categories
-                
-            response = requests.get(url, params=params)
-            if response.status_code == 200:
-                # Limit the response size to avoid overwhelming Blender
-                assets = response.json()
-                # Return only the first 20 assets to keep response size manageable
-                limited_assets = {}
-                for i, (key, value) in enumerate(assets.items()):
-                    if i >= 20:  # Limit to 20 assets
-                        break
-                    limited_assets[key] = value
-                
-                return {"assets": limited_assets, "total_count": len(assets), "returned_count": len(limited_assets)}
-            else:
-                return {"error": f"API request failed with status code {response.status_code}"}
+            files_data = self._polyhaven_files(asset_id)
         except Exception as e:
             return {"error": str(e)}
-    
-    def download_polyhaven_asset(self, asset_id, asset_type, resolution="1k", file_format=None):
+        
+        if asset_type == "textures":
+            maps = self._fetch_polyhaven_maps(files_data, asset_id, resolution, file_format, progress)
+            if not maps:
+                return {"error": "No texture maps found for the requested resolution and format"}
+            return {
+                "from_cache": all(from_cache for _, from_cache in maps.values()),
+                "maps": {map_type: path for map_type, (path, _) in maps.items()},
+            }
+        
+        if asset_type == "hdris":
+            file_info = files_data.get("hdri", {}).get(resolution, {}).get(file_format)
+            if not file_info:
+                return {"error": "Requested resolution or format not available for this HDRI"}
+            try:
+                # Blender can't load HDR data from memory, so it reads the cached file directly
+                hdri_path, from_cache = self._cached_download(
+                    f"polyhaven/{asset_id}/{resolution}/{file_format}/hdri", file_info["url"], f".{file_format}", progress)
+            except Exception as e:
+                return {"error": f"Failed to download HDRI: {str(e)}"}
+            return {"from_cache": from_cache, "hdri": hdri_path}
+        
+        if asset_type != "models":
+            return {"error": f"Unsupported asset type: {asset_type}"}
+        file_info = files_data.get(file_format, {}).get(resolution, {}).get(file_format)
+        if not file_info:
+            return {"error": "Requested format or resolution not available for this model"}
+        
+        key_prefix = f"polyhaven/{asset_id}/{resolution}/{file_format}"
+        main_file_name = file_info["url"].split("/")[-1]
+        downloads = [(main_file_name, file_info["url"])]
+        downloads += [(include_path, include_info["url"])
+                      for include_path, include_info in (file_info.get("include") or {}).items()]
+        futures = [
+            DOWNLOAD_POOL.submit(self._cached_download, f"{key_prefix}/{path}", url, os.path.splitext(path)[1], progress)
+            for path, url in downloads
+        ]
+        
+        # Importers resolve dependencies relative to the main file, so the cached
+        # files are linked into a temporary directory with the expected layout
+        temp_dir = tempfile.mkdtemp()
+        from_cache = True
+        try:
+            for (path, _), future in zip(downloads, futures):
+                try:
+                    cached_path, hit = future.result()
+                except Exception as e:
+                    if path == main_file_name:
+                        raise RuntimeError(f"Failed to download model: {str(e)}")
+                    print(f"Failed to download included file: {path}")
+                    continue
+                from_cache = from_cache and hit
+                target_path = os.path.join(temp_dir, path)
+                os.makedirs(os.path.dirname(target_path), exist_ok=True)
+                try:
+                    os.link(cached_path, target_path)
+                except OSError:
+                    shutil.copyfile(cached_path, target_path)
+        except Exception as e:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            return {"error": str(e)}
+        return {"from_cache": from_cache, "main_file": os.path.join(temp_dir, main_file_name), "temp_dir": temp_dir}
+
+    def download_polyhaven_asset(self, asset_id, asset_type, resolution="1k", file_format=None,
+                                 instances=None, instance_mode="linked"):
+        """Download on the worker pool, then import from the asset cache on the main thread"""
+        file_format = file_format or POLYHAVEN_DEFAULT_FORMATS.get(asset_type)
+        progress = self._progress
+        key = f"polyhaven:{asset_id}:{resolution}:{file_format}"
+
+        if instances is not None:
+            if asset_type != "models":
+                return {"error": "instances are only supported for models"}
+            try:
+                ASSET_INSTANCER.validate(instances, instance_mode)
+            except ValueError as e:
+                return {"error": str(e)}
+            library = ASSET_INSTANCER.find(key)
+            if library is not None:
+                return {
+                    "success": True,
+                    "message": f"Model {asset_id} placed from the already imported asset",
+                    "reused": True,
+                    **ASSET_INSTANCER.place(library, instances, instance_mode)
+                }
+
+        def then(fetched):
+            if "error" in fetched:
+                return fetched
+            progress.start("import")
+            existing = set(bpy.data.objects)
+            result = self._import_polyhaven_asset(asset_id, asset_type, file_format, fetched)
+            if result.get("success"):
+                result["from_cache"] = fetched["from_cache"]
+                if instances is not None:
+                    imported = [obj for obj in bpy.data.objects if obj not in existing]
+                    try:
+                        result.update(ASSET_INSTANCER.instance_imported(
+                            key, imported, instances, instance_mode, asset_id))
+                    except Exception as e:
+                        return {"error": f"Failed to place instances: {str(e)}"}
+            return result
+        
+        return BackgroundTask(
+            lambda: self._fetch_polyhaven_asset(asset_id, asset_type, resolution, file_format, progress), then)
+
+    @staticmethod
+    def _load_cached_image(path, name):
+        """Image datablock for a cache file under name, reused only if that name already holds this file.
+
+        Cache files are content addressed, so several assets or resolutions
+        can share one; each keeps its own datablock instead of renaming one
+        that earlier materials point to.
+        """
+        image = bpy.data.images.get(name)
+        if image is not None and os.path.normpath(bpy.path.abspath(image.filepath)) == os.path.normpath(path):
+            return image
+        image = bpy.data.images.load(path)
+        image.name = name
+        return image
+
+    def _import_polyhaven_asset(self, asset_id, asset_type, file_format, fetched):
+        """Main thread part of download_polyhaven_asset, only reads the files fetched in the background"""
         try:
-            # First get the files information
-            files_response = requests.get(f"https://api.polyhaven.com/files/{asset_id}")
-            if files_response.status_code != 200:
-                return {"error": f"Failed to get asset files: {files_response.status_code}"}
-            
-            files_data = files_response.json()
-            
             # Handle different asset types
             if asset_type == "hdris":
-                # For HDRIs, download the .hdr or .exr file
-                if not file_format:
-                    file_format = "hdr"  # Default format for HDRIs
-                
-                if "hdri" in files_data and resolution in files_data["hdri"] and file_format in files_data["hdri"][resolution]:
-                    file_info = files_data["hdri"][resolution][file_format]
-                    file_url = file_info["url"]
+                hdri_path = fetched["hdri"]
+                try:
+                    # Create a new world if none exists
+                    if not bpy.data.worlds:
+                        bpy.data.worlds.new("World")
                     
-                    # For HDRIs, we need to save to a temporary file first
-                    # since Blender can't properly load HDR data directly from memory
-                    with tempfile.NamedTemporaryFile(suffix=f".{file_format}", delete=False) as tmp_file:
-                        # Download the file
-                        response = requests.get(file_url)
-                        if response.status_code != 200:
-                            return {"error": f"Failed to download HDRI: {response.status_code}"}
-                        
-                        tmp_file.write(response.content)
-                        tmp_path = tmp_file.name
+                    world = bpy.data.worlds[0]
+                    world.use_nodes = True
+                    node_tree = world.node_tree
                     
-                    try:
-                        # Create a new world if none exists
-                        if not bpy.data.worlds:
-                            bpy.data.worlds.new("World")
-                        
-                        world = bpy.data.worlds[0]
-                        world.use_nodes = True
-                        node_tree = world.node_tree
-                        
-                        # Clear existing nodes
-                        for node in node_tree.nodes:
-                            node_tree.nodes.remove(node)
-                        
-                        # Create nodes
-                        tex_coord = node_tree.nodes.new(type='ShaderNodeTexCoord')
-                        tex_coord.location = (-800, 0)
-                        
-                        mapping = node_tree.nodes.new(type='ShaderNodeMapping')
-                        mapping.location = (-600, 0)
-                        
-                        # Load the image from the temporary file
-                        env_tex = node_tree.nodes.new(type='ShaderNodeTexEnvironment')
-                        env_tex.location = (-400, 0)
-                        env_tex.image = bpy.data.images.load(tmp_path)
-                        
-                        # Use a color space that exists in all Blender versions
-                        if file_format.lower() == 'exr':
-                            # Try to use Linear color space for EXR files
-                            try:
-                                env_tex.image.colorspace_settings.name = 'Linear'
-                            except:
-                                # Fallback to Non-Color if Linear isn't available
-                                env_tex.image.colorspace_settings.name = 'Non-Color'
-                        else:  # hdr
-                            # For HDR files, try these options in order
-                            for color_space in ['Linear', 'Linear Rec.709', 'Non-Color']:
-                                try:
-                                    env_tex.image.colorspace_settings.name = color_space
-                                    break  # Stop if we successfully set a color space
-                                except:
-                                    continue
-                        
-                        background = node_tree.nodes.new(type='ShaderNodeBackground')
-                        background.location = (-200, 0)
-                        
-                        output = node_tree.nodes.new(type='ShaderNodeOutputWorld')
-                        output.location = (0, 0)
-                        
-                        # Connect nodes
-                        node_tree.links.new(tex_coord.outputs['Generated'], mapping.inputs['Vector'])
-                        node_tree.links.new(mapping.outputs['Vector'], env_tex.inputs['Vector'])
-                        node_tree.links.new(env_tex.outputs['Color'], background.inputs['Color'])
-                        node_tree.links.new(background.outputs['Background'], output.inputs['Surface'])
-                        
-                        # Set as active world
-                        bpy.context.scene.world = world
-                        
-                        # Clean up temporary file
+                    # Clear existing nodes
+                    for node in node_tree.nodes:
+                        node_tree.nodes.remove(node)
+                    
+                    # Create nodes
+                    tex_coord = node_tree.nodes.new(type='ShaderNodeTexCoord')
+                    tex_coord.location = (-800, 0)
+                    
+                    mapping = node_tree.nodes.new(type='ShaderNodeMapping')
+                    mapping.location = (-600, 0)
+                    
+                    # Load the image from the temporary file
+                    env_tex = node_tree.nodes.new(type='ShaderNodeTexEnvironment')
+                    env_tex.location = (-400, 0)
+                    env_tex.image = self._load_cached_image(hdri_path, f"{asset_id}.{file_format}")
+                    
+                    # Use a color space that exists in all Blender versions
+                    if file_format.lower() == 'exr':
+                        # Try to use Linear color space for EXR files
                         try:
-                            tempfile._cleanup()  # This will clean up all temporary files
+                            env_tex.image.colorspace_settings.name = 'Linear'
                         except:
-                            pass
-                        
-                        return {
-                            "success": True, 
-                            "message": f"HDRI {asset_id} imported successfully",
-                            "image_name": env_tex.image.name
-                        }
-                    except Exception as e:
-                        return {"error": f"Failed to set up HDRI in Blender: {str(e)}"}
-                else:
-                    return {"error": f"Requested resolution or format not available for this HDRI"}
+                            # Fallback to Non-Color if Linear isn't available
+                            env_tex.image.colorspace_settings.name = 'Non-Color'
+                    else:  # hdr
+                        # For HDR files, try these options in order
+                        for color_space in ['Linear', 'Linear Rec.709', 'Non-Color']:
+                            try:
+                                env_tex.image.colorspace_settings.name = color_space
+                                break  # Stop if we successfully set a color space
+                            except:
+                                continue
+                    
+                    background = node_tree.nodes.new(type='ShaderNodeBackground')
+                    background.location = (-200, 0)
+                    
+                    output = node_tree.nodes.new(type='ShaderNodeOutputWorld')
+                    output.location = (0, 0)
+                    
+                    # Connect nodes
+                    node_tree.links.new(tex_coord.outputs['Generated'], mapping.inputs['Vector'])
+                    node_tree.links.new(mapping.outputs['Vector'], env_tex.inputs['Vector'])
+                    node_tree.links.new(env_tex.outputs['Color'], background.inputs['Color'])
+                    node_tree.links.new(background.outputs['Background'], output.inputs['Surface'])
                     
-            elif asset_type == "textures":
-                if not file_format:
-                    file_format = "jpg"  # Default format for textures
+                    # Set as active world
+                    bpy.context.scene.world = world
+                    
+                    return {
+                        "success": True, 
+                        "message": f"HDRI {asset_id} imported successfully",
+                        "image_name": env_tex.image.name
+                    }
+                except Exception as e:
+                    return {"error": f"Failed to set up HDRI in Blender: {str(e)}"}
                 
+            elif asset_type == "textures":
                 downloaded_maps = {}
                 
                 try:
-                    for map_type in files_data:
-                        if map_type not in ["blend", "gltf"]:  # Skip non-texture files
-                            if resolution in files_data[map_type] and file_format in files_data[map_type][resolution]:
-                                file_info = files_data[map_type][resolution][file_format]
-                                file_url = file_info["url"]
-                                
-                                # Use NamedTemporaryFile like we do for HDRIs
-                                with tempfile.NamedTemporaryFile(suffix=f".{file_format}", delete=False) as tmp_file:
-                                    # Download the file
-                                    response = requests.get(file_url)
-                                    if response.status_code == 200:
-                                        tmp_file.write(response.content)
-                                        tmp_path = tmp_file.name
-                                        
-                                        # Load image from temporary file
-                                        image = bpy.data.images.load(tmp_path)
-                                        image.name = f"{asset_id}_{map_type}.{file_format}"
-                                        
-                                        # Pack the image into .blend file
-                                        image.pack()
-                                        
-                                        # Set color space based on map type
-                                        if map_type in ['color', 'diffuse', 'albedo']:
-                                            try:
-                                                image.colorspace_settings.name = 'sRGB'
-                                            except:
-                                                pass
-                                        else:
-                                            try:
-                                                image.colorspace_settings.name = 'Non-Color'
-                                            except:
-                                                pass
-                                        
-                                        downloaded_maps[map_type] = image
-                                        
-                                        # Clean up temporary file
-                                        try:
-                                            os.unlink(tmp_path)
-                                        except:
-                                            pass
+                    for map_type, map_path in fetched["maps"].items():
+                        image = self._load_cached_image(map_path, f"{asset_id}_{map_type}.{file_format}")
+                        
+                        # Pack the image into .blend file
+                        if not image.packed_file:
+                            image.pack()
+                        
+                        # Set color space based on map type
+                        if map_type in ['color', 'diffuse', 'albedo']:
+                            try:
+                                image.colorspace_settings.name = 'sRGB'
+                            except:
+                                pass
+                        else:
+                            try:
+                                image.colorspace_settings.name = 'Non-Color'
+                            except:
+                                pass
+                        
+                        downloaded_maps[map_type] = image
                 
                     if not downloaded_maps:
                         return {"error": f"No texture maps found for the requested resolution and format"}
@@ -714,89 +3595,47 @@ class BlenderMCPServer:
                     return {"error": f"Failed to process textures: {str(e)}"}
                 
             elif asset_type == "models":
-                # For models, prefer glTF format if available
-                if not file_format:
-                    file_format = "gltf"  # Default format for models
-                
-                if file_format in files_data and resolution in files_data[file_format]:
-                    file_info = files_data[file_format][resolution][file_format]
-                    file_url = file_info["url"]
+                main_file_path = fetched["main_file"]
+                try:
+                    # Import the model into Blender
+                    if file_format == "gltf" or file_format == "glb":
+                        bpy.ops.import_scene.gltf(filepath=main_file_path)
+                    elif file_format == "fbx":
+                        bpy.ops.import_scene.fbx(filepath=main_file_path)
+                    elif file_format == "obj":
+                        bpy.ops.import_scene.obj(filepath=main_file_path)
+                    elif file_format == "blend":
+                        # For blend files, we need to append or link
+                        with bpy.data.libraries.load(main_file_path, link=False) as (data_from, data_to):
+                            data_to.objects = data_from.objects
+                        
+                        # Link the objects to the scene
+                        for obj in data_to.objects:
+                            if obj is not None:
+                                bpy.context.collection.objects.link(obj)
+                    else:
+                        return {"error": f"Unsupported model format: {file_format}"}
                     
-                    # Create a temporary directory to store the model and its dependencies
-                    temp_dir = tempfile.mkdtemp()
-                    main_file_path = ""
+                    # Get the names of imported objects
+                    imported_objects = [obj.name for obj in bpy.context.selected_objects]
                     
-                    try:
-                        # Download the main model file
-                        main_file_name = file_url.split("/")[-1]
-                        main_file_path = os.path.join(temp_dir, main_file_name)
-                        
-                        response = requests.get(file_url)
-                        if response.status_code != 200:
-                            return {"error": f"Failed to download model: {response.status_code}"}
-                        
-                        with open(main_file_path, "wb") as f:
-                            f.write(response.content)
-                        
-                        # Check for included files and download them
-                        if "include" in file_info and file_info["include"]:
-                            for include_path, include_info in file_info["include"].items():
-                                # Get the URL for the included file - this is the fix
-                                include_url = include_info["url"]
-                                
-                                # Create the directory structure for the included file
-                                include_file_path = os.path.join(temp_dir, include_path)
-                                os.makedirs(os.path.dirname(include_file_path), exist_ok=True)
-                                
-                                # Download the included file
-                                include_response = requests.get(include_url)
-                                if include_response.status_code == 200:
-                                    with open(include_file_path, "wb") as f:
-                                        f.write(include_response.content)
-                                else:
-                                    print(f"Failed to download included file: {include_path}")
-                        
-                        # Import the model into Blender
-                        if file_format == "gltf" or file_format == "glb":
-                            bpy.ops.import_scene.gltf(filepath=main_file_path)
-                        elif file_format == "fbx":
-                            bpy.ops.import_scene.fbx(filepath=main_file_path)
-                        elif file_format == "obj":
-                            bpy.ops.import_scene.obj(filepath=main_file_path)
-                        elif file_format == "blend":
-                            # For blend files, we need to append or link
-                            with bpy.data.libraries.load(main_file_path, link=False) as (data_from, data_to):
-                                data_to.objects = data_from.objects
-                            
-                            # Link the objects to the scene
-                            for obj in data_to.objects:
-                                if obj is not None:
-                                    bpy.context.collection.objects.link(obj)
-                        else:
-                            return {"error": f"Unsupported model format: {file_format}"}
-                        
-                        # Get the names of imported objects
-                        imported_objects = [obj.name for obj in bpy.context.selected_objects]
-                        
-                        return {
-                            "success": True, 
-                            "message": f"Model {asset_id} imported successfully",
-                            "imported_objects": imported_objects
-                        }
-                    except Exception as e:
-                        return {"error": f"Failed to import model: {str(e)}"}
-                    finally:
-                        # Clean up temporary directory
-                        with suppress(Exception):
-                            shutil.rmtree(temp_dir)
-                else:
-                    return {"error": f"Requested format or resolution not available for this model"}
+                    return {
+                        "success": True, 
+                        "message": f"Model {asset_id} imported successfully",
+                        "imported_objects": imported_objects
+                    }
+                except Exception as e:
+                    return {"error": f"Failed to import model: {str(e)}"}
+                finally:
+                    # Clean up temporary directory
+                    with suppress(Exception):
+                        shutil.rmtree(fetched["temp_dir"])
                 
             else:
                 return {"error": f"Unsupported asset type: {asset_type}"}
                 
         except Exception as e:
-            return {"error": f"Failed to download asset: {str(e)}"}
+            return {"error": f"Failed to import asset: {str(e)}"}
 
     def set_texture(self, object_name, texture_id):
         """Apply a previously downloaded Polyhaven texture to an object by creating a new material"""
@@ -1161,30 +4000,33 @@ class BlenderMCPServer:
             images: list[tuple[str, str]]=None,
             bbox_condition=None
         ):
-        try:
-            if images is None:
-                images = []
-            """Call Rodin API, get the job uuid and subscription key"""
-            files = [
-                *[("images", (f"{i:04d}{img_suffix}", img)) for i, (img_suffix, img) in enumerate(images)],
-                ("tier", (None, "Sketch")),
-                ("mesh_mode", (None, "Raw")),
-            ]
-            if text_prompt:
-                files.append(("prompt", (None, text_prompt)))
-            if bbox_condition:
-                files.append(("bbox_condition", (None, json.dumps(bbox_condition))))
-            response = requests.post(
-                "https://hyperhuman.deemos.com/api/v2/rodin",
-                headers={
-                    "Authorization": f"Bearer {bpy.context.scene.blendermcp_hyper3d_api_key}",
-                },
-                files=files
-            )
-            data = response.json()
-            return data
-        except Exception as e:
-            return {"error": str(e)}
+        """Call Rodin API, get the job uuid and subscription key"""
+        api_key = bpy.context.scene.blendermcp_hyper3d_api_key
+        session = HTTP_SESSIONS.get("hyper3d", api_key)
+
+        def work():
+            try:
+                files = [
+                    *[("images", (f"{i:04d}{img_suffix}", img)) for i, (img_suffix, img) in enumerate(images or [])],
+                    ("tier", (None, "Sketch")),
+                    ("mesh_mode", (None, "Raw")),
+                ]
+                if text_prompt:
+                    files.append(("prompt", (None, text_prompt)))
+                if bbox_condition:
+                    files.append(("bbox_condition", (None, json.dumps(bbox_condition))))
+                response = session.post(
+                    "https://hyperhuman.deemos.com/api/v2/rodin",
+                    headers={
+                        "Authorization": f"Bearer {api_key}",
+                    },
+                    files=files
+                )
+                data = response.json()
+                return data
+            except Exception as e:
+                return {"error": str(e)}
+        return BackgroundTask(work)
     
     def create_rodin_job_fal_ai(
             self,
@@ -1192,28 +4034,33 @@ class BlenderMCPServer:
             images: list[tuple[str, str]]=None,
             bbox_condition=None
         ):
-        try:
-            req_data = {
-                "tier": "Sketch",
-            }
-            if images:
-                req_data["input_image_urls"] = images
-            if text_prompt:
-                req_data["prompt"] = text_prompt
-            if bbox_condition:
-                req_data["bbox_condition"] = bbox_condition
-            response = requests.post(
-                "https://queue.fal.run/fal-ai/hyper3d/rodin",
-                headers={
-                    "Authorization": f"Key {bpy.context.scene.blendermcp_hyper3d_api_key}",
-                    "Content-Type": "application/json",
-                },
-                json=req_data
-            )
-            data = response.json()
-            return data
-        except Exception as e:
-            return {"error": str(e)}
+        api_key = bpy.context.scene.blendermcp_hyper3d_api_key
+        session = HTTP_SESSIONS.get("hyper3d", api_key)
+
+        def work():
+            try:
+                req_data = {
+                    "tier": "Sketch",
+                }
+                if images:
+                    req_data["input_image_urls"] = images
+                if text_prompt:
+                    req_data["prompt"] = text_prompt
+                if bbox_condition:
+                    req_data["bbox_condition"] = bbox_condition
+                response = session.post(
+                    "https://queue.fal.run/fal-ai/hyper3d/rodin",
+                    headers={
+                        "Authorization": f"Key {api_key}",
+                        "Content-Type": "application/json",
+                    },
+                    json=req_data
+                )
+                data = response.json()
+                return data
+            except Exception as e:
+                return {"error": str(e)}
+        return BackgroundTask(work)
 
     def poll_rodin_job_status(self, *args, **kwargs):
         match bpy.context.scene.blendermcp_hyper3d_mode:
@@ -1226,30 +4073,40 @@ class BlenderMCPServer:
 
     def poll_rodin_job_status_main_site(self, subscription_key: str):
         """Call the job status API to get the job status"""
-        response = requests.post(
-            "https://hyperhuman.deemos.com/api/v2/status",
-            headers={
-                "Authorization": f"Bearer {bpy.context.scene.blendermcp_hyper3d_api_key}",
-            },
-            json={
-                "subscription_key": subscription_key,
-            },
-        )
-        data = response.json()
-        return {
-            "status_list": [i["status"] for i in data["jobs"]]
-        }
+        api_key = bpy.context.scene.blendermcp_hyper3d_api_key
+        session = HTTP_SESSIONS.get("hyper3d", api_key)
+
+        def work():
+            response = session.post(
+                "https://hyperhuman.deemos.com/api/v2/status",
+                headers={
+                    "Authorization": f"Bearer {api_key}",
+                },
+                json={
+                    "subscription_key": subscription_key,
+                },
+            )
+            data = response.json()
+            return {
+                "status_list": [i["status"] for i in data["jobs"]]
+            }
+        return BackgroundTask(work)
     
     def poll_rodin_job_status_fal_ai(self, request_id: str):
         """Call the job status API to get the job status"""
-        response = requests.get(
-            f"https://queue.fal.run/fal-ai/hyper3d/requests/{request_id}/status",
-            headers={
-                "Authorization": f"KEY {bpy.context.scene.blendermcp_hyper3d_api_key}",
-            },
-        )
-        data = response.json()
-        return data
+        api_key = bpy.context.scene.blendermcp_hyper3d_api_key
+        session = HTTP_SESSIONS.get("hyper3d", api_key)
+
+        def work():
+            response = session.get(
+                f"https://queue.fal.run/fal-ai/hyper3d/requests/{request_id}/status",
+                headers={
+                    "Authorization": f"KEY {api_key}",
+                },
+            )
+            data = response.json()
+            return data
+        return BackgroundTask(work)
 
     @staticmethod
     def _clean_imported_glb(filepath, mesh_name=None):
@@ -1327,54 +4184,42 @@ class BlenderMCPServer:
             case _:
                 return f"Error: Unknown Hyper3D Rodin mode!"
 
-    def import_generated_asset_main_site(self, task_uuid: str, name: str):
-        """Fetch the generated asset, import into blender"""
-        response = requests.post(
-            "https://hyperhuman.deemos.com/api/v2/download",
-            headers={
-                "Authorization": f"Bearer {bpy.context.scene.blendermcp_hyper3d_api_key}",
-            },
-            json={
-                'task_uuid': task_uuid
-            }
+    def _download_to_tempfile(self, session, url, prefix, suffix, progress=None):
+        """Stream url into a named temporary file and return its path"""
+        temp_file = tempfile.NamedTemporaryFile(
+            delete=False,
+            prefix=prefix,
+            suffix=suffix,
         )
-        data_ = response.json()
-        temp_file = None
-        for i in data_["list"]:
-            if i["name"].endswith(".glb"):
-                temp_file = tempfile.NamedTemporaryFile(
-                    delete=False,
-                    prefix=task_uuid,
-                    suffix=".glb",
-                )
-    
-                try:
-                    # Download the content
-                    response = requests.get(i["url"], stream=True)
-                    response.raise_for_status()  # Raise an exception for HTTP errors
-                    
-                    # Write the content to the temporary file
-                    for chunk in response.iter_content(chunk_size=8192):
-                        temp_file.write(chunk)
-                        
-                    # Close the file
-                    temp_file.close()
-                    
-                except Exception as e:
-                    # Clean up the file if there's an error
-                    temp_file.close()
-                    os.unlink(temp_file.name)
-                    return {"succeed": False, "error": str(e)}
-                
-                break
-        else:
-            return {"succeed": False, "error": "Generation failed. Please first make sure that all jobs of the task are done and then try again later."}
+        temp_file.close()
+
+        try:
+            # Download the content
+            with session.get(url, stream=True) as response:
+                response.raise_for_status()  # Raise an exception for HTTP errors
+                self._stream_to_file(response, temp_file.name, progress)
+        except Exception:
+            # Clean up the file if there's an error
+            os.unlink(temp_file.name)
+            raise
+        return temp_file.name
+
+    def _import_generated_glb(self, downloaded, name, progress=None, key=None, instances=None,
+                              instance_mode="linked"):
+        """Main thread part of import_generated_asset: import the downloaded GLB"""
+        if "error" in downloaded:
+            return {"succeed": False, "error": downloaded["error"]}
+        if progress is not None:
+            progress.start("import")
 
         try:
             obj = self._clean_imported_glb(
-                filepath=temp_file.name,
+                filepath=downloaded["filepath"],
                 mesh_name=name
             )
+            if instances is not None:
+                return {"succeed": True, **ASSET_INSTANCER.instance_imported(
+                    key, [obj] if obj else [], instances, instance_mode, name)}
             result = {
                 "name": obj.name,
                 "type": obj.type,
@@ -1392,64 +4237,148 @@ class BlenderMCPServer:
             }
         except Exception as e:
             return {"succeed": False, "error": str(e)}
-    
-    def import_generated_asset_fal_ai(self, request_id: str, name: str):
-        """Fetch the generated asset, import into blender"""
-        response = requests.get(
-            f"https://queue.fal.run/fal-ai/hyper3d/requests/{request_id}",
+        finally:
+            # Imported GLBs are packed into the file, the download is not needed anymore
+            with suppress(OSError):
+                os.unlink(downloaded["filepath"])
+
+    def _download_generated_asset_main_site(self, api_key, task_uuid, progress=None):
+        """Download the GLB of a finished main site task, returns {"filepath"} or {"error"}"""
+        session = HTTP_SESSIONS.get("hyper3d", api_key)
+        response = session.post(
+            "https://hyperhuman.deemos.com/api/v2/download",
             headers={
-                "Authorization": f"Key {bpy.context.scene.blendermcp_hyper3d_api_key}",
+                "Authorization": f"Bearer {api_key}",
+            },
+            json={
+                'task_uuid': task_uuid
             }
         )
         data_ = response.json()
-        temp_file = None
-        
-        temp_file = tempfile.NamedTemporaryFile(
-            delete=False,
-            prefix=request_id,
-            suffix=".glb",
-        )
+        for i in data_["list"]:
+            if i["name"].endswith(".glb"):
+                try:
+                    return {"filepath": self._download_to_tempfile(session, i["url"], task_uuid, ".glb", progress)}
+                except Exception as e:
+                    return {"error": str(e)}
+        return {"error": "Generation failed. Please first make sure that all jobs of the task are done and then try again later."}
 
+    def _download_generated_asset_fal_ai(self, api_key, request_id, progress=None):
+        """Download the GLB of a finished fal.ai request, returns {"filepath"} or {"error"}"""
+        session = HTTP_SESSIONS.get("hyper3d", api_key)
+        response = session.get(
+            f"https://queue.fal.run/fal-ai/hyper3d/requests/{request_id}",
+            headers={
+                "Authorization": f"Key {api_key}",
+            }
+        )
+        data_ = response.json()
         try:
-            # Download the content
-            response = requests.get(data_["model_mesh"]["url"], stream=True)
-            response.raise_for_status()  # Raise an exception for HTTP errors
-            
-            # Write the content to the temporary file
-            for chunk in response.iter_content(chunk_size=8192):
-                temp_file.write(chunk)
-                
-            # Close the file
-            temp_file.close()
-            
+            return {"filepath": self._download_to_tempfile(session, data_["model_mesh"]["url"], request_id, ".glb", progress)}
         except Exception as e:
-            # Clean up the file if there's an error
-            temp_file.close()
-            os.unlink(temp_file.name)
-            return {"succeed": False, "error": str(e)}
+            return {"error": str(e)}
 
-        try:
-            obj = self._clean_imported_glb(
-                filepath=temp_file.name,
-                mesh_name=name
-            )
-            result = {
-                "name": obj.name,
-                "type": obj.type,
-                "location": [obj.location.x, obj.location.y, obj.location.z],
-                "rotation": [obj.rotation_euler.x, obj.rotation_euler.y, obj.rotation_euler.z],
-                "scale": [obj.scale.x, obj.scale.y, obj.scale.z],
-            }
+    @staticmethod
+    def _discard_prefetch(future):
+        """Delete the file a prefetch downloaded, once it is done"""
+        def remove(done):
+            with suppress(Exception):
+                os.unlink(done.result()["filepath"])
+        future.add_done_callback(remove)
 
-            if obj.type == "MESH":
-                bounding_box = self._get_aabb(obj)
-                result["world_bounding_box"] = bounding_box
-            
-            return {
-                "succeed": True, **result
-            }
+    def _drop_prefetches(self, key=None, expired_only=False):
+        """Discard the prefetch of key, those past GENERATED_PREFETCH_TTL, or all of them"""
+        now = time.monotonic()
+        with self._prefetch_lock:
+            dropped = [
+                k for k, (_, started) in self._prefetched_assets.items()
+                if (key is None or k == key) and (not expired_only or now - started > GENERATED_PREFETCH_TTL)
+            ]
+            futures = [self._prefetched_assets.pop(k)[0] for k in dropped]
+        for future in futures:
+            self._discard_prefetch(future)
+
+    def _generated_asset_download(self, key, download, progress):
+        """Result of a prefetch started for key, or a fresh download when there was none"""
+        self._drop_prefetches(expired_only=True)
+        with self._prefetch_lock:
+            future, _ = self._prefetched_assets.pop(key, (None, None))
+        if future is None:
+            return download(progress)
+        try:
+            return future.result()
         except Exception as e:
+            return {"error": str(e)}
+
+    def prefetch_generated_asset(self, task_uuid: str = None, request_id: str = None):
+        """Start downloading a finished generation in the background for a later import_generated_asset"""
+        api_key = bpy.context.scene.blendermcp_hyper3d_api_key
+        match bpy.context.scene.blendermcp_hyper3d_mode:
+            case "MAIN_SITE" if task_uuid:
+                key = task_uuid
+                future = DOWNLOAD_POOL.submit(self._download_generated_asset_main_site, api_key, task_uuid)
+            case "FAL_AI" if request_id:
+                key = request_id
+                future = DOWNLOAD_POOL.submit(self._download_generated_asset_fal_ai, api_key, request_id)
+            case _:
+                return {"error": "task_uuid (main site) or request_id (fal.ai) is required"}
+        # A repeated prefetch replaces the earlier download
+        self._drop_prefetches(key)
+        self._drop_prefetches(expired_only=True)
+        with self._prefetch_lock:
+            self._prefetched_assets[key] = (future, time.monotonic())
+        return {"prefetching": key}
+
+    def _reuse_generated_asset(self, key, name, instances, instance_mode):
+        """Instances of an earlier import of the same generation, None when it has to be imported"""
+        if instances is None:
+            return None
+        try:
+            ASSET_INSTANCER.validate(instances, instance_mode)
+        except ValueError as e:
             return {"succeed": False, "error": str(e)}
+        library = ASSET_INSTANCER.find(key)
+        if library is None:
+            return None
+        return {"succeed": True, "reused": True, **ASSET_INSTANCER.place(library, instances, instance_mode, name)}
+
+    def import_generated_asset_main_site(self, task_uuid: str, name: str, instances=None, instance_mode="linked"):
+        """Fetch the generated asset, import into blender"""
+        api_key = bpy.context.scene.blendermcp_hyper3d_api_key
+        progress = self._progress
+        key = f"hyper3d:{task_uuid}"
+        reused = self._reuse_generated_asset(key, name, instances, instance_mode)
+        if reused is not None:
+            self._drop_prefetches(task_uuid)
+            return reused
+
+        def work():
+            return self._generated_asset_download(
+                task_uuid,
+                lambda progress: self._download_generated_asset_main_site(api_key, task_uuid, progress),
+                progress)
+
+        return BackgroundTask(work, lambda downloaded: self._import_generated_glb(
+            downloaded, name, progress, key, instances, instance_mode))
+
+    def import_generated_asset_fal_ai(self, request_id: str, name: str, instances=None, instance_mode="linked"):
+        """Fetch the generated asset, import into blender"""
+        api_key = bpy.context.scene.blendermcp_hyper3d_api_key
+        progress = self._progress
+        key = f"hyper3d:{request_id}"
+        reused = self._reuse_generated_asset(key, name, instances, instance_mode)
+        if reused is not None:
+            self._drop_prefetches(request_id)
+            return reused
+
+        def work():
+            return self._generated_asset_download(
+                request_id,
+                lambda progress: self._download_generated_asset_fal_ai(api_key, request_id, progress),
+                progress)
+
+        return BackgroundTask(work, lambda downloaded: self._import_generated_glb(
+            downloaded, name, progress, key, instances, instance_mode))
     #endregion
 
     #region Sketchfab API
@@ -1457,7 +4386,10 @@ class BlenderMCPServer:
         """Get the current status of Sketchfab integration"""
         enabled = bpy.context.scene.blendermcp_use_sketchfab
         api_key = bpy.context.scene.blendermcp_sketchfab_api_key
-        
+        # Testing the key is a network round trip
+        return BackgroundTask(lambda: self._sketchfab_status(enabled, api_key))
+    
+    def _sketchfab_status(self, enabled, api_key):
         # Test the API key if present
         if api_key:
             try:
@@ -1465,10 +4397,9 @@ class BlenderMCPServer:
                     "Authorization": f"Token {api_key}"
                 }
                 
-                response = requests.get(
+                response = HTTP_SESSIONS.get("sketchfab", api_key).get(
                     "https://api.sketchfab.com/v3/me",
-                    headers=headers,
-                    timeout=30  # Add timeout of 30 seconds
+                    headers=headers
                 )
                 
                 if response.status_code == 200:
@@ -1516,9 +4447,13 @@ class BlenderMCPServer:
             }
     
     def search_sketchfab_models(self, query, categories=None, count=20, downloadable=True):
+        """Search Sketchfab on the worker pool"""
+        api_key = bpy.context.scene.blendermcp_sketchfab_api_key
+        return BackgroundTask(lambda: self._search_sketchfab_models(api_key, query, categories, count, downloadable))
+    
+    def _search_sketchfab_models(self, api_key, query, categories=None, count=20, downloadable=True):
         """Search for models on Sketchfab based on query and optional filters"""
         try:
-            api_key = bpy.context.scene.blendermcp_sketchfab_api_key
             if not api_key:
                 return {"error": "Sketchfab API key is not configured"}
                 
@@ -1542,11 +4477,10 @@ class BlenderMCPServer:
             
             
             # Use the search endpoint as specified in the API documentation
-            response = requests.get(
+            response = HTTP_SESSIONS.get("sketchfab", api_key).get(
                 "https://api.sketchfab.com/v3/search",
                 headers=headers,
-                params=params,
-                timeout=30  # Add timeout of 30 seconds
+                params=params
             )
             
             if response.status_code == 401:
@@ -1577,10 +4511,37 @@ class BlenderMCPServer:
             traceback.print_exc()
             return {"error": str(e)}
 
-    def download_sketchfab_model(self, uid):
+    def download_sketchfab_model(self, uid, instances=None, instance_mode="linked"):
         """Download a model from Sketchfab by its UID"""
+        api_key = bpy.context.scene.blendermcp_sketchfab_api_key
+        progress = self._progress
+        key = f"sketchfab:{uid}"
+
+        if instances is not None:
+            try:
+                ASSET_INSTANCER.validate(instances, instance_mode)
+            except ValueError as e:
+                return {"error": str(e)}
+            library = ASSET_INSTANCER.find(key)
+            if library is not None:
+                return {
+                    "success": True,
+                    "message": "Model placed from the already imported asset",
+                    "reused": True,
+                    **ASSET_INSTANCER.place(library, instances, instance_mode)
+                }
+
+        return BackgroundTask(
+            lambda: self._fetch_sketchfab_model(api_key, uid, progress),
+            lambda fetched: self._import_sketchfab_model(fetched, progress, key, instances, instance_mode))
+    
+    def _fetch_sketchfab_model(self, api_key, uid, progress=None):
+        """Download and extract a Sketchfab model, returns the extracted glTF path.
+
+        Extracted models are kept under the asset cache directory per UID and
+        model version, so importing the same model again skips the download.
+        """
         try:
-            api_key = bpy.context.scene.blendermcp_sketchfab_api_key
             if not api_key:
                 return {"error": "Sketchfab API key is not configured"}
                 
@@ -1589,13 +4550,30 @@ class BlenderMCPServer:
                 "Authorization": f"Token {api_key}"
             }
             
+            session = HTTP_SESSIONS.get("sketchfab", api_key)
+            
+            # The model's last update time identifies the version of its archive
+            version = None
+            info_response = session.get(f"https://api.sketchfab.com/v3/models/{uid}", headers=headers)
+            if info_response.status_code == 200:
+                version = (info_response.json() or {}).get("updatedAt")
+            
+            model_root = os.path.join(ASSET_CACHE.root, "sketchfab", uid)
+            model_dir = None
+            if version:
+                model_dir = os.path.join(model_root, hashlib.sha1(version.encode("utf-8")).hexdigest()[:12])
+                main_file = self._find_gltf(model_dir)
+                if main_file:
+                    # Keeps recently used models out of reach of pruning
+                    os.utime(model_dir)
+                    return {"main_file": main_file, "from_cache": True}
+            
             # Request download URL using the exact endpoint from the documentation
             download_endpoint = f"https://api.sketchfab.com/v3/models/{uid}/download"
             
-            response = requests.get(
+            response = session.get(
                 download_endpoint,
-                headers=headers,
-                timeout=30  # Add timeout of 30 seconds
+                headers=headers
             )
             
             if response.status_code == 401:
@@ -1618,86 +4596,209 @@ class BlenderMCPServer:
             download_url = gltf_data.get("url")
             if not download_url:
                 return {"error": "No download URL available for this model. Make sure the model is downloadable and you have access."}
-                
-            # Download the model (already has timeout)
-            model_response = requests.get(download_url, timeout=60)  # 60 second timeout
             
-            if model_response.status_code != 200:
-                return {"error": f"Model download failed with status code {model_response.status_code}"}
-                
-            # Save to temporary file
-            temp_dir = tempfile.mkdtemp()
+            os.makedirs(model_root, exist_ok=True)
+            # Unversioned downloads still extract into the cache directory, but only for this import
+            temp_dir = tempfile.mkdtemp(dir=model_root, prefix=".partial-")
             zip_file_path = os.path.join(temp_dir, f"{uid}.zip")
-            
-            with open(zip_file_path, "wb") as f:
-                f.write(model_response.content)
+            keep_temp_dir = False
+            try:
+                # Stream the archive to disk, the read timeout applies between chunks
+                with session.get(download_url, stream=True) as model_response:
+                    if model_response.status_code != 200:
+                        return {"error": f"Model download failed with status code {model_response.status_code}"}
+                    self._stream_to_file(model_response, zip_file_path, progress)
                 
-            # Extract the zip file with enhanced security
-            with zipfile.ZipFile(zip_file_path, 'r') as zip_ref:
-                # More secure zip slip prevention
-                for file_info in zip_ref.infolist():
-                    # Get the path of the file
-                    file_path = file_info.filename
-                    
-                    # Convert directory separators to the current OS style
-                    # This handles both / and \ in zip entries
-                    target_path = os.path.join(temp_dir, os.path.normpath(file_path))
-                    
-                    # Get absolute paths for comparison
-                    abs_temp_dir = os.path.abspath(temp_dir)
-                    abs_target_path = os.path.abspath(target_path)
-                    
-                    # Ensure the normalized path doesn't escape the target directory
-                    if not abs_target_path.startswith(abs_temp_dir):
-                        with suppress(Exception):
-                            shutil.rmtree(temp_dir)
-                        return {"error": "Security issue: Zip contains files with path traversal attempt"}
-                    
-                    # Additional explicit check for directory traversal
-                    if ".." in file_path:
+                # Validate and extract each entry in a single pass over the archive
+                extract_dir = os.path.join(temp_dir, "model")
+                error = self._extract_zip_safely(zip_file_path, extract_dir, progress)
+                if error:
+                    return {"error": error}
+                os.unlink(zip_file_path)
+                
+                main_file = self._find_gltf(extract_dir)
+                if not main_file:
+                    return {"error": "No glTF file found in the downloaded model"}
+                
+                if model_dir is None:
+                    keep_temp_dir = True
+                    return {"main_file": main_file, "temp_dir": temp_dir, "from_cache": False}
+                
+                # Publish the extracted model, replacing older versions of it
+                try:
+                    os.replace(extract_dir, model_dir)
+                except OSError:
+                    # Another download of the same version finished first
+                    pass
+                for entry in os.listdir(model_root):
+                    if entry != os.path.basename(model_dir) and not entry.startswith(".partial-"):
                         with suppress(Exception):
-                            shutil.rmtree(temp_dir)
-                        return {"error": "Security issue: Zip contains files with directory traversal sequence"}
+                            shutil.rmtree(os.path.join(model_root, entry))
+                self._prune_sketchfab_cache()
+                main_file = self._find_gltf(model_dir)
+                if not main_file:
+                    return {"error": "No glTF file found in the downloaded model"}
+                return {"main_file": main_file, "from_cache": False}
+            finally:
+                if not keep_temp_dir:
+                    with suppress(Exception):
+                        shutil.rmtree(temp_dir)
+        
+        except requests.exceptions.Timeout:
+            return {"error": "Request timed out. Check your internet connection and try again with a simpler model."}
+        except json.JSONDecodeError as e:
+            return {"error": f"Invalid JSON response from Sketchfab API: {str(e)}"}
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            return {"error": f"Failed to download model: {str(e)}"}
+    
+    @staticmethod
+    def _stream_to_file(response, path, progress=None):
+        """Write a streamed response to path, reporting the bytes written as download progress"""
+        done = 0
+        if progress is not None:
+            progress.start("download", int(response.headers.get("Content-Length") or 0) or None)
+        with open(path, "wb") as f:
+            for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                if not chunk:
+                    continue
+                f.write(chunk)
+                done += len(chunk)
+                if progress is not None:
+                    progress.advance("download", len(chunk))
+        return done
+    
+    @staticmethod
+    def _extract_zip_safely(zip_file_path, target_dir, progress=None):
+        """Extract a zip, rejecting any entry that would land outside target_dir. Returns an error or None"""
+        abs_target_dir = os.path.abspath(target_dir)
+        with zipfile.ZipFile(zip_file_path, 'r') as zip_ref:
+            entries = zip_ref.infolist()
+            if progress is not None:
+                progress.start("extract", sum(file_info.file_size for file_info in entries))
+            for file_info in entries:
+                # Get the path of the file
+                file_path = file_info.filename
                 
-                # If all files passed security checks, extract them
-                zip_ref.extractall(temp_dir)
+                # Explicit check for directory traversal
+                if ".." in file_path:
+                    return "Security issue: Zip contains files with directory traversal sequence"
                 
-            # Find the main glTF file
-            gltf_files = [f for f in os.listdir(temp_dir) if f.endswith('.gltf') or f.endswith('.glb')]
-            
-            if not gltf_files:
-                with suppress(Exception):
-                    shutil.rmtree(temp_dir)
-                return {"error": "No glTF file found in the downloaded model"}
+                # Convert directory separators to the current OS style
+                # This handles both / and \ in zip entries
+                abs_target_path = os.path.abspath(os.path.join(target_dir, os.path.normpath(file_path)))
                 
-            main_file = os.path.join(temp_dir, gltf_files[0])
-            
+                # Ensure the normalized path doesn't escape the target directory
+                if os.path.commonpath([abs_target_dir, abs_target_path]) != abs_target_dir:
+                    return "Security issue: Zip contains files with path traversal attempt"
+                
+                if file_info.is_dir():
+                    os.makedirs(abs_target_path, exist_ok=True)
+                    continue
+                os.makedirs(os.path.dirname(abs_target_path), exist_ok=True)
+                with zip_ref.open(file_info) as src, open(abs_target_path, "wb") as dst:
+                    shutil.copyfileobj(src, dst, DOWNLOAD_CHUNK_SIZE)
+                if progress is not None:
+                    progress.advance("extract", file_info.file_size)
+        return None
+    
+    @staticmethod
+    def _find_gltf(directory):
+        """Path of the top level .gltf/.glb file in directory, or None"""
+        if not os.path.isdir(directory):
+            return None
+        gltf_files = sorted(f for f in os.listdir(directory) if f.endswith('.gltf') or f.endswith('.glb'))
+        return os.path.join(directory, gltf_files[0]) if gltf_files else None
+    
+    @staticmethod
+    def _prune_sketchfab_cache():
+        """Drop the least recently used extracted models beyond SKETCHFAB_CACHE_MODELS"""
+        root = os.path.join(ASSET_CACHE.root, "sketchfab")
+        models = []
+        for uid in os.listdir(root):
+            for version in os.listdir(os.path.join(root, uid)):
+                if not version.startswith(".partial-"):
+                    path = os.path.join(root, uid, version)
+                    models.append((os.path.getmtime(path), path))
+        models.sort(reverse=True)
+        for _, path in models[SKETCHFAB_CACHE_MODELS:]:
+            with suppress(Exception):
+                shutil.rmtree(path)
+    
+    def _import_sketchfab_model(self, fetched, progress=None, key=None, instances=None, instance_mode="linked"):
+        """Main thread part of download_sketchfab_model"""
+        if "error" in fetched:
+            return fetched
+        if progress is not None:
+            progress.start("import")
+        try:
             # Import the model
-            bpy.ops.import_scene.gltf(filepath=main_file)
+            bpy.ops.import_scene.gltf(filepath=fetched["main_file"])
             
+            if instances is not None:
+                imported = list(bpy.context.selected_objects)
+                roots = [obj for obj in imported if obj.parent not in imported]
+                name = roots[0].name if len(roots) == 1 else key.replace(":", "_")
+                return {
+                    "success": True,
+                    "message": "Model imported successfully",
+                    "from_cache": fetched["from_cache"],
+                    **ASSET_INSTANCER.instance_imported(key, imported, instances, instance_mode, name)
+                }
+
             # Get the names of imported objects
             imported_objects = [obj.name for obj in bpy.context.selected_objects]
             
-            # Clean up temporary files
-            with suppress(Exception):
-                shutil.rmtree(temp_dir)
-            
             return {
                 "success": True,
                 "message": "Model imported successfully",
-                "imported_objects": imported_objects
+                "imported_objects": imported_objects,
+                "from_cache": fetched["from_cache"]
             }
-        
-        except requests.exceptions.Timeout:
-            return {"error": "Request timed out. Check your internet connection and try again with a simpler model."}
-        except json.JSONDecodeError as e:
-            return {"error": f"Invalid JSON response from Sketchfab API: {str(e)}"}
         except Exception as e:
-            import traceback
             traceback.print_exc()
-            return {"error": f"Failed to download model: {str(e)}"}
+            return {"error": f"Failed to import model: {str(e)}"}
+        finally:
+            # Uncached downloads are removed once imported
+            if "temp_dir" in fetched:
+                with suppress(Exception):
+                    shutil.rmtree(fetched["temp_dir"])
     #endregion
 
+# Scene change handlers, forwarded to the running server instance
+@persistent
+def _on_depsgraph_update(scene, depsgraph):
+    server = getattr(bpy.types, "blendermcp_server", None)
+    if server and server.running:
+        AABB_ENGINE.note_depsgraph_updates(depsgraph)
+        server._invalidate_screenshots()
+        server._bump_scene_generation(depsgraph)
+        server._record_scene_changes(scene, depsgraph)
+
+@persistent
+def _on_undo_post(scene, *args):
+    server = getattr(bpy.types, "blendermcp_server", None)
+    if server and server.running:
+        AABB_ENGINE.clear()
+        server._invalidate_screenshots()
+        server._bump_scene_generation()
+        server._record_history_step(scene, "undo")
+
+@persistent
+def _on_redo_post(scene, *args):
+    server = getattr(bpy.types, "blendermcp_server", None)
+    if server and server.running:
+        AABB_ENGINE.clear()
+        server._invalidate_screenshots()
+        server._bump_scene_generation()
+        server._record_history_step(scene, "redo")
+
+@persistent
+def _on_load_post(*args):
+    # Session namespaces would keep references to data of the previous file
+    CODE_EXECUTOR.clear()
+
 # Blender UI Panel
 class BLENDERMCP_PT_Panel(bpy.types.Panel):
     bl_label = "Blender MCP"
@@ -1846,6 +4947,9 @@ def unregister():
     if hasattr(bpy.types, "blendermcp_server") and bpy.types.blendermcp_server:
         bpy.types.blendermcp_server.stop()
         del bpy.types.blendermcp_server
+    HTTP_SESSIONS.close()
+    EXPORT_WORKER_POOL.close()
+    ASSET_CACHE.flush()
     
     bpy.utils.unregister_class(BLENDERMCP_PT_Panel)
     bpy.utils.unregister_class(BLENDERMCP_OT_SetFreeTrialHyper3DAPIKey)
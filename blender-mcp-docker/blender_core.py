@@ -1,3 +1,5 @@
+import asyncio
+import threading
 from typing import Callable, Dict, Any, Optional
 from dataclasses import dataclass
 
@@ -40,3 +42,56 @@ def register_prompt(name: str):
         PROMPT_REGISTRY[name] = func
         return func
     return decorator
+
+
+class NotificationHub:
+    """Fan-out of server notifications to SSE subscribers, safe to publish from any thread"""
+
+    def __init__(self, max_queue_size: int = 256):
+        self.max_queue_size = max_queue_size
+        self._subscribers = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+
+    def bind(self, loop: asyncio.AbstractEventLoop):
+        """Attach the event loop that owns the subscriber queues"""
+        self._loop = loop
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.max_queue_size)
+        with self._lock:
+            self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        with self._lock:
+            self._subscribers.discard(queue)
+
+    def publish(self, notification: Dict[str, Any]):
+        """Queue a notification for every subscriber"""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._dispatch(notification)
+        else:
+            loop.call_soon_threadsafe(self._dispatch, notification)
+
+    def _dispatch(self, notification: Dict[str, Any]):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for queue in subscribers:
+            if queue.full():
+                # Slow consumer: drop the oldest message rather than blocking everyone
+                try:
+                    queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    pass
+            queue.put_nowait(notification)
+
+
+NOTIFICATION_HUB = NotificationHub()
@@ -3,7 +3,7 @@ import socket
 import json
 import asyncio
 import logging
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Dict, Any, Callable, Optional
 import os
 from pathlib import Path
@@ -13,10 +13,9 @@ from aiohttp import web
 import aiohttp_cors
 from aiohttp_sse import sse_response
 import uuid
-import weakref
-import queue
 import time
-from blender_core import TOOL_REGISTRY, PROMPT_REGISTRY
+import threading
+from blender_core import TOOL_REGISTRY, PROMPT_REGISTRY, NOTIFICATION_HUB
 from tool_set import * 
 
 
@@ -24,12 +23,29 @@ logging.basicConfig(level=logging.INFO,
                     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger("BlenderMCPServer")
 
+# Overall time a command may take, keepalives included, before it is cancelled in Blender.
+# Commands doing downloads, imports or exports get longer than the default; each can be
+# overridden with BLENDERMCP_<COMMAND>_TIMEOUT
+DEFAULT_COMMAND_TIMEOUT = float(os.environ.get("BLENDERMCP_COMMAND_TIMEOUT", "120"))
+COMMAND_TIMEOUTS = {
+    command: float(os.environ.get(f"BLENDERMCP_{command.upper()}_TIMEOUT", default))
+    for command, default in {
+        "export_model": 660,
+        "generate_lods": 300,
+        "download_polyhaven_asset": 600,
+        "download_sketchfab_model": 600,
+        "import_generated_asset": 600,
+        "build_scene": 300,
+    }.items()
+}
+
 
 @dataclass
 class BlenderConnection:
     host: str
     port: int
     sock: socket.socket = None  
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
     
     def connect(self) -> bool:
         """Connect to the Blender addon socket server"""
@@ -56,72 +72,134 @@ class BlenderConnection:
             finally:
                 self.sock = None
 
-    def receive_full_response(self, sock, buffer_size=8192):
-        """Receive the complete response, potentially in multiple chunks"""
-        chunks = []
+    @staticmethod
+    def _decode_frame(decoder, buffer):
+        """Decode the JSON frame at the start of buffer, returns (frame, bytes consumed) or (None, 0)"""
+        # surrogateescape keeps byte offsets recoverable when binary data or a split character follows
+        text = buffer.decode('utf-8', errors='surrogateescape')
+        start = len(text) - len(text.lstrip())
+        if start == len(text):
+            return None, 0
+        try:
+            frame, end = decoder.raw_decode(text, start)
+        except json.JSONDecodeError:
+            # Incomplete JSON, continue receiving
+            return None, 0
+        return frame, len(text[:end].encode('utf-8', errors='surrogateescape'))
+
+    def receive_full_response(self, sock, request_id=None, on_progress=None, buffer_size=8192, deadline=None):
+        """Receive frames until the response to request_id arrives and return it parsed.
+
+        While a command runs the addon may send progress and keepalive frames
+        carrying the same id; each one restarts the receive timeout. Frames with
+        another id belong to a command that already timed out and are dropped.
+        A frame with binary_length is followed by that many raw bytes, which
+        are returned under the frame's "binary" key. With a deadline (a
+        time.monotonic() value) socket.timeout is raised once it passes,
+        however many keepalives arrive.
+        """
+        decoder = json.JSONDecoder()
+        buffer = b''
         # Use a consistent timeout value that matches the addon's timeout
-        sock.settimeout(15.0)  # Match the addon's timeout
+        sock.settimeout(15.0)
         
-        try:
-            while True:
-                try:
-                    chunk = sock.recv(buffer_size)
-                    if not chunk:
-                        # If we get an empty chunk, the connection might be closed
-                        if not chunks:  # If we haven't received anything yet, this is an error
-                            raise Exception("Connection closed before receiving any data")
-                        break
-                    
+        def receive():
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise socket.timeout("Command deadline exceeded")
+                sock.settimeout(min(15.0, remaining))
+            chunk = sock.recv(buffer_size)
+            if not chunk:
+                raise ConnectionError("Connection closed before receiving a response")
+            return chunk
+        
+        while True:
+            # Frames are concatenated JSON objects, decode as many as are complete
+            frame, consumed = self._decode_frame(decoder, buffer)
+            if frame is None:
+                buffer += receive()
+                continue
+            buffer = buffer[consumed:]
+            
+            if not isinstance(frame, dict):
+                raise ValueError(f"Unexpected frame from Blender: {frame!r}")
+            binary_length = frame.pop("binary_length", None)
+            if binary_length is not None:
+                chunks = [buffer]
+                received = len(buffer)
+                while received < binary_length:
+                    chunk = receive()
                     chunks.append(chunk)
-                    
-                    # Check if we've received a complete JSON object
-                    try:
-                        data = b''.join(chunks)
-                        json.loads(data.decode('utf-8'))
-                        # If we get here, it parsed successfully
-                        logger.info(f"Received complete response ({len(data)} bytes)")
-                        return data
-                    except json.JSONDecodeError:
-                        # Incomplete JSON, continue receiving
-                        continue
-                except socket.timeout:
-                    # If we hit a timeout during receiving, break the loop and try to use what we have
-                    logger.warning("Socket timeout during chunked receive")
-                    break
-                except (ConnectionError, BrokenPipeError, ConnectionResetError) as e:
-                    logger.error(f"Socket connection error during receive: {str(e)}")
-                    raise  # Re-raise to be handled by the caller
-        except socket.timeout:
-            logger.warning("Socket timeout during chunked receive")
-        except Exception as e:
-            logger.error(f"Error during receive: {str(e)}")
-            raise
+                    received += len(chunk)
+                data = b''.join(chunks)
+                frame["binary"], buffer = data[:binary_length], data[binary_length:]
             
-        # If we get here, we either timed out or broke out of the loop
-        # Try to use what we have
-        if chunks:
-            data = b''.join(chunks)
-            logger.info(f"Returning data after receive completion ({len(data)} bytes)")
-            try:
-                # Try to parse what we have
-                json.loads(data.decode('utf-8'))
-                return data
-            except json.JSONDecodeError:
-                # If we can't parse it, it's incomplete
-                raise Exception("Incomplete JSON response received")
-        else:
-            raise Exception("No data received")
+            frame_id = frame.get("id")
+            if frame.get("type") in ("progress", "keepalive"):
+                if frame_id == request_id and frame["type"] == "progress" and on_progress:
+                    on_progress(frame)
+                continue
+            if request_id is not None and frame_id is not None and frame_id != request_id:
+                logger.warning(f"Discarding response to an earlier request {frame_id}")
+                continue
+            logger.info(f"Received complete response ({consumed + (binary_length or 0)} bytes)")
+            return frame
+
+    def send_command(self, command_type: str, params: Dict[str, Any] = None, timeout: float = None) -> Dict[str, Any]:
+        """Send a command to Blender and return the response.
+
+        The command is cancelled in Blender if no response arrives within
+        timeout seconds, even while keepalives keep coming. Without one the
+        command's entry in COMMAND_TIMEOUTS, or DEFAULT_COMMAND_TIMEOUT, applies.
+        """
+        if timeout is None:
+            timeout = COMMAND_TIMEOUTS.get(command_type, DEFAULT_COMMAND_TIMEOUT)
+        # Tool calls run concurrently in worker threads, but the socket carries one exchange at a time
+        with self.lock:
+            return self._send_command(command_type, params, timeout)
 
-    def send_command(self, command_type: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
-        """Send a command to Blender and return the response"""
+    def _cancel(self, request_id: str):
+        """Ask Blender to stop a timed-out command, then drop the connection it was sent on"""
+        try:
+            self.sock.sendall(json.dumps({
+                "type": "cancel",
+                "params": {"request_id": request_id},
+                "id": uuid.uuid4().hex
+            }).encode('utf-8'))
+            logger.info(f"Sent cancel for request {request_id}")
+        except Exception as e:
+            logger.warning(f"Could not send cancel for request {request_id}: {str(e)}")
+        try:
+            self.sock.close()
+        except Exception:
+            pass
+        self.sock = None
+
+    def _send_command(self, command_type: str, params: Dict[str, Any] = None, timeout: float = None) -> Dict[str, Any]:
         if not self.sock and not self.connect():
             raise ConnectionError("Not connected to Blender")
         
+        request_id = uuid.uuid4().hex
         command = {
             "type": command_type,
-            "params": params or {}
+            "params": params or {},
+            "id": request_id
         }
         
+        def on_progress(frame):
+            # Relayed to SSE clients as it arrives
+            NOTIFICATION_HUB.publish({
+                "type": "progress",
+                "request_id": request_id,
+                "command": command_type,
+                "stage": frame.get("stage"),
+                "done": frame.get("done"),
+                "total": frame.get("total"),
+                "message": frame.get("message"),
+                "timestamp": time.time()
+            })
+        
         try:
             # Log the command being sent
             logger.info(f"Sending command: {command_type} with params: {params}")
@@ -130,36 +208,31 @@ class BlenderConnection:
             self.sock.sendall(json.dumps(command).encode('utf-8'))
             logger.info(f"Command sent, waiting for response...")
             
-            # Set a timeout for receiving - use the same timeout as in receive_full_response
-            self.sock.settimeout(15.0)  # Match the addon's timeout
-            
-            # Receive the response using the improved receive_full_response method
-            response_data = self.receive_full_response(self.sock)
-            logger.info(f"Received {len(response_data)} bytes of data")
-            
-            response = json.loads(response_data.decode('utf-8'))
+            deadline = time.monotonic() + timeout
+            response = self.receive_full_response(self.sock, request_id, on_progress, deadline=deadline)
             logger.info(f"Response parsed, status: {response.get('status', 'unknown')}")
             
             if response.get("status") == "error":
                 logger.error(f"Blender error: {response.get('message')}")
                 raise Exception(response.get("message", "Unknown error from Blender"))
             
-            return response.get("result", {})
+            result = response.get("result", {})
+            if "binary" in response and isinstance(result, dict):
+                result["binary"] = response["binary"]
+            return result
         except socket.timeout:
             logger.error("Socket timeout while waiting for response from Blender")
-            # Don't try to reconnect here - let the get_blender_connection handle reconnection
-            # Just invalidate the current socket so it will be recreated next time
-            self.sock = None
+            # Free Blender's main thread for the next command, then invalidate the socket;
+            # get_blender_connection handles reconnecting next time
+            self._cancel(request_id)
             raise Exception("Timeout waiting for Blender response - try simplifying your request")
         except (ConnectionError, BrokenPipeError, ConnectionResetError) as e:
             logger.error(f"Socket connection error: {str(e)}")
             self.sock = None
             raise Exception(f"Connection to Blender lost: {str(e)}")
-        except json.JSONDecodeError as e:
-            logger.error(f"Invalid JSON response from Blender: {str(e)}")
-            # Try to log what was received
-            if 'response_data' in locals() and response_data:
-                logger.error(f"Raw response (first 200 bytes): {response_data[:200]}")
+        except ValueError as e:
+            logger.error(f"Invalid response from Blender: {str(e)}")
+            self.sock = None
             raise Exception(f"Invalid response from Blender: {str(e)}")
         except Exception as e:
             logger.error(f"Error communicating with Blender: {str(e)}")
@@ -167,14 +240,17 @@ class BlenderConnection:
             self.sock = None
             raise Exception(f"Communication error with Blender: {str(e)}")
 
-# Global connection and notification management
+# Global connection management
 _blender_connection = None
 _polyhaven_enabled = False
-_notification_clients = weakref.WeakSet()
-_notification_queue = queue.Queue()
+_connection_lock = threading.Lock()
 
 def get_blender_connection():
     """Get or create a persistent Blender connection"""
+    with _connection_lock:
+        return _get_blender_connection()
+
+def _get_blender_connection():
     global _blender_connection, _polyhaven_enabled
     
     # If we have an existing connection, check if it's still valid
@@ -244,10 +320,15 @@ class MCPHTTPServer:
         return web.json_response({"status": "healthy"})
         
     async def handle_mcp_post(self, request):
-        """Handle MCP POST requests"""
+        """Handle MCP POST requests, single JSON-RPC objects or batch arrays"""
+        body = None
         try:
             # Parse the JSON-RPC request
             body = await request.json()
+            
+            if isinstance(body, list):
+                return await self.handle_mcp_batch(body)
+            
             logger.info(f"Received MCP request: {body.get('method', 'unknown')}")
             
             # Process the request through FastMCP
@@ -263,9 +344,36 @@ class MCPHTTPServer:
                     "code": -32603,
                     "message": f"Internal error: {str(e)}"
                 },
-                "id": body.get('id') if 'body' in locals() else None
+                "id": body.get('id') if isinstance(body, dict) else None
             }, status=500)
     
+    async def handle_mcp_batch(self, batch):
+        """Run the entries of a JSON-RPC batch concurrently and answer in request order"""
+        if not batch:
+            return web.json_response({
+                "jsonrpc": "2.0",
+                "error": {"code": -32600, "message": "Invalid Request: empty batch"},
+                "id": None
+            })
+        
+        logger.info(f"Received MCP batch of {len(batch)}: {[entry.get('method', 'unknown') if isinstance(entry, dict) else 'invalid' for entry in batch]}")
+        
+        async def run_entry(entry):
+            if not isinstance(entry, dict) or 'method' not in entry:
+                return {"jsonrpc": "2.0", "error": {"code": -32600, "message": "Invalid Request"}, "id": None}
+            return await self.process_mcp_request(entry)
+        
+        results = await asyncio.gather(*(run_entry(entry) for entry in batch))
+        
+        # Notifications (entries without an id) get no response
+        responses = [
+            result for entry, result in zip(batch, results)
+            if not isinstance(entry, dict) or 'method' not in entry or 'id' in entry
+        ]
+        if not responses:
+            return web.Response(status=204)
+        return web.json_response(responses)
+    
     async def handle_mcp_get(self, request):
         """Handle MCP GET requests with SSE for streaming"""
         try:
@@ -284,7 +392,8 @@ class MCPHTTPServer:
                             "prompts": {},
                             "logging": {},
                             "experimental": {
-                                "sse": True
+                                "sse": True,
+                                "scene_events": True
                             }
                         },
                         "serverInfo": {
@@ -307,8 +416,8 @@ class MCPHTTPServer:
             client_id = str(uuid.uuid4())
             logger.info(f"SSE client connected: {client_id}")
             
-            # Add client to notification set
-            _notification_clients.add(resp)
+            # Subscribe this client to server notifications
+            notifications = NOTIFICATION_HUB.subscribe()
             
             try:
                 # Send initial connection message
@@ -318,23 +427,17 @@ class MCPHTTPServer:
                     "message": "Connected to BlenderMCP SSE stream"
                 }))
                 
-                # Keep connection alive and send notifications
+                # Push notifications as they arrive, with a heartbeat when idle
                 while True:
                     try:
-                        # Check for notifications
                         try:
-                            notification = _notification_queue.get_nowait()
+                            notification = await asyncio.wait_for(notifications.get(), timeout=30)
                             await resp.send(json.dumps(notification))
-                        except queue.Empty:
-                            pass
-                        
-                        # Send heartbeat every 30 seconds
-                        await resp.send(json.dumps({
-                            "type": "heartbeat",
-                            "timestamp": time.time()
-                        }))
-                        
-                        await asyncio.sleep(30)
+                        except asyncio.TimeoutError:
+                            await resp.send(json.dumps({
+                                "type": "heartbeat",
+                                "timestamp": time.time()
+                            }))
                         
                     except Exception as e:
                         logger.error(f"Error in SSE stream: {str(e)}")
@@ -344,7 +447,7 @@ class MCPHTTPServer:
                 logger.error(f"SSE stream error: {str(e)}")
             finally:
                 logger.info(f"SSE client disconnected: {client_id}")
-                _notification_clients.discard(resp)
+                NOTIFICATION_HUB.unsubscribe(notifications)
                 
         return resp
     
@@ -422,27 +525,56 @@ class MCPHTTPServer:
             if tool_name not in TOOL_REGISTRY:
                 raise ValueError(f"Unknown tool: {tool_name}")
             tool_def = TOOL_REGISTRY[tool_name]
-            return tool_def.handler(args)
+            # Handlers block on the Blender socket, keep them off the event loop
+            return await asyncio.to_thread(tool_def.handler, args)
         except Exception as e:
             return f"Error in tool '{tool_name}': {str(e)}"
         
     async def broadcast_notification(self, notification):
         """Broadcast notification to all SSE clients"""
-        _notification_queue.put(notification)
+        NOTIFICATION_HUB.publish(notification)
+
+
+async def listen_for_blender_events(host="localhost", port=9876):
+    """Subscribe to scene change events from the Blender addon and relay them over SSE"""
+    backoff = 1.0
+    while True:
+        writer = None
+        try:
+            reader, writer = await asyncio.open_connection(host, port, limit=2 ** 20)
+            writer.write(json.dumps({"type": "subscribe_events", "params": {}}).encode('utf-8'))
+            await writer.drain()
+            logger.info(f"Subscribed to Blender scene events at {host}:{port}")
+            backoff = 1.0
+            
+            while True:
+                line = await reader.readline()
+                if not line:
+                    raise ConnectionError("Blender closed the event stream")
+                try:
+                    event = json.loads(line.decode('utf-8'))
+                except json.JSONDecodeError:
+                    logger.warning(f"Invalid event frame from Blender: {line[:200]}")
+                    continue
+                if event.get("type") == "scene_change":
+                    NOTIFICATION_HUB.publish(event)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Blender event stream unavailable: {str(e)}, retrying in {backoff:.0f}s")
+        finally:
+            if writer is not None:
+                writer.close()
         
-        # Also send directly to active clients
-        for client in list(_notification_clients):
-            try:
-                await client.send(json.dumps(notification))
-            except Exception as e:
-                logger.warning(f"Failed to send notification to client: {str(e)}")
-                _notification_clients.discard(client)
+        await asyncio.sleep(backoff)
+        backoff = min(backoff * 2, 30.0)
 
 
 def main():
     """Run the HTTP MCP server"""
     async def _async_main():
         server = MCPHTTPServer(host='0.0.0.0', port=8080)
+        NOTIFICATION_HUB.bind(asyncio.get_running_loop())
         
         # Try to connect to Blender on startup
         try:
@@ -466,12 +598,16 @@ def main():
         logger.info("  GET /mcp - Server capabilities (or SSE with Accept: text/event-stream)")
         logger.info("  GET /health - Health check")
         
+        # Relay Blender scene change notifications to SSE clients
+        events_task = asyncio.create_task(listen_for_blender_events())
+        
         # Keep the server running
         try:
             await asyncio.Future()  # Run forever
         except KeyboardInterrupt:
             logger.info("Shutting down server")
         finally:
+            events_task.cancel()
             # Clean up Blender connection
             global _blender_connection
             if _blender_connection:
@@ -0,0 +1,177 @@
+import time
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, Any, Optional
+from blender_core import NOTIFICATION_HUB
+from blender_server import get_blender_connection
+
+logger = logging.getLogger("BlenderMCPServer")
+
+# Poll intervals grow by BACKOFF_FACTOR while a job's status stays the same
+INITIAL_POLL_INTERVAL = 2.0
+BACKOFF_FACTOR = 1.5
+MAX_POLL_INTERVAL = 20.0
+# Consecutive failed polls before a job is given up on
+MAX_POLL_ERRORS = 5
+# Finished jobs are forgotten after this long
+FINISHED_JOB_TTL = 3600
+
+
+@dataclass
+class RodinJob:
+    """A submitted Hyper3D Rodin job, identified by subscription_key (main site) or request_id (fal.ai)"""
+    key: str
+    params: Dict[str, Any]
+    state: str = "pending"
+    status: Any = None
+    error: Optional[str] = None
+    submitted_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+    interval: float = INITIAL_POLL_INTERVAL
+    next_poll: float = field(default_factory=time.monotonic)
+    errors: int = 0
+
+    @property
+    def finished(self) -> bool:
+        return self.state != "pending"
+
+    def summary(self) -> Dict[str, Any]:
+        finished_at = self.finished_at or time.time()
+        result = {
+            "state": self.state,
+            "status": self.status,
+            "elapsed": round(finished_at - self.submitted_at, 1),
+        }
+        if self.error:
+            result["error"] = self.error
+        return result
+
+
+def _job_state(status: Any) -> str:
+    """Map a poll_rodin_job_status result onto pending/done/failed"""
+    if not isinstance(status, dict):
+        return "pending"
+    # Main site: one status per sub-job
+    if "status_list" in status:
+        statuses = status["status_list"]
+        if any(s == "Failed" for s in statuses):
+            return "failed"
+        if statuses and all(s == "Done" for s in statuses):
+            return "done"
+        return "pending"
+    # fal.ai queue
+    if status.get("error"):
+        return "failed"
+    if status.get("status") == "COMPLETED":
+        return "done"
+    return "pending"
+
+
+class RodinJobPoller:
+    """Polls submitted Rodin jobs on a background thread with adaptive backoff.
+
+    Jobs start at INITIAL_POLL_INTERVAL and slow down while nothing changes,
+    resetting whenever the status moves. Finished jobs wake up any waiters
+    and are announced through the notification hub.
+    """
+
+    def __init__(self):
+        self._jobs: Dict[str, RodinJob] = {}
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def track(self, subscription_key: str = None, request_id: str = None) -> RodinJob:
+        """Start polling a job, or return it if it is already tracked"""
+        key = subscription_key or request_id
+        if not key:
+            raise ValueError("subscription_key or request_id is required")
+        params = {"subscription_key": subscription_key} if subscription_key else {"request_id": request_id}
+
+        with self._cond:
+            job = self._jobs.get(key)
+            if job is None:
+                job = self._jobs[key] = RodinJob(key=key, params=params)
+                logger.info(f"Tracking Rodin job {key}")
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="rodin-poller", daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+        return job
+
+    def get(self, key: str) -> Optional[RodinJob]:
+        with self._cond:
+            return self._jobs.get(key)
+
+    def wait(self, key: str, timeout: float) -> RodinJob:
+        """Block until the job finishes or timeout seconds pass, then return it"""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            job = self._jobs[key]
+            while not job.finished:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            return job
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._forget_finished()
+                pending = [job for job in self._jobs.values() if not job.finished]
+                if not pending:
+                    # Nothing to poll, the next track() starts a new thread
+                    self._thread = None
+                    return
+                job = min(pending, key=lambda j: j.next_poll)
+                delay = job.next_poll - time.monotonic()
+                if delay > 0:
+                    # Also woken early by track()
+                    self._cond.wait(delay)
+                    continue
+            self._poll(job)
+
+    def _poll(self, job: RodinJob):
+        try:
+            status = get_blender_connection().send_command("poll_rodin_job_status", job.params)
+            error = None
+        except Exception as e:
+            status, error = None, str(e)
+
+        with self._cond:
+            if error is not None:
+                job.errors += 1
+                logger.warning(f"Polling Rodin job {job.key} failed ({job.errors}/{MAX_POLL_ERRORS}): {error}")
+                if job.errors >= MAX_POLL_ERRORS:
+                    job.state, job.error = "failed", error
+            else:
+                job.errors = 0
+                if status != job.status:
+                    job.interval = INITIAL_POLL_INTERVAL
+                else:
+                    job.interval = min(job.interval * BACKOFF_FACTOR, MAX_POLL_INTERVAL)
+                job.status = status
+                job.state = _job_state(status)
+
+            job.next_poll = time.monotonic() + job.interval
+            if not job.finished:
+                return
+            job.finished_at = time.time()
+            self._cond.notify_all()
+
+        logger.info(f"Rodin job {job.key} finished: {job.state}")
+        NOTIFICATION_HUB.publish({
+            "type": "rodin_job",
+            "key": job.key,
+            **job.summary(),
+            "timestamp": time.time()
+        })
+
+    def _forget_finished(self):
+        now = time.time()
+        for key in [k for k, j in self._jobs.items() if j.finished and now - j.finished_at > FINISHED_JOB_TTL]:
+            del self._jobs[key]
+
+
+RODIN_POLLER = RodinJobPoller()
@@ -0,0 +1,163 @@
+"""CodeExecutor tests: output capture, sessions, budget and cancel.
+
+Outside Blender the addon is imported against minimal bpy/bmesh stand-ins;
+the executor itself only needs the Python runtime.
+"""
+import os
+import sys
+import threading
+import time
+import types
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class _Anything:
+    def __getattr__(self, name):
+        return _Anything()
+
+    def __call__(self, *args, **kwargs):
+        return _Anything()
+
+    def __iter__(self):
+        return iter(())
+
+
+class _TypesModule(types.ModuleType):
+    def __getattr__(self, name):
+        return type(name, (), {})
+
+
+def _install_blender_stubs():
+    try:
+        import bpy  # noqa: F401
+        return
+    except ImportError:
+        pass
+    bpy = types.ModuleType("bpy")
+    for name in ("context", "data", "ops", "utils"):
+        setattr(bpy, name, _Anything())
+    bpy.types = _TypesModule("bpy.types")
+    bpy.props = types.ModuleType("bpy.props")
+    for name in ("StringProperty", "IntProperty", "BoolProperty", "EnumProperty"):
+        setattr(bpy.props, name, lambda **kwargs: None)
+    bpy.app = types.ModuleType("bpy.app")
+    bpy.app.timers = _Anything()
+    bpy.app.handlers = types.ModuleType("bpy.app.handlers")
+    bpy.app.handlers.persistent = lambda f: f
+    for name in ("depsgraph_update_post", "undo_post", "redo_post", "load_post"):
+        setattr(bpy.app.handlers, name, [])
+    sys.modules.update({
+        "bpy": bpy,
+        "bpy.types": bpy.types,
+        "bpy.props": bpy.props,
+        "bpy.app": bpy.app,
+        "bpy.app.handlers": bpy.app.handlers,
+        "bmesh": types.ModuleType("bmesh"),
+        "mathutils": types.ModuleType("mathutils"),
+    })
+    for name in ("Vector", "Matrix", "Euler", "Quaternion"):
+        setattr(sys.modules["mathutils"], name, tuple)
+
+
+_install_blender_stubs()
+addon = pytest.importorskip("addon")
+
+
+@pytest.fixture
+def executor():
+    return addon.CodeExecutor()
+
+
+def test_budget_interrupts_tight_loop(executor):
+    start = time.perf_counter()
+    with pytest.raises(addon.ExecutionInterrupted, match="budget"):
+        executor.run("while True: pass", budget=0.3)
+    assert time.perf_counter() - start < 3
+
+
+def test_budget_survives_swallowed_interruptions(executor):
+    code = (
+        "def step():\n"
+        "    try:\n"
+        "        sum(range(1000))\n"
+        "    except BaseException:\n"
+        "        pass\n"
+        "while True:\n"
+        "    step()\n"
+    )
+    start = time.perf_counter()
+    with pytest.raises(addon.ExecutionInterrupted, match="budget"):
+        executor.run(code, budget=0.3)
+    # Most deliveries land in the try and are swallowed; re-raising still gets out
+    assert time.perf_counter() - start < 30
+
+
+@pytest.mark.parametrize("body, handler", [("raise ValueError", "except BaseException"), ("pass", "finally")])
+def test_interrupted_in_handler_tears_down(executor, body, handler):
+    # Nearly all the time is spent in the snippet's own handler, so that is
+    # where the interruptions land
+    code = (
+        "while True:\n"
+        "    try:\n"
+        f"        {body}\n"
+        f"    {handler}:\n"
+        "        for _ in range(10000):\n"
+        "            pass\n"
+    )
+    with pytest.raises(addon.ExecutionInterrupted, match="budget"):
+        executor.run(code, budget=0.2)
+    assert getattr(sys.stdout._local, "buffer", None) is None
+    # A late interruption would land in this loop
+    end = time.perf_counter() + 0.3
+    while time.perf_counter() < end:
+        pass
+    for thread in threading.enumerate():
+        if thread.name == "blendermcp-watchdog":
+            thread.join(1)
+            assert not thread.is_alive()
+
+
+def test_watchdog_holds_fire_outside_the_snippet():
+    # Past its deadline, but this thread is not running the snippet's code
+    watchdog = addon.ExecutionWatchdog(threading.get_ident(), 0, filename="<mcp-snippet-none>")
+    watchdog.start()
+    end = time.perf_counter() + 0.3
+    while time.perf_counter() < end:
+        pass
+    watchdog.join(1)
+    assert not watchdog.is_alive()
+    assert watchdog.reason is None
+
+
+def test_cancel_interrupts(executor):
+    cancel = threading.Event()
+    threading.Timer(0.2, cancel.set).start()
+    with pytest.raises(addon.ExecutionInterrupted, match="cancelled"):
+        executor.run("while True: pass", budget=None, cancel=cancel)
+
+
+def test_no_interruption_after_finishing(executor):
+    result = executor.run("x = 1", budget=0.2)
+    assert result["output"] == ""
+    # A late interruption would land here
+    time.sleep(0.4)
+    assert executor.run("print(2)", budget=None)["output"] == "2\n"
+
+
+def test_captures_stdout_writes(executor):
+    code = "import sys, pprint\nsys.stdout.write('x')\npprint.pprint([1])\nprint('y')"
+    assert executor.run(code)["output"] == "x[1]\ny\n"
+
+
+def test_namespaces(executor):
+    executor.run("a = 1")
+    with pytest.raises(NameError):
+        executor.run("a")
+    executor.run("b = 2", session="s")
+    assert executor.run("print(b)", session="s")["output"] == "2\n"
+    executor.clear()
+    with pytest.raises(NameError):
+        executor.run("b", session="s")
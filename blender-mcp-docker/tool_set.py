@@ -1,6 +1,9 @@
 import json
 import tempfile
 import os
+import time
+import queue
+import threading
 from pathlib import Path
 import base64
 from urllib.parse import urlparse
@@ -8,6 +11,47 @@ from urllib.parse import urlparse
 import logging
 from blender_core import register_tool, register_prompt
 from blender_server import get_blender_connection, _polyhaven_enabled
+from rodin_poller import RODIN_POLLER
+
+# Default execute_blender_code budget, and extra time allowed for the response before cancelling
+CODE_TIMEOUT = 10.0
+CODE_TIMEOUT_GRACE = 5.0
+
+# Schema properties shared by the asset import tools for placing instances
+ASSET_INSTANCE_PROPERTIES = {
+    "instances": {
+        "type": "array",
+        "description": "Place the asset once per transform as instances sharing one copy of its meshes instead of importing it as a single object. Importing the same asset again with instances reuses the earlier import without downloading",
+        "items": {
+            "type": "object",
+            "properties": {
+                "name": {"type": "string"},
+                "location": {"type": "array", "items": {"type": "number"}, "minItems": 3, "maxItems": 3},
+                "rotation": {"type": "array", "items": {"type": "number"}, "minItems": 3, "maxItems": 3, "description": "Euler XYZ in radians"},
+                "scale": {"description": "Uniform number or [x, y, z]"}
+            }
+        },
+        "minItems": 1
+    },
+    "instance_mode": {
+        "type": "string",
+        "description": "linked: object copies sharing mesh data, editable per instance; collection: empties instancing the asset collection",
+        "enum": ["linked", "collection"],
+        "default": "linked"
+    }
+}
+
+
+def _instance_params(args: dict) -> dict:
+    """instances/instance_mode arguments to forward to Blender"""
+    if not args.get("instances"):
+        return {}
+    return {"instances": args["instances"], "instance_mode": args.get("instance_mode") or "linked"}
+
+
+def _placed_instances(result: dict) -> str:
+    return (f"Placed {len(result['instances'])} {result['instance_mode']} instances "
+            f"of '{result['library']}': {', '.join(result['instances'])}")
 
 
 # Tool definitions with proper schemas
@@ -41,6 +85,11 @@ def get_scene_info(args: dict) -> str:
             "object_name": {
                 "type": "string",
                 "description": "Name of the object to get information about"
+            },
+            "exact_bounds": {
+                "type": "boolean",
+                "description": "Compute the world bounding box from the mesh vertices instead of the local bounding box corners (tighter for rotated objects, slower)",
+                "default": False
             }
         },
         "required": ["object_name"]
@@ -54,12 +103,210 @@ def get_object_info(args: dict) -> str:
     
     try:
         blender = get_blender_connection()
-        result = blender.send_command("get_object_info", {"name": object_name})
+        result = blender.send_command("get_object_info", {
+            "name": object_name,
+            "exact_bounds": bool(args.get('exact_bounds', False))
+        })
         return json.dumps(result, indent=2)
     except Exception as e:
         logger.error(f"Error getting object info from Blender: {str(e)}")
         return f"Error getting object info: {str(e)}"
 
+@register_tool(
+    name="get_objects_info",
+    description="Get information about many objects in one call, selected by a list of names, a glob pattern (e.g. 'Chair*') and/or object types. Use this instead of repeated get_object_info calls. Results are paged; pass next_offset back as offset to get the next page",
+    input_schema={
+        "type": "object",
+        "properties": {
+            "names": {
+                "type": "array",
+                "items": {"type": "string"},
+                "description": "Exact object names to look up (optional)"
+            },
+            "pattern": {
+                "type": "string",
+                "description": "Glob pattern matched against object names (optional)"
+            },
+            "types": {
+                "type": "array",
+                "items": {
+                    "type": "string",
+                    "enum": ["MESH", "CURVE", "SURFACE", "META", "FONT", "ARMATURE", "LATTICE", "EMPTY", "GPENCIL", "CAMERA", "LIGHT", "SPEAKER", "LIGHT_PROBE", "VOLUME", "POINTCLOUD", "CURVES"]
+                },
+                "description": "Only include objects of these types (optional)"
+            },
+            "fields": {
+                "type": "array",
+                "items": {
+                    "type": "string",
+                    "enum": ["type", "location", "rotation", "scale", "visible", "world_bounding_box", "materials", "mesh"]
+                },
+                "description": "Fields to return for each object (default: all)"
+            },
+            "offset": {
+                "type": "integer",
+                "description": "Index of the first object to return",
+                "default": 0,
+                "minimum": 0
+            },
+            "limit": {
+                "type": "integer",
+                "description": "Maximum number of objects to return",
+                "default": 50,
+                "minimum": 1,
+                "maximum": 500
+            },
+            "exact_bounds": {
+                "type": "boolean",
+                "description": "Compute world bounding boxes from the mesh vertices instead of the local bounding box corners (tighter for rotated objects, slower)",
+                "default": False
+            }
+        },
+        "required": []
+    }
+)
+def get_objects_info(args: dict) -> str:
+    """Get information about many objects in the Blender scene in one call."""
+    params = {key: args[key] for key in ("names", "pattern", "types", "fields", "offset", "limit", "exact_bounds")
+              if args.get(key) is not None}
+    
+    try:
+        blender = get_blender_connection()
+        result = blender.send_command("get_objects_info", params)
+        return json.dumps(result)
+    except Exception as e:
+        logger.error(f"Error getting objects info from Blender: {str(e)}")
+        return f"Error getting objects info: {str(e)}"
+
+@register_tool(
+    name="query_scene",
+    description="Query all objects in the scene with filters (type, collection, name prefix, bounding-box region), field selection and sorting. Unlike get_scene_info this covers the whole scene: results are paged, pass next_cursor back as cursor with the same filters to get the next page",
+    input_schema={
+        "type": "object",
+        "properties": {
+            "types": {
+                "type": "array",
+                "items": {"type": "string"},
+                "description": "Only include objects of these types, e.g. ['MESH', 'LIGHT'] (optional)"
+            },
+            "collection": {
+                "type": "string",
+                "description": "Only include objects linked to this collection (optional)"
+            },
+            "name_prefix": {
+                "type": "string",
+                "description": "Only include objects whose name starts with this prefix (optional)"
+            },
+            "bbox": {
+                "type": "array",
+                "items": {
+                    "type": "array",
+                    "items": {"type": "number"},
+                    "minItems": 3,
+                    "maxItems": 3
+                },
+                "description": "Only include objects whose world bounding box intersects this region, as [[min_x, min_y, min_z], [max_x, max_y, max_z]] (optional)",
+                "minItems": 2,
+                "maxItems": 2
+            },
+            "fields": {
+                "type": "array",
+                "items": {
+                    "type": "string",
+                    "enum": ["type", "collections", "parent", "location", "rotation", "scale", "visible", "materials", "world_bounding_box"]
+                },
+                "description": "Fields to return for each object (default: type, location)"
+            },
+            "sort_by": {
+                "type": "string",
+                "enum": ["name", "type", "x", "y", "z", "size"],
+                "description": "Sort order; x/y/z sort by bounding box center, size by largest dimension",
+                "default": "name"
+            },
+            "descending": {
+                "type": "boolean",
+                "description": "Sort in descending order",
+                "default": False
+            },
+            "limit": {
+                "type": "integer",
+                "description": "Maximum number of objects per page",
+                "default": 100,
+                "minimum": 1,
+                "maximum": 500
+            },
+            "cursor": {
+                "type": "string",
+                "description": "next_cursor from a previous page of the same query (optional)"
+            }
+        },
+        "required": []
+    }
+)
+def query_scene(args: dict) -> str:
+    """Query the objects in the Blender scene with filters and cursor-based paging."""
+    params = {key: args[key] for key in ("types", "collection", "name_prefix", "bbox", "fields",
+                                         "sort_by", "descending", "limit", "cursor")
+              if args.get(key) is not None}
+    
+    try:
+        blender = get_blender_connection()
+        result = blender.send_command("query_scene", params)
+        return json.dumps(result)
+    except Exception as e:
+        logger.error(f"Error querying scene in Blender: {str(e)}")
+        return f"Error querying scene: {str(e)}"
+
+
+@register_tool(
+    name="generate_lods",
+    description="Build decimated level-of-detail (LOD) meshes for heavy mesh objects so a lighter model can be exported. Either give decimation ratios (one LOD level per ratio) or a triangle budget per object and/or for the whole scene (one LOD level). LODs are cached and only rebuilt when the source mesh changes; export them with export_model's lod parameter",
+    input_schema={
+        "type": "object",
+        "properties": {
+            "object_names": {
+                "type": "array",
+                "items": {"type": "string"},
+                "description": "Objects to build LODs for (default: every mesh in the scene)"
+            },
+            "ratios": {
+                "type": "array",
+                "items": {"type": "number", "exclusiveMinimum": 0, "maximum": 1},
+                "description": "Fraction of triangles kept by LOD1, LOD2, ... (default: [0.5, 0.25, 0.1])"
+            },
+            "triangle_budget": {
+                "type": "integer",
+                "description": "Maximum triangles per object for LOD1 (optional)",
+                "minimum": 1
+            },
+            "scene_triangle_budget": {
+                "type": "integer",
+                "description": "Maximum triangles for the whole scene at LOD1 (optional)",
+                "minimum": 1
+            },
+            "min_triangles": {
+                "type": "integer",
+                "description": "Meshes with fewer triangles are left at full resolution",
+                "default": 2000,
+                "minimum": 0
+            }
+        },
+        "required": []
+    }
+)
+def generate_lods(args: dict) -> str:
+    """Build LOD meshes for heavy objects in the Blender scene."""
+    params = {key: args[key] for key in ("object_names", "ratios", "triangle_budget", "scene_triangle_budget", "min_triangles")
+              if args.get(key) is not None}
+    
+    try:
+        blender = get_blender_connection()
+        result = blender.send_command("generate_lods", params)
+        return json.dumps(result)
+    except Exception as e:
+        logger.error(f"Error generating LODs in Blender: {str(e)}")
+        return f"Error generating LODs: {str(e)}"
+
 
 @register_tool(
     name="export_model",
@@ -70,6 +317,31 @@ def get_object_info(args: dict) -> str:
             "export_format": {
                 "type": "string",
                 "description": "Model export type format"
+            },
+            "profile": {
+                "type": "string",
+                "enum": ["default", "web-preview", "archive"],
+                "description": "Export profile: 'web-preview' uses Draco mesh compression, quantization and downscaled WebP textures for fast browser loading, 'archive' keeps full quality, 'default' uses the exporter's defaults",
+                "default": "default"
+            },
+            "compare": {
+                "type": "boolean",
+                "description": "Also export with the default profile to report how much the profile saved; this runs a second full export",
+                "default": False
+            },
+            "background": {
+                "type": "boolean",
+                "description": "Export a snapshot of the scene in a headless Blender process, so Blender keeps answering other tool calls during large exports",
+                "default": False
+            },
+            "job_id": {
+                "type": "string",
+                "description": "Job the export belongs to, used to name its export directory"
+            },
+            "lod": {
+                "type": "integer",
+                "description": "Export LOD meshes of this level (built with generate_lods) instead of the full-resolution meshes. Objects without an up-to-date LOD fall back to the nearest lower level, or to full resolution",
+                "minimum": 1
             }
         },
         "required": ["export_format"]
@@ -80,10 +352,20 @@ def export_model(args: dict) -> str:
     export_format = args.get('export_format')
     if not export_format:
         export_format = "GLB"
+    params = {"export_format": export_format}
+    for key in ("lod", "profile", "compare", "job_id", "background"):
+        if args.get(key):
+            params[key] = args[key]
     # Export 
     try:
         blender = get_blender_connection()
-        result = blender.send_command("export_model", {"export_format": export_format})
+        result = blender.send_command("export_model", params)
+        if isinstance(result, dict) and "size_bytes" in result:
+            summary = f"Exported {result['size_bytes']} bytes to {result['filepath']}"
+            if "baseline_size_bytes" in result:
+                summary += (f"; the default profile gives {result['baseline_size_bytes']} bytes, "
+                            f"{result['saved_bytes']} bytes ({result['saved_percent']}%) saved")
+            logger.info(summary)
         return json.dumps(result)
         # decoded_data = base64.b64decode(base64_data)
         # print("Base64 data decoded successfully.")
@@ -132,6 +414,12 @@ def export_model(args: dict) -> str:
                 "default": 800,
                 "minimum": 100,
                 "maximum": 2048
+            },
+            "format": {
+                "type": "string",
+                "enum": ["jpeg", "webp", "png"],
+                "description": "Image format; falls back to png when Blender cannot encode the requested one",
+                "default": "jpeg"
             }
         },
         "required": []
@@ -140,39 +428,169 @@ def export_model(args: dict) -> str:
 def get_viewport_screenshot(args: dict) -> str:
     """Capture a screenshot of the current Blender 3D viewport."""
     max_size = args.get('max_size', 800)
+    image_format = args.get('format', 'jpeg')
     
     try:
         blender = get_blender_connection()
-        temp_dir = tempfile.gettempdir()
-        temp_path = os.path.join(temp_dir, f"blender_screenshot_{os.getpid()}.png")
-        
+        # The image comes back in memory as a binary frame, no temp file involved
         result = blender.send_command("get_viewport_screenshot", {
             "max_size": max_size,
-            "filepath": temp_path,
-            "format": "png"
+            "format": image_format
         })
         
         if "error" in result:
             raise Exception(result["error"])
         
-        if not os.path.exists(temp_path):
-            raise Exception("Screenshot file was not created")
-        
-        # Read and encode the file as base64
-        with open(temp_path, 'rb') as f:
-            image_bytes = f.read()
-        
-        # Delete the temp file
-        os.remove(temp_path)
+        image_bytes = result.get("binary")
+        if image_bytes is None:
+            raise Exception("Screenshot data was not received")
         
         # Return base64 encoded image
         image_b64 = base64.b64encode(image_bytes).decode('utf-8')
-        return f"Screenshot captured successfully. Base64 data: data:image/png;base64,{image_b64}"
+        return f"Screenshot captured successfully. Base64 data: data:image/{result.get('format', 'png')};base64,{image_b64}"
         
     except Exception as e:
         logger.error(f"Error capturing screenshot: {str(e)}")
         return f"Screenshot failed: {str(e)}"
 
+@register_tool(
+    name="get_contact_sheet",
+    description="Render several fixed views of the model (e.g. front, right, top, iso) in one call and return them tiled into a single base64 image. Use this instead of moving the camera and taking repeated screenshots to check a model from several angles. The user's viewport is not changed",
+    input_schema={
+        "type": "object",
+        "properties": {
+            "views": {
+                "type": "array",
+                "items": {
+                    "type": "string",
+                    "enum": ["front", "back", "right", "left", "top", "bottom", "iso"]
+                },
+                "description": "Views to render, tiled left to right and top to bottom (default: front, right, top, iso)"
+            },
+            "object_names": {
+                "type": "array",
+                "items": {"type": "string"},
+                "description": "Objects to frame (default: all visible geometry)"
+            },
+            "tile_size": {
+                "type": "integer",
+                "description": "Width and height of each view in pixels",
+                "default": 384,
+                "minimum": 64,
+                "maximum": 1024
+            },
+            "format": {
+                "type": "string",
+                "enum": ["jpeg", "webp", "png"],
+                "description": "Image format; falls back to png when Blender cannot encode the requested one",
+                "default": "jpeg"
+            }
+        },
+        "required": []
+    }
+)
+def get_contact_sheet(args: dict) -> str:
+    """Render several views of the scene into one contact sheet image."""
+    params = {key: args[key] for key in ("views", "object_names", "tile_size", "format")
+              if args.get(key) is not None}
+    params.setdefault("format", "jpeg")
+    
+    try:
+        blender = get_blender_connection()
+        result = blender.send_command("get_contact_sheet", params)
+        
+        if "error" in result:
+            raise Exception(result["error"])
+        
+        image_bytes = result.get("binary")
+        if image_bytes is None:
+            raise Exception("Contact sheet data was not received")
+        
+        layout = " / ".join(", ".join(row) for row in result.get("layout", []))
+        image_b64 = base64.b64encode(image_bytes).decode('utf-8')
+        return f"Contact sheet captured successfully (rows: {layout}). Base64 data: data:image/{result.get('format', 'png')};base64,{image_b64}"
+        
+    except Exception as e:
+        logger.error(f"Error capturing contact sheet: {str(e)}")
+        return f"Contact sheet failed: {str(e)}"
+
+@register_tool(
+    name="build_scene",
+    description="Build many objects in one call from a declarative spec: primitives (cube, plane, grid, circle, uv_sphere, ico_sphere, cylinder, cone, empty) with transforms, materials, modifiers and parenting. Prefer this over several execute_blender_code calls. Objects with the same primitive parameters, or that set instance_of, share one mesh",
+    input_schema={
+        "type": "object",
+        "properties": {
+            "objects": {
+                "type": "array",
+                "description": "Objects to create",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "name": {"type": "string", "description": "Unique object name"},
+                        "primitive": {
+                            "type": "string",
+                            "enum": ["cube", "plane", "grid", "circle", "uv_sphere", "ico_sphere", "cylinder", "cone", "empty"],
+                            "default": "cube"
+                        },
+                        "instance_of": {"type": "string", "description": "Name of another object in this spec whose mesh is reused instead of a primitive"},
+                        "size": {"type": "number", "description": "cube, plane, grid: edge length"},
+                        "radius": {"type": "number", "description": "circle, uv_sphere, ico_sphere, cylinder"},
+                        "radius1": {"type": "number", "description": "cone: bottom radius"},
+                        "radius2": {"type": "number", "description": "cone: top radius"},
+                        "depth": {"type": "number", "description": "cylinder, cone: height"},
+                        "segments": {"type": "integer", "description": "circle, uv_sphere, cylinder, cone"},
+                        "rings": {"type": "integer", "description": "uv_sphere"},
+                        "subdivisions": {"type": "integer", "description": "ico_sphere"},
+                        "x_segments": {"type": "integer", "description": "plane, grid"},
+                        "y_segments": {"type": "integer", "description": "plane, grid"},
+                        "fill": {"type": "boolean", "description": "circle: fill with a face"},
+                        "location": {"type": "array", "items": {"type": "number"}, "minItems": 3, "maxItems": 3},
+                        "rotation": {"type": "array", "items": {"type": "number"}, "minItems": 3, "maxItems": 3, "description": "Euler XYZ in radians"},
+                        "scale": {"description": "Uniform number or [x, y, z]"},
+                        "material": {"type": "string", "description": "Material defined in materials or already in the scene"},
+                        "smooth": {"type": "boolean", "description": "Smooth shading (default on for spheres)"},
+                        "modifiers": {
+                            "type": "array",
+                            "items": {"type": "object"},
+                            "description": "Modifiers as {\"type\": \"BEVEL\", \"width\": 0.02, \"segments\": 3}; other keys set modifier properties, object properties take object names"
+                        },
+                        "parent": {"type": "string", "description": "Parent object; location/rotation/scale are then relative to it"}
+                    },
+                    "required": ["name"]
+                }
+            },
+            "materials": {
+                "type": "object",
+                "description": "Materials by name: {\"Wood\": {\"color\": [0.4, 0.25, 0.1, 1], \"roughness\": 0.7, \"metallic\": 0, \"alpha\": 1, \"emission\": [r, g, b], \"emission_strength\": 1}}",
+                "additionalProperties": {"type": "object"}
+            },
+            "collection": {
+                "type": "string",
+                "description": "Collection to put the objects in, created if missing (default: the scene collection)"
+            },
+            "replace": {
+                "type": "boolean",
+                "description": "Remove existing objects with the same names first instead of creating renamed copies",
+                "default": False
+            }
+        },
+        "required": ["objects"]
+    }
+)
+def build_scene(args: dict) -> str:
+    """Build objects in Blender from a declarative scene spec."""
+    params = {key: args[key] for key in ("objects", "materials", "collection", "replace")
+              if args.get(key) is not None}
+    
+    try:
+        blender = get_blender_connection()
+        result = blender.send_command("build_scene", params)
+        return json.dumps(result)
+    except Exception as e:
+        logger.error(f"Error building scene in Blender: {str(e)}")
+        return f"Error building scene: {str(e)}"
+
+
 @register_tool(
     name="execute_blender_code",
     description="Execute arbitrary Python code in Blender's Python environment. Use this for creating objects, modifying scene, or any Blender operations",
@@ -181,7 +599,23 @@ def get_viewport_screenshot(args: dict) -> str:
         "properties": {
             "code": {
                 "type": "string",
-                "description": "Python code to execute in Blender"
+                "description": "Python code to execute in Blender. bpy, bmesh, mathutils (Vector, Matrix, Euler, Quaternion), math and numpy as np are already imported"
+            },
+            "session": {
+                "type": "string",
+                "description": "Named namespace to run in; variables, functions and imports defined by earlier code in the same session are still available. Without one the code runs in a fresh namespace"
+            },
+            "reset_session": {
+                "type": "boolean",
+                "description": "Start the session from a fresh namespace before running the code",
+                "default": False
+            },
+            "timeout": {
+                "type": "number",
+                "description": "Seconds the code may run before it is interrupted",
+                "default": 10,
+                "minimum": 1,
+                "maximum": 600
             }
         },
         "required": ["code"]
@@ -192,11 +626,17 @@ def execute_blender_code(args: dict) -> str:
     code = args.get('code')
     if not code:
         return "Error: code parameter is required"
+    params = {"code": code}
+    for key in ("session", "reset_session"):
+        if args.get(key):
+            params[key] = args[key]
+    params["timeout"] = float(args.get("timeout") or CODE_TIMEOUT)
     
     try:
         blender = get_blender_connection()
-        result = blender.send_command("execute_code", {"code": code})
-        return f"Code executed successfully: {result.get('result', '')}"
+        # Blender interrupts the code itself at the budget; the grace period covers queueing behind other commands
+        result = blender.send_command("execute_code", params, timeout=params["timeout"] + CODE_TIMEOUT_GRACE)
+        return f"Code executed successfully in {result.get('duration_ms', 0)} ms: {result.get('result', '')}"
     except Exception as e:
         logger.error(f"Error executing code: {str(e)}")
         return f"Error executing code: {str(e)}"
@@ -245,10 +685,14 @@ def get_polyhaven_categories(args: dict) -> str:
 
 @register_tool(
     name="search_polyhaven_assets",
-    description="Search for assets on Polyhaven with optional filtering by asset type and categories",
+    description="Search for assets on Polyhaven by keywords, with optional filtering by asset type and categories. Results are ranked by relevance and paginated",
     input_schema={
         "type": "object",
         "properties": {
+            "query": {
+                "type": "string",
+                "description": "Keywords matched against asset names, tags and categories (optional)"
+            },
             "asset_type": {
                 "type": "string",
                 "description": "Type of assets to search for",
@@ -261,6 +705,16 @@ def get_polyhaven_categories(args: dict) -> str:
                     "type": "string"
                 },
                 "description": "List of categories to filter by (optional)"
+            },
+            "limit": {
+                "type": "integer",
+                "description": "Maximum number of results to return",
+                "default": 20
+            },
+            "offset": {
+                "type": "integer",
+                "description": "Number of results to skip, use next_offset from a previous search to get the next page",
+                "default": 0
             }
         },
         "required": []
@@ -270,12 +724,16 @@ def search_polyhaven_assets(args: dict) -> str:
     """Search for assets on Polyhaven with optional filtering."""
     asset_type = args.get('asset_type', 'all')
     categories = args.get('categories')
+    query = args.get('query')
     
     try:
         blender = get_blender_connection()
         result = blender.send_command("search_polyhaven_assets", {
             "asset_type": asset_type,
-            "categories": categories
+            "categories": categories,
+            "query": query,
+            "limit": args.get('limit', 20),
+            "offset": args.get('offset', 0)
         })
         
         if "error" in result:
@@ -286,18 +744,22 @@ def search_polyhaven_assets(args: dict) -> str:
         returned_count = result["returned_count"]
         
         formatted_output = f"Found {total_count} assets"
+        if query:
+            formatted_output += f" matching '{query}'"
         if categories:
             formatted_output += f" in categories: {categories}"
-        formatted_output += f"\nShowing {returned_count} assets:\n\n"
+        formatted_output += f"\nShowing {returned_count} assets from offset {result.get('offset', 0)}:\n\n"
         
-        sorted_assets = sorted(assets.items(), key=lambda x: x[1].get("download_count", 0), reverse=True)
-        
-        for asset_id, asset_data in sorted_assets:
+        # Assets arrive already ranked by relevance and popularity
+        for asset_id, asset_data in assets.items():
             formatted_output += f"- {asset_data.get('name', asset_id)} (ID: {asset_id})\n"
             formatted_output += f"  Type: {['HDRI', 'Texture', 'Model'][asset_data.get('type', 0)]}\n"
             formatted_output += f"  Categories: {', '.join(asset_data.get('categories', []))}\n"
             formatted_output += f"  Downloads: {asset_data.get('download_count', 'Unknown')}\n\n"
         
+        if result.get("next_offset") is not None:
+            formatted_output += f"More results available, search again with offset={result['next_offset']}\n"
+        
         return formatted_output
     except Exception as e:
         logger.error(f"Error searching Polyhaven assets: {str(e)}")
@@ -327,7 +789,8 @@ def search_polyhaven_assets(args: dict) -> str:
             "file_format": {
                 "type": "string",
                 "description": "File format to download (depends on asset type)"
-            }
+            },
+            **ASSET_INSTANCE_PROPERTIES
         },
         "required": ["asset_id", "asset_type"]
     }
@@ -348,7 +811,8 @@ def download_polyhaven_asset(args: dict) -> str:
             "asset_id": asset_id,
             "asset_type": asset_type,
             "resolution": resolution,
-            "file_format": file_format
+            "file_format": file_format,
+            **_instance_params(args)
         })
         
         if "error" in result:
@@ -364,6 +828,8 @@ def download_polyhaven_asset(args: dict) -> str:
                 maps = ", ".join(result.get("maps", []))
                 return f"{message}. Created material '{material_name}' with maps: {maps}."
             elif asset_type == "models":
+                if "instances" in result:
+                    return f"{message}. {_placed_instances(result)}"
                 return f"{message}. The model has been imported into the current scene."
             else:
                 return message
@@ -470,7 +936,8 @@ def search_sketchfab_models(args: dict) -> str:
             "uid": {
                 "type": "string",
                 "description": "Unique identifier of the Sketchfab model to download"
-            }
+            },
+            **ASSET_INSTANCE_PROPERTIES
         },
         "required": ["uid"]
     }
@@ -484,7 +951,7 @@ def download_sketchfab_model(args: dict) -> str:
     
     try:
         blender = get_blender_connection()
-        result = blender.send_command("download_sketchfab_model", {"uid": uid})
+        result = blender.send_command("download_sketchfab_model", {"uid": uid, **_instance_params(args)})
         
         if result is None:
             return "Error: Received no response from Sketchfab download request"
@@ -493,6 +960,8 @@ def download_sketchfab_model(args: dict) -> str:
             return f"Error: {result['error']}"
         
         if result.get("success"):
+            if "instances" in result:
+                return f"Successfully imported model. {_placed_instances(result)}"
             imported_objects = result.get("imported_objects", [])
             object_names = ", ".join(imported_objects) if imported_objects else "none"
             return f"Successfully imported model. Created objects: {object_names}"
@@ -513,6 +982,30 @@ def _process_bbox(original_bbox):
     return [int(float(i) / max(original_bbox) * 100) for i in original_bbox] if original_bbox else None
 
 
+def _submit_rodin_job(blender, text_prompt=None, images=None, bbox_condition=None) -> dict:
+    """Create a Rodin job and start polling it in the background.
+
+    Returns {task_uuid, subscription_key} for the main site, or the raw
+    response (carrying request_id on success) for fal.ai and errors.
+    """
+    result = blender.send_command("create_rodin_job", {
+        "text_prompt": text_prompt,
+        "images": images,
+        "bbox_condition": _process_bbox(bbox_condition),
+    })
+    
+    if result.get("submit_time", False):
+        # Polled in the background from now on, see wait_for_rodin_job
+        RODIN_POLLER.track(subscription_key=result["jobs"]["subscription_key"])
+        return {
+            "task_uuid": result["uuid"],
+            "subscription_key": result["jobs"]["subscription_key"],
+        }
+    if result.get("request_id"):
+        RODIN_POLLER.track(request_id=result["request_id"])
+    return result
+
+
 @register_tool(
     name="generate_hyper3d_model_via_text",
     description="Generate a 3D model using Hyper3D Rodin AI by providing a text description",
@@ -549,20 +1042,7 @@ def generate_hyper3d_model_via_text(args: dict) -> str:
     
     try:
         blender = get_blender_connection()
-        result = blender.send_command("create_rodin_job", {
-            "text_prompt": text_prompt,
-            "images": None,
-            "bbox_condition": _process_bbox(bbox_condition),
-        })
-        
-        succeed = result.get("submit_time", False)
-        if succeed:
-            return json.dumps({
-                "task_uuid": result["uuid"],
-                "subscription_key": result["jobs"]["subscription_key"],
-            })
-        else:
-            return json.dumps(result)
+        return json.dumps(_submit_rodin_job(blender, text_prompt, None, bbox_condition))
     except Exception as e:
         logger.error(f"Error generating Hyper3D task: {str(e)}")
         return f"Error generating Hyper3D task: {str(e)}"
@@ -632,20 +1112,7 @@ def generate_hyper3d_model_via_images(args: dict) -> str:
     
     try:
         blender = get_blender_connection()
-        result = blender.send_command("create_rodin_job", {
-            "text_prompt": None,
-            "images": images,
-            "bbox_condition": _process_bbox(bbox_condition),
-        })
-        
-        succeed = result.get("submit_time", False)
-        if succeed:
-            return json.dumps({
-                "task_uuid": result["uuid"],
-                "subscription_key": result["jobs"]["subscription_key"],
-            })
-        else:
-            return json.dumps(result)
+        return json.dumps(_submit_rodin_job(blender, None, images, bbox_condition))
     except Exception as e:
         logger.error(f"Error generating Hyper3D task: {str(e)}")
         return f"Error generating Hyper3D task: {str(e)}"
@@ -685,12 +1152,58 @@ def poll_rodin_job_status(args: dict) -> str:
         elif request_id:
             kwargs = {"request_id": request_id}
         
+        # Answer from the background poller once it has seen the job finish
+        job = RODIN_POLLER.get(subscription_key or request_id)
+        if job is not None and job.finished and job.status is not None:
+            return json.dumps(job.status)
+        
         result = blender.send_command("poll_rodin_job_status", kwargs)
         return json.dumps(result)
     except Exception as e:
         logger.error(f"Error polling Hyper3D task: {str(e)}")
         return f"Error polling Hyper3D task: {str(e)}"
 
+@register_tool(
+    name="wait_for_rodin_job",
+    description="Wait until a Hyper3D Rodin generation task has completed or failed. The server polls the job in the background, so call this once instead of polling repeatedly",
+    input_schema={
+        "type": "object",
+        "properties": {
+            "subscription_key": {
+                "type": "string",
+                "description": "Subscription key for the generation task (cannot be used with request_id)"
+            },
+            "request_id": {
+                "type": "string",
+                "description": "Request ID for the generation task (cannot be used with subscription_key)"
+            },
+            "timeout": {
+                "type": "number",
+                "description": "Maximum number of seconds to wait before returning with state 'pending'",
+                "default": 300
+            }
+        },
+        "required": [],
+        "oneOf": [
+            {"required": ["subscription_key"]},
+            {"required": ["request_id"]}
+        ]
+    }
+)
+def wait_for_rodin_job(args: dict) -> str:
+    """Block until a Hyper3D Rodin job finishes, using the server-side poller."""
+    subscription_key = args.get('subscription_key')
+    request_id = args.get('request_id')
+    timeout = min(float(args.get('timeout', 300)), 1800)
+    
+    try:
+        job = RODIN_POLLER.track(subscription_key=subscription_key, request_id=request_id)
+        job = RODIN_POLLER.wait(job.key, timeout)
+        return json.dumps(job.summary())
+    except Exception as e:
+        logger.error(f"Error waiting for Hyper3D task: {str(e)}")
+        return f"Error waiting for Hyper3D task: {str(e)}"
+
 @register_tool(
     name="import_generated_asset",
     description="Import the 3D asset generated by Hyper3D Rodin after the generation task is completed",
@@ -708,7 +1221,8 @@ def poll_rodin_job_status(args: dict) -> str:
             "request_id": {
                 "type": "string",
                 "description": "Request ID of the generation task (cannot be used with task_uuid)"
-            }
+            },
+            **ASSET_INSTANCE_PROPERTIES
         },
         "required": ["name"],
         "oneOf": [
@@ -728,7 +1242,7 @@ def import_generated_asset(args: dict) -> str:
     
     try:
         blender = get_blender_connection()
-        kwargs = {"name": name}
+        kwargs = {"name": name, **_instance_params(args)}
         if task_uuid:
             kwargs["task_uuid"] = task_uuid
         elif request_id:
@@ -740,6 +1254,128 @@ def import_generated_asset(args: dict) -> str:
         logger.error(f"Error importing generated asset: {str(e)}")
         return f"Error importing generated asset: {str(e)}"
 
+@register_tool(
+    name="generate_hyper3d_models",
+    description="Generate several 3D models with Hyper3D Rodin concurrently and import each one as soon as it is ready. Use this instead of generating, polling and importing models one by one",
+    input_schema={
+        "type": "object",
+        "properties": {
+            "models": {
+                "type": "array",
+                "description": "Models to generate, each from a text prompt or image URLs",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "name": {
+                            "type": "string",
+                            "description": "Name to give the imported asset in Blender"
+                        },
+                        "text_prompt": {
+                            "type": "string",
+                            "description": "Text description of the 3D model to generate"
+                        },
+                        "input_image_urls": {
+                            "type": "array",
+                            "items": {
+                                "type": "string",
+                                "format": "uri"
+                            },
+                            "description": "URLs of reference images (instead of text_prompt)"
+                        },
+                        "bbox_condition": {
+                            "type": "array",
+                            "items": {
+                                "type": "number"
+                            },
+                            "description": "Optional bounding box condition as [width, height, depth]",
+                            "minItems": 3,
+                            "maxItems": 3
+                        }
+                    },
+                    "required": ["name"]
+                },
+                "minItems": 1
+            },
+            "timeout": {
+                "type": "number",
+                "description": "Maximum number of seconds to wait for all models",
+                "default": 600
+            }
+        },
+        "required": ["models"]
+    }
+)
+def generate_hyper3d_models(args: dict) -> str:
+    """Submit several Rodin jobs at once, then download and import each in completion order."""
+    models = args.get('models') or []
+    deadline = time.monotonic() + min(float(args.get('timeout', 600)), 1800)
+    
+    if not models:
+        return "Error: models parameter is required"
+    if any(not m.get('name') or not (m.get('text_prompt') or m.get('input_image_urls')) for m in models):
+        return "Error: every model needs a name and either text_prompt or input_image_urls"
+    
+    try:
+        blender = get_blender_connection()
+        
+        # Submit everything up front so the generations run concurrently
+        results = {}
+        submitted = []
+        for model in models:
+            try:
+                job = _submit_rodin_job(blender, model.get('text_prompt'), model.get('input_image_urls'),
+                                        model.get('bbox_condition'))
+            except Exception as e:
+                job = {"error": str(e)}
+            key = job.get("subscription_key") or job.get("request_id")
+            if key:
+                submitted.append((model['name'], key, job))
+            else:
+                results[model['name']] = {"succeed": False, "error": job.get("error") or job}
+        
+        # As each job finishes the addon starts downloading its GLB, while the others keep generating
+        finished = queue.Queue()
+        
+        def watch(name, key, job):
+            state = "failed"
+            try:
+                state = RODIN_POLLER.wait(key, max(deadline - time.monotonic(), 0)).state
+                if state == "done":
+                    blender.send_command("prefetch_generated_asset", _generated_asset_ids(job))
+            except Exception as e:
+                logger.warning(f"Prefetching {name} failed, it will be downloaded on import: {str(e)}")
+            finally:
+                finished.put((name, job, state))
+        
+        for name, key, job in submitted:
+            threading.Thread(target=watch, args=(name, key, job), daemon=True).start()
+        
+        # Imports go through the main thread one at a time, in completion order
+        import_order = []
+        for _ in submitted:
+            name, job, state = finished.get()
+            if state != "done":
+                results[name] = {"succeed": False, "state": state,
+                                 "error": "Generation did not finish in time" if state == "pending" else "Generation failed"}
+                continue
+            try:
+                results[name] = blender.send_command("import_generated_asset", {"name": name, **_generated_asset_ids(job)})
+            except Exception as e:
+                results[name] = {"succeed": False, "error": str(e)}
+            import_order.append(name)
+        
+        return json.dumps({"import_order": import_order, "results": results})
+    except Exception as e:
+        logger.error(f"Error generating Hyper3D models: {str(e)}")
+        return f"Error generating Hyper3D models: {str(e)}"
+
+
+def _generated_asset_ids(job: dict) -> dict:
+    """task_uuid or request_id of a submitted job, as expected by the addon's import commands"""
+    if job.get("task_uuid"):
+        return {"task_uuid": job["task_uuid"]}
+    return {"request_id": job["request_id"]}
+
 
 # Add the prompt registry with proper schema
 
@@ -822,6 +1458,7 @@ def asset_creation_strategy() -> str:
     When creating 3D content in Blender, always start by checking if integrations are available:
 
     0. Before anything, always check the scene from get_scene_info()
+        If it reports truncated, use query_scene() to page through the rest of the objects
     1. First use the following tools to verify if the following integrations are enabled:
         1. PolyHaven
             Use get_polyhaven_status() to verify its status
@@ -854,13 +1491,16 @@ def asset_creation_strategy() -> str:
                     - Wait for another day and try again
                     - Go to hyper3d.ai to find out how to get their own API key
                     - Go to fal.ai to get their own private API key
-                2. Poll the status
-                    - Use poll_rodin_job_status() to check if the generation task has completed or failed
+                2. Wait for the result
+                    - Use wait_for_rodin_job() once; it returns when the generation task has completed or failed
+                    - If it returns state "pending", call it again rather than polling with poll_rodin_job_status()
                 3. Import the asset
                     - Use import_generated_asset() to import the generated GLB model the asset
                 4. After importing the asset, ALWAYS check the world_bounding_box of the imported mesh, and adjust the mesh's location and size
                     Adjust the imported mesh's location, scale, rotation, so that the mesh is on the right spot.
 
+                When several models are needed, use generate_hyper3d_models() to generate and import them all in one call.
+
                 You can reuse assets previous generated by running python code to duplicate the object, without creating another generation task.
 
     3. Always check the world_bounding_box for each item so that:
@@ -880,4 +1520,8 @@ def asset_creation_strategy() -> str:
     - No suitable asset exists in any of the libraries
     - Hyper3D Rodin failed to generate the desired asset
     - The task specifically requires a basic material/color
+
+    When scripting, build primitives, materials, modifiers and parenting with a single
+    build_scene() call rather than many execute_blender_code() calls, and use instance_of
+    for repeated parts.
     """
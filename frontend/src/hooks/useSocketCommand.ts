@@ -35,7 +35,33 @@ interface JobFailedMessage {
   error: string;
 }
 
-type WebSocketMessage = JobStartedMessage | JobInProgressMessage | JobCompletedMessage | JobFailedMessage;
+interface SceneUpdateMessage {
+  type: "scene_update";
+  job_id: string;
+  project_id: string;
+  reason: string;
+  changes: {
+    added?: string[];
+    removed?: string[];
+    transformed?: string[];
+    geometry?: string[];
+    materials?: string[];
+  };
+  truncated: boolean;
+}
+
+interface JobProgressMessage {
+  type: "job_progress";
+  job_id: string;
+  project_id: string;
+  command: string;
+  stage: "download" | "extract" | "import";
+  done: number;
+  total: number | null;
+  message?: string;
+}
+
+type WebSocketMessage = JobStartedMessage | JobInProgressMessage | JobCompletedMessage | JobFailedMessage | SceneUpdateMessage | JobProgressMessage;
 
 export const useSocketCommand = () => {
   const socketRef = useRef<WebSocket | null>(null);
@@ -108,6 +134,19 @@ export const useSocketCommand = () => {
           break;
         }
 
+        case "scene_update": {
+          const { job_id, reason, changes } = data;
+          console.log(`Scene updated (${reason}) during job ${job_id}:`, changes);
+          break;
+        }
+
+        case "job_progress": {
+          const { job_id, command, stage, done, total } = data;
+          const percent = total ? ` (${Math.round((done / total) * 100)}%)` : "";
+          console.log(`Job ${job_id}: ${command} ${stage} ${done}${total ? `/${total}` : ""} bytes${percent}`);
+          break;
+        }
+
         case "job_failed": {
           const { job_id, project_id, error } = data;
           console.log(`Job Failed: ${job_id}`);